@@ -0,0 +1,78 @@
+# agents/call_ledger.py
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CallLedger:
+    """
+    Every provider call made for one presentation: the stage and slide it was made for, the
+    agent, provider and model, how long it took (including waiting for the provider limits and
+    retries), the tokens it used, how often it was retried and whether it was hedged or cached.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.entries: List[Dict[str, Any]] = []
+
+    def record(self, agent: str, provider: str, model: str, latency_seconds: float,
+               input_tokens: int = 0, output_tokens: int = 0, retries: int = 0, hedged: bool = False,
+               cached: bool = False, cost_usd: float = None, error: str = None) -> None:
+        stage, slide_number = current_call_stage.get()
+        self.entries.append({
+            "stage": stage,
+            "slide_number": slide_number,
+            "agent": agent,
+            "provider": provider,
+            "model": model,
+            "started_at": round(time.time() - latency_seconds - self.started_at, 3),
+            "latency_seconds": round(latency_seconds, 3),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "retries": retries,
+            "hedged": hedged,
+            "cached": cached,
+            "cost_usd": cost_usd,
+            "error": error
+        })
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict[str, Any]]) -> "CallLedger":
+        """Ledger of calls recorded earlier, e.g. loaded from the database"""
+        ledger = cls()
+        ledger.entries = list(entries)
+        return ledger
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, time, tokens and cost per stage, and in total"""
+        summary = {}
+        for entry in self.entries:
+            for key in (entry["stage"], "total"):
+                totals = summary.setdefault(key, {"calls": 0, "latency_seconds": 0.0, "input_tokens": 0,
+                                                  "output_tokens": 0, "retries": 0, "cost_usd": 0.0})
+                totals["calls"] += 1
+                totals["latency_seconds"] = round(totals["latency_seconds"] + entry["latency_seconds"], 3)
+                totals["input_tokens"] += entry["input_tokens"]
+                totals["output_tokens"] += entry["output_tokens"]
+                totals["retries"] += entry["retries"]
+                totals["cost_usd"] = round(totals["cost_usd"] + (entry["cost_usd"] or 0), 4)
+        if summary:
+            summary["total"] = summary.pop("total")
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.get_summary(), "calls": list(self.entries)}
+
+
+# Ledger of the presentation being generated, inherited by every task it starts
+current_call_ledger: ContextVar[Optional[CallLedger]] = ContextVar("current_call_ledger", default=None)
+
+# Stage and slide number the current task makes calls for (each stage runs in its own task)
+current_call_stage: ContextVar[Tuple[str, Optional[int]]] = ContextVar("current_call_stage", default=("other", None))
+
+
+def record_call(**entry) -> None:
+    """Add a provider call to the ledger of the current presentation, if any"""
+    ledger = current_call_ledger.get()
+    if ledger:
+        ledger.record(**entry)
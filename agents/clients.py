@@ -0,0 +1,182 @@
+# agents/clients.py
+import os
+from importlib.util import find_spec
+import httpx
+import instructor
+import fal_client
+from anthropic import Anthropic, AsyncAnthropic, DefaultHttpxClient, DefaultAsyncHttpxClient
+from elevenlabs.client import ElevenLabs, AsyncElevenLabs
+from dotenv import load_dotenv
+from agents.fake_providers import FakeInstructor, FakeAnthropicClient, FakeElevenLabs, FakeFalClient, fake_image_server
+
+
+load_dotenv()
+
+# Connection pool of each provider HTTP client, idle connections are kept alive for reuse
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "50"))
+PROVIDER_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PROVIDER_MAX_KEEPALIVE_CONNECTIONS", "20"))
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "30"))
+
+# Client the generated images are downloaded with: HTTP/2 when the h2 package is installed (requests
+# to the same image host then share one connection), a timeout per read rather than per download
+IMAGE_DOWNLOAD_HTTP2 = os.getenv("IMAGE_DOWNLOAD_HTTP2", "true").lower() == "true" and find_spec("h2") is not None
+IMAGE_DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("IMAGE_DOWNLOAD_TIMEOUT_SECONDS", "30"))
+
+# Mark the static system prompt of every Anthropic call for prompt caching
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "true").lower() == "true"
+
+# "live" calls Anthropic, fal and ElevenLabs; "fake" answers every call locally with schema-valid
+# responses, generated images and silent speech, with the latencies and failure rates configured
+# in agents.fake_providers, for offline development and load testing
+AGENT_BACKEND = os.getenv("AGENT_BACKEND", "live").lower()
+FAKE_BACKEND = AGENT_BACKEND == "fake"
+
+
+def get_connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=PROVIDER_MAX_CONNECTIONS,
+        max_keepalive_connections=PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=PROVIDER_KEEPALIVE_EXPIRY,
+    )
+
+
+def add_prompt_cache_breakpoint(*args, **kwargs):
+    """
+    Instructor hook run right before each Anthropic request. The system prompt holds all static
+    agent instructions (see utils.prompts, the user message only holds the fields of the request)
+    followed by the JSON schema of the response model, so marking its last block caches the
+    whole static prefix and repeated calls of the same agent read it from cache.
+
+    Anthropic only caches prefixes of at least 1024 tokens (2048 for Haiku models); shorter
+    prefixes are sent uncached, the marker costs nothing then.
+    """
+    system = kwargs.get("system")
+    if isinstance(system, list) and system:
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+
+
+def create_instructor_client(anthropic_client):
+    client = instructor.from_anthropic(client=anthropic_client, mode=instructor.Mode.ANTHROPIC_JSON)
+    if PROMPT_CACHING:
+        client.on("completion:kwargs", add_prompt_cache_breakpoint)
+    return client
+
+
+class ProviderClients:
+    """
+    Registry of the provider clients shared by every agent call, so connections (and their
+    TLS sessions) are pooled instead of set up again for each call.
+
+    The app creates the clients at startup and closes them at shutdown; outside the app
+    (scripts, notebooks) each client is created on first use. With the fake backend every
+    property returns the matching stand-in of agents.fake_providers instead.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._http_clients = []
+
+    def _http_client(self, http_client):
+        """Keep track of an HTTP client handed to a provider client, so it can be closed"""
+        self._http_clients.append(http_client)
+        return http_client
+
+    def _get(self, name: str, factory):
+        if name not in self._clients:
+            self._clients[name] = factory()
+        return self._clients[name]
+
+    @property
+    def anthropic_client(self) -> Anthropic:
+        return self._get("anthropic", lambda: Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            http_client=self._http_client(DefaultHttpxClient(limits=get_connection_limits()))
+        ))
+
+    @property
+    def async_anthropic_client(self) -> AsyncAnthropic:
+        if FAKE_BACKEND:
+            return self._get("fake_async_anthropic", FakeAnthropicClient)
+        # Async calls are retried by agents.resilience, with jitter and hedging, instead of the SDK
+        return self._get("async_anthropic", lambda: AsyncAnthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            max_retries=0,
+            http_client=self._http_client(DefaultAsyncHttpxClient(limits=get_connection_limits()))
+        ))
+
+    @property
+    def instructor(self):
+        """Instructor client for structured Anthropic completions"""
+        if FAKE_BACKEND:
+            return self._get("fake_instructor", lambda: FakeInstructor(is_async=False))
+        return self._get("instructor", lambda: create_instructor_client(self.anthropic_client))
+
+    @property
+    def async_instructor(self):
+        """Async instructor client for structured Anthropic completions"""
+        if FAKE_BACKEND:
+            return self._get("fake_async_instructor", lambda: FakeInstructor(is_async=True))
+        return self._get("async_instructor", lambda: create_instructor_client(self.async_anthropic_client))
+
+    @property
+    def elevenlabs(self) -> ElevenLabs:
+        if FAKE_BACKEND:
+            return self._get("fake_elevenlabs", lambda: FakeElevenLabs(is_async=False))
+        return self._get("elevenlabs", lambda: ElevenLabs(
+            api_key=os.getenv("ELEVENLABS_API_KEY"),
+            httpx_client=self._http_client(httpx.Client(limits=get_connection_limits(), timeout=240))
+        ))
+
+    @property
+    def async_elevenlabs(self) -> AsyncElevenLabs:
+        if FAKE_BACKEND:
+            return self._get("fake_async_elevenlabs", lambda: FakeElevenLabs(is_async=True))
+        return self._get("async_elevenlabs", lambda: AsyncElevenLabs(
+            api_key=os.getenv("ELEVENLABS_API_KEY"),
+            httpx_client=self._http_client(httpx.AsyncClient(limits=get_connection_limits(), timeout=240))
+        ))
+
+    @property
+    def image_download_client(self) -> httpx.AsyncClient:
+        """Pooled client for the images of every presentation, see agents.image_downloader"""
+        if FAKE_BACKEND:
+            # Cached image URLs of earlier runs point to the fake image server as well
+            fake_image_server.start()
+        return self._get("image_download", lambda: self._http_client(httpx.AsyncClient(
+            limits=get_connection_limits(),
+            http2=IMAGE_DOWNLOAD_HTTP2,
+            timeout=IMAGE_DOWNLOAD_TIMEOUT_SECONDS,
+            follow_redirects=True
+        )))
+
+    @property
+    def fal(self) -> fal_client.SyncClient:
+        if FAKE_BACKEND:
+            return self._get("fake_fal", lambda: FakeFalClient(is_async=False))
+        # fal_client keeps one pooled client per process already
+        return fal_client.sync_client
+
+    @property
+    def async_fal(self) -> fal_client.AsyncClient:
+        if FAKE_BACKEND:
+            return self._get("fake_async_fal", lambda: FakeFalClient(is_async=True))
+        return fal_client.async_client
+
+    def start(self) -> None:
+        """Create every client up front"""
+        for name in ("instructor", "async_instructor", "elevenlabs", "async_elevenlabs", "image_download_client"):
+            getattr(self, name)
+
+    async def close(self) -> None:
+        """Close the connection pools of the created clients"""
+        http_clients = self._http_clients
+        self._clients = {}
+        self._http_clients = []
+        for http_client in http_clients:
+            if hasattr(http_client, "aclose"):
+                await http_client.aclose()
+            else:
+                http_client.close()
+
+
+provider_clients = ProviderClients()
@@ -0,0 +1,102 @@
+#%%
+import os
+from typing import Any, Dict, List, Tuple
+from data.datamodels import SlideOutline, SlideContent, SlideContentBatch
+from utils.prompts import content_batch_generator_system_message, content_batch_generator_user_message, content_without_voiceover_note
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.model_routing import current_model_overrides, get_model_settings
+from agents.wire_schemas import VOICEOVER_FIELDS
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Output tokens reserved for each slide of a batch (its on screen text, voiceover text, image
+# prompt and JSON), and the most a batch may ask for. Above about 21k tokens the Anthropic
+# client refuses requests that do not stream.
+CONTENT_BATCH_TOKENS_PER_SLIDE = int(os.getenv("CONTENT_BATCH_TOKENS_PER_SLIDE", "1024"))
+CONTENT_BATCH_MAX_TOKENS = int(os.getenv("CONTENT_BATCH_MAX_TOKENS", "16384"))
+
+
+def get_content_batch_model_settings( slide_count : int ) -> Dict[str, Any]:
+    """
+    Return the model settings of the batched content generator, with max_tokens scaled to the
+    number of slides in the batch so a large batch is not truncated (a truncated batch fails
+    validation and every slide falls back to a call of its own). A request that sets the model
+    or max_tokens of the role keeps its max_tokens, another model may not allow more.
+    """
+    settings = get_model_settings("content_batch_generator")
+    overrides = (current_model_overrides.get() or {}).get("content_batch_generator", {})
+    if "model" not in overrides and "max_tokens" not in overrides:
+        settings["max_tokens"] = min(max(settings["max_tokens"], slide_count * CONTENT_BATCH_TOKENS_PER_SLIDE),
+                                     CONTENT_BATCH_MAX_TOKENS)
+    return settings
+
+
+def build_content_batch_generator_messages( presentation_title : str, numbered_slide_outlines : List[Tuple[int, SlideOutline]], include_voiceover : bool = True ) -> list:
+    """Build the messages sent to the batched content generator agent"""
+    slide_list = "\n".join(
+        f"        {slide_number}. {slide_outline.slide_title}: {slide_outline.slide_focus}"
+        for slide_number, slide_outline in numbered_slide_outlines
+    )
+    return [
+        {
+            "role": "system",
+            "content": content_batch_generator_system_message
+        },
+        {
+            "role": "user",
+            "content": content_batch_generator_user_message.format(presentation_title = presentation_title,
+                                                                    slide_list = slide_list.strip())
+                       + ("" if include_voiceover else content_without_voiceover_note)
+        }
+    ]
+
+
+def get_batch_slide_contents( slide_numbers : List[int], content_batch : SlideContentBatch, include_voiceover : bool = True ) -> Dict[int, SlideContent]:
+    """
+    Return the usable content of each requested slide by slide number. Items for slides that
+    were not requested, repeated items and items with an empty field (other than the voiceover
+    text of content without voiceover) are left out, so those slides can be generated separately.
+    """
+    slide_contents = {}
+    for item in content_batch.slide_contents:
+        if item.slide_number not in slide_numbers or item.slide_number in slide_contents:
+            continue
+        if not (item.slide_onscreen_text.text_list and item.slide_image_prompt.strip()
+                and (item.slide_voiceover_text.strip() or not include_voiceover)):
+            continue
+        slide_contents[item.slide_number] = SlideContent(
+            slide_onscreen_text = item.slide_onscreen_text,
+            slide_voiceover_text = item.slide_voiceover_text,
+            slide_image_prompt = item.slide_image_prompt
+        )
+    return slide_contents
+
+
+def call_content_batch_generator_agent( presentation_title : str, numbered_slide_outlines : List[Tuple[int, SlideOutline]], include_voiceover : bool = True ) -> SlideContentBatch:
+    """Function to generate the content of several slides in a single call, without voiceover text unless include_voiceover"""
+
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_content_batch_model_settings(len(numbered_slide_outlines)),
+        agent="content_batch_generator",
+        messages=build_content_batch_generator_messages(presentation_title, numbered_slide_outlines, include_voiceover),
+        response_model=SlideContentBatch,
+        omitted_fields=() if include_voiceover else VOICEOVER_FIELDS,
+        top_p=1,
+    )
+
+    return AI_Response, input_tokens, output_tokens
+
+
+async def call_content_batch_generator_agent_async( presentation_title : str, numbered_slide_outlines : List[Tuple[int, SlideOutline]], include_voiceover : bool = True ) -> SlideContentBatch:
+    """Async version of call_content_batch_generator_agent"""
+
+    return await create_structured_completion(
+        **get_content_batch_model_settings(len(numbered_slide_outlines)),
+        agent="content_batch_generator",
+        messages=build_content_batch_generator_messages(presentation_title, numbered_slide_outlines, include_voiceover),
+        response_model=SlideContentBatch,
+        omitted_fields=() if include_voiceover else VOICEOVER_FIELDS,
+        top_p=1,
+    )
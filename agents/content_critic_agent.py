@@ -0,0 +1,58 @@
+#%%
+from data.datamodels import SlideOutline, SlideContent, ContentCritiqueRevision
+from utils.prompts import content_critic_system_message, content_critic_user_message, content_without_voiceover_note
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.model_routing import get_model_settings
+from agents.wire_schemas import VOICEOVER_FIELDS
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+
+def build_content_critic_messages( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent, include_voiceover : bool = True ) -> list:
+    """Build the messages sent to the content critic agent"""
+    return [
+        {
+            "role": "system",
+            "content": content_critic_system_message
+        },
+        {
+            "role": "user",
+            "content": content_critic_user_message.format(presentation_title = presentation_title, 
+                                                          slide_title = slide_outline.slide_title, 
+                                                          slide_focus = slide_outline.slide_focus,
+                                                          slide_onscreen_text = slide_content.slide_onscreen_text,
+                                                          slide_voiceover_text = slide_content.slide_voiceover_text,
+                                                          slide_image_prompt = slide_content.slide_image_prompt
+                                                          ) + ("" if include_voiceover else content_without_voiceover_note)
+        }
+    ]
+
+
+def call_content_critic_agent( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent, include_voiceover : bool = True ) -> ContentCritiqueRevision:
+    """Function to evaluate slide content and revise it in a single call (tester and fixer combined)"""
+
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("content_critic"),
+        agent="content_critic",
+        messages=build_content_critic_messages(presentation_title, slide_outline, slide_content, include_voiceover),
+        response_model=ContentCritiqueRevision,
+        omitted_fields=() if include_voiceover else VOICEOVER_FIELDS,
+        top_p=1,
+    )
+
+    return AI_Response, input_tokens, output_tokens
+
+
+async def call_content_critic_agent_async( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent, include_voiceover : bool = True ) -> ContentCritiqueRevision:
+    """Async version of call_content_critic_agent"""
+
+    return await create_structured_completion(
+        **get_model_settings("content_critic"),
+        agent="content_critic",
+        messages=build_content_critic_messages(presentation_title, slide_outline, slide_content, include_voiceover),
+        response_model=ContentCritiqueRevision,
+        omitted_fields=() if include_voiceover else VOICEOVER_FIELDS,
+        top_p=1,
+    )
@@ -1,43 +1,59 @@
 #%%
 from data.datamodels import SlideOutline, SlideContent
-from utils.prompts import content_initial_generator_system_message, content_initial_generator_user_message
+from utils.prompts import content_initial_generator_system_message, content_initial_generator_user_message, content_without_voiceover_note
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.model_routing import get_model_settings
+from agents.wire_schemas import VOICEOVER_FIELDS
 
-import os
 from dotenv import load_dotenv
-import instructor
-from anthropic import Anthropic
 
 
 load_dotenv()
 
 
-def call_content_initial_generator_agent( presentation_title : str, slide_outline : SlideOutline ) -> SlideContent:
-    """Function to call the initial outline generator agent"""
+def build_content_initial_generator_messages( presentation_title : str, slide_outline : SlideOutline, include_voiceover : bool = True ) -> list:
+    """Build the messages sent to the initial content generator agent"""
+    return [
+        {
+            "role": "system",
+            "content": content_initial_generator_system_message
+        },
+        {
+            "role": "user",
+            "content": content_initial_generator_user_message.format(presentation_title = presentation_title,
+                                                                      slide_title = slide_outline.slide_title, 
+                                                                      slide_focus = slide_outline.slide_focus)
+                       + ("" if include_voiceover else content_without_voiceover_note)
+        }
+    ]
 
-    anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-    client = instructor.from_anthropic(client=anthropic_client, mode=instructor.Mode.ANTHROPIC_JSON)
-    
-    AI_Response, completion = client.chat.completions.create_with_completion(
-        model="claude-3-7-sonnet-20250219",
-        messages=[
-            {
-                "role": "system",
-                "content": content_initial_generator_system_message
-            },
-            {
-                "role": "user",
-                "content": content_initial_generator_user_message.format(presentation_title = presentation_title,
-                                                                          slide_title = slide_outline.slide_title, 
-                                                                          slide_focus = slide_outline.slide_focus)
-            }
-        ],
+
+def call_content_initial_generator_agent( presentation_title : str, slide_outline : SlideOutline, include_voiceover : bool = True ) -> SlideContent:
+    """
+    Function to call the initial outline generator agent. Without include_voiceover no voiceover
+    text is generated, the slide_voiceover_text of the content is empty.
+    """
+
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("content_initial_generator"),
+        agent="content_initial_generator",
+        messages=build_content_initial_generator_messages(presentation_title, slide_outline, include_voiceover),
         response_model=SlideContent,
-        temperature=0.7,
-        max_tokens=8192,
+        omitted_fields=() if include_voiceover else VOICEOVER_FIELDS,
         top_p=1,
     )
     
-    input_tokens = completion.usage.input_tokens
-    output_tokens = completion.usage.output_tokens
-    
     return AI_Response, input_tokens, output_tokens
+
+
+async def call_content_initial_generator_agent_async( presentation_title : str, slide_outline : SlideOutline, include_voiceover : bool = True ) -> SlideContent:
+    """Async version of call_content_initial_generator_agent"""
+
+    return await create_structured_completion(
+        **get_model_settings("content_initial_generator"),
+        agent="content_initial_generator",
+        messages=build_content_initial_generator_messages(presentation_title, slide_outline, include_voiceover),
+        response_model=SlideContent,
+        omitted_fields=() if include_voiceover else VOICEOVER_FIELDS,
+        top_p=1,
+    )
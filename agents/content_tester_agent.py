@@ -1,46 +1,125 @@
 #%%
-from data.datamodels import SlideOutline, SlideContent, ContentValidationResult
-from utils.prompts import content_tester_system_message, content_tester_user_message
-import os
+import json
+from typing import Any, Dict, List
+from data.datamodels import SlideOutline, SlideContent, ContentValidationResult, ContentValidationBatch
+from utils.prompts import content_tester_system_message, content_tester_user_message, content_without_voiceover_note
+from utils.prompts import content_tester_item_message, content_tester_batch_system_message, content_tester_batch_user_message
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.llm_helper import create_shared_structured_completion, create_batched_structured_completion, get_usage_shares
+from agents.micro_batcher import MicroBatcher, TESTER_BATCHING
+from agents.model_routing import get_model_settings
 from dotenv import load_dotenv
-import instructor
-from anthropic import Anthropic
 
 
 load_dotenv()
 
 
-def call_content_tester_agent( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent ) -> ContentValidationResult:
+def build_content_tester_messages( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent, include_voiceover : bool = True ) -> list:
+    """Build the messages sent to the content tester agent"""
+    return [
+        {
+            "role": "system",
+            "content": content_tester_system_message
+        },
+        {
+            "role": "user",
+            "content": content_tester_user_message.format(presentation_title = presentation_title, 
+                                                          slide_title = slide_outline.slide_title, 
+                                                          slide_focus = slide_outline.slide_focus,
+                                                          slide_onscreen_text = slide_content.slide_onscreen_text,
+                                                          slide_voiceover_text = slide_content.slide_voiceover_text,
+                                                          slide_image_prompt = slide_content.slide_image_prompt
+                                                          ) + ("" if include_voiceover else content_without_voiceover_note)
+        }
+    ]
+
+
+def build_content_tester_batch_messages( items : List[Dict[str, Any]] ) -> list:
+    """Build the messages of a single tester call evaluating several slide contents, items are numbered from 1"""
+    formatted_items = "\n".join(
+        f"\nItem {item_number}:" + content_tester_item_message.format(presentation_title = item["presentation_title"],
+                                                                     slide_title = item["slide_outline"].slide_title,
+                                                                     slide_focus = item["slide_outline"].slide_focus,
+                                                                     slide_onscreen_text = item["slide_content"].slide_onscreen_text,
+                                                                     slide_voiceover_text = item["slide_content"].slide_voiceover_text,
+                                                                     slide_image_prompt = item["slide_content"].slide_image_prompt)
+        + ("" if item["include_voiceover"] else content_without_voiceover_note)
+        for item_number, item in enumerate(items, 1)
+    )
+    return [
+        {
+            "role": "system",
+            "content": content_tester_batch_system_message
+        },
+        {
+            "role": "user",
+            "content": content_tester_batch_user_message.format(item_count = len(items), items = formatted_items)
+        }
+    ]
+
+
+async def send_content_tester_batch( key : str, items : List[Dict[str, Any]] ) -> list:
+    """Evaluate a batch of slide contents in one call, returning the result of each item with its share of the usage"""
+
+    content_batch, input_tokens, output_tokens = await create_shared_structured_completion(
+        **json.loads(key),
+        agent="content_tester_batch",
+        messages=build_content_tester_batch_messages(items),
+        response_model=ContentValidationBatch,
+    )
+
+    results = {result.item_number: result for result in content_batch.results}
+    # Items missing from the response are made on their own, the others share the usage
+    answered = [item_number for item_number in range(1, len(items) + 1) if item_number in results]
+    usages = dict(zip(answered, get_usage_shares(input_tokens, output_tokens, len(answered))))
+    return [
+        (ContentValidationResult.model_validate(results[item_number].model_dump(exclude={"item_number"})), usages[item_number])
+        if item_number in results else None
+        for item_number in range(1, len(items) + 1)
+    ]
+
+
+# Combines the content tester calls of concurrent presentations
+content_tester_batcher = MicroBatcher("content_tester", send_content_tester_batch)
+
+
+def call_content_tester_agent( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent, include_voiceover : bool = True ) -> ContentValidationResult:
     """Function to call the initial outline generator agent"""
 
-    anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-    client = instructor.from_anthropic(client=anthropic_client, mode=instructor.Mode.ANTHROPIC_JSON)
-    
-    AI_Response, completion = client.chat.completions.create_with_completion(
-        model="claude-3-7-sonnet-20250219",
-        messages=[
-            {
-                "role": "system",
-                "content": content_tester_system_message
-            },
-            {
-                "role": "user",
-                "content": content_tester_user_message.format(presentation_title = presentation_title, 
-                                                              slide_title = slide_outline.slide_title, 
-                                                              slide_focus = slide_outline.slide_focus,
-                                                              slide_onscreen_text = slide_content.slide_onscreen_text,
-                                                              slide_voiceover_text = slide_content.slide_voiceover_text,
-                                                              slide_image_prompt = slide_content.slide_image_prompt
-                                                              )
-            }
-        ],
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("content_tester"),
+        agent="content_tester",
+        messages=build_content_tester_messages(presentation_title, slide_outline, slide_content, include_voiceover),
         response_model=ContentValidationResult,
-        temperature=0.7,
-        max_tokens=8192,
         top_p=1,
     )
     
-    input_tokens = completion.usage.input_tokens
-    output_tokens = completion.usage.output_tokens
-    
-    return AI_Response, input_tokens, output_tokens
\ No newline at end of file
+    return AI_Response, input_tokens, output_tokens
+
+
+async def call_content_tester_agent_async( presentation_title : str, slide_outline : SlideOutline, slide_content : SlideContent, include_voiceover : bool = True ) -> ContentValidationResult:
+    """
+    Async version of call_content_tester_agent. With TESTER_BATCHING the call may be sent together
+    with the concurrent content tester calls of other presentations, as one multi-item call.
+    """
+
+    messages = build_content_tester_messages(presentation_title, slide_outline, slide_content, include_voiceover)
+    if not TESTER_BATCHING:
+        return await create_structured_completion(
+            **get_model_settings("content_tester"),
+            agent="content_tester",
+            messages=messages,
+            response_model=ContentValidationResult,
+            top_p=1,
+        )
+
+    return await create_batched_structured_completion(
+        content_tester_batcher,
+        {"presentation_title": presentation_title, "slide_outline": slide_outline,
+         "slide_content": slide_content, "include_voiceover": include_voiceover},
+        **get_model_settings("content_tester"),
+        agent="content_tester",
+        messages=messages,
+        response_model=ContentValidationResult,
+        top_p=1,
+    )
@@ -0,0 +1,415 @@
+# agents/fake_providers.py
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+import fal_client
+from PIL import Image, ImageDraw
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Latency of each fake provider call: log-normally distributed around the median, the sigma sets the tail
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "2"))
+FAKE_IMAGE_LATENCY_SECONDS = float(os.getenv("FAKE_IMAGE_LATENCY_SECONDS", "4"))
+FAKE_TTS_LATENCY_SECONDS = float(os.getenv("FAKE_TTS_LATENCY_SECONDS", "1.5"))
+FAKE_LATENCY_SIGMA = float(os.getenv("FAKE_LATENCY_SIGMA", "0.5"))
+
+# Share of fake provider calls that fail with a retryable (overloaded) error. The async calls of
+# every provider retry it through agents.resilience, the sync helpers do not retry
+FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+FAKE_IMAGE_FAILURE_RATE = float(os.getenv("FAKE_IMAGE_FAILURE_RATE", "0"))
+FAKE_TTS_FAILURE_RATE = float(os.getenv("FAKE_TTS_FAILURE_RATE", "0"))
+
+# Seed of the latencies and failures, for repeatable load test runs (responses depend only on the request)
+FAKE_BACKEND_SEED = os.getenv("FAKE_BACKEND_SEED")
+
+# Local server the fake images are downloaded from
+FAKE_IMAGE_SERVER_HOST = os.getenv("FAKE_IMAGE_SERVER_HOST", "127.0.0.1")
+FAKE_IMAGE_SERVER_PORT = int(os.getenv("FAKE_IMAGE_SERVER_PORT", "8790"))
+FAKE_IMAGE_SIZE = (1024, 576)
+
+FAKE_WORDS = (
+    "data model system design learning network process energy future market history science "
+    "culture language research method result example strategy growth impact practice theory "
+    "structure community technology resource change value quality planning analysis solution"
+).split()
+
+fake_random = random.Random(FAKE_BACKEND_SEED)
+
+
+class FakeProviderError(Exception):
+    """
+    Failure of a fake provider call, with the 529 status of a real overloaded error, so
+    agents.resilience retries it like one
+    """
+
+    def __init__(self, provider: str):
+        super().__init__(f"Fake {provider} call failed (simulated overload)")
+        self.status_code = 529
+
+
+def sample_latency(median_seconds: float) -> float:
+    if median_seconds <= 0:
+        return 0.0
+    return median_seconds * math.exp(fake_random.gauss(0, FAKE_LATENCY_SIGMA))
+
+
+def maybe_fail(provider: str, failure_rate: float) -> None:
+    if failure_rate > 0 and fake_random.random() < failure_rate:
+        raise FakeProviderError(provider)
+
+
+def get_message_text(messages: List[Dict[str, Any]]) -> str:
+    """Text of every message, including the text blocks of messages with images"""
+    texts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            texts.append(content)
+        elif isinstance(content, list):
+            texts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return "\n".join(texts)
+
+
+def get_requested_slide_numbers(text: str) -> List[int]:
+    """Slide numbers a prompt asks for: its slide count, its items (of batched calls), or else its numbered slide list"""
+    slide_count = re.search(r"exactly (\d+) slides|Slide Count should be: (\d+)", text)
+    if slide_count:
+        return list(range(1, int(slide_count.group(1) or slide_count.group(2)) + 1))
+    item_numbers = [int(number) for number in re.findall(r"^\s*Item (\d+):", text, re.MULTILINE)]
+    if item_numbers:
+        return item_numbers
+    slide_numbers = [int(number) for number in re.findall(r"^\s*(\d+)\. ", text, re.MULTILINE)]
+    return slide_numbers or [1, 2, 3]
+
+
+class FakeResponseBuilder:
+    """
+    Builds a schema-valid response for a JSON schema (e.g. a pydantic model's), with filler text
+    that depends only on the request, so identical requests get identical responses. Lists of
+    items with a slide number (a key ending in "number") get one item per slide the request asks for.
+    """
+
+    def __init__(self, schema: Dict[str, Any], request_text: str):
+        self.definitions = schema.get("$defs", {})
+        self.schema = schema
+        self.slide_numbers = get_requested_slide_numbers(request_text)
+        self.random = random.Random(hashlib.sha256(request_text.encode("utf-8")).hexdigest())
+
+    def resolve(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        while "$ref" in node:
+            node = self.definitions[node["$ref"].split("/")[-1]]
+        if "anyOf" in node:
+            node = self.resolve(next((option for option in node["anyOf"] if option.get("type") != "null"), node["anyOf"][0]))
+        return node
+
+    def build(self) -> Any:
+        return self.build_value(self.schema, "")
+
+    def build_value(self, node: Dict[str, Any], name: str, slide_number: int = None) -> Any:
+        node = self.resolve(node)
+        if "const" in node:
+            return node["const"]
+        if "enum" in node:
+            return self.random.choice(node["enum"])
+
+        node_type = node.get("type")
+        if node_type == "object":
+            return {
+                property_name: self.build_value(property_node, property_name, slide_number)
+                for property_name, property_node in node.get("properties", {}).items()
+            }
+        if node_type == "array":
+            items = self.resolve(node.get("items", {}))
+            if any(key.endswith("number") for key in items.get("properties", {})):
+                return [self.build_value(items, name, number) for number in self.slide_numbers]
+            return [self.build_value(items, name) for _ in range(self.random.randint(3, 5))]
+        if node_type == "integer":
+            if name.endswith("number") and slide_number is not None:
+                return slide_number
+            if name == "score":
+                return self.random.randint(60, 100)
+            return self.random.randint(1, 10)
+        if node_type == "number":
+            return round(self.random.uniform(0, 10), 2)
+        if node_type == "boolean":
+            return True
+        return self.build_text(name)
+
+    def build_text(self, name: str) -> str:
+        if "title" in name:
+            return " ".join(self.random.sample(FAKE_WORDS, self.random.randint(3, 6))).title()
+        if "prompt" in name or "voiceover" in name:
+            word_count = self.random.randint(30, 50)
+        elif "feedback" in name or "suggestions" in name:
+            word_count = 15
+        else:
+            word_count = self.random.randint(8, 14)
+        text = " ".join(self.random.choice(FAKE_WORDS) for _ in range(word_count))
+        return f"{text.capitalize()}."
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def build_fake_usage(request_text: str, response_text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        input_tokens=estimate_tokens(request_text),
+        output_tokens=estimate_tokens(response_text),
+        cache_read_input_tokens=0,
+        cache_creation_input_tokens=0
+    )
+
+
+class FakeChatCompletions:
+    """Stand-in for instructor's chat.completions, returning schema-valid responses"""
+
+    def __init__(self, is_async: bool):
+        self.is_async = is_async
+
+    def build(self, response_model, messages):
+        request_text = get_message_text(messages)
+        response = response_model.model_validate(
+            FakeResponseBuilder(response_model.model_json_schema(), request_text).build()
+        )
+        return response, SimpleNamespace(usage=build_fake_usage(request_text, response.model_dump_json()))
+
+    def create_with_completion(self, messages, response_model, **kwargs):
+        if self.is_async:
+            return self.create_with_completion_async(messages, response_model)
+        time.sleep(sample_latency(FAKE_LLM_LATENCY_SECONDS))
+        maybe_fail("anthropic", FAKE_LLM_FAILURE_RATE)
+        return self.build(response_model, messages)
+
+    async def create_with_completion_async(self, messages, response_model):
+        await asyncio.sleep(sample_latency(FAKE_LLM_LATENCY_SECONDS))
+        maybe_fail("anthropic", FAKE_LLM_FAILURE_RATE)
+        return self.build(response_model, messages)
+
+
+class FakeInstructor:
+    """Stand-in for the (async) instructor client"""
+
+    def __init__(self, is_async: bool):
+        self.chat = SimpleNamespace(completions=FakeChatCompletions(is_async))
+
+
+class FakeMessageStream:
+    """
+    Stand-in for an Anthropic message stream: the JSON response to the schema in the system
+    prompt is streamed in chunks spread over the sampled latency of the call.
+    """
+
+    def __init__(self, system, messages):
+        system_text = get_message_text([{"content": system}])
+        schema_text = system_text[system_text.find("{"):system_text.rfind("}") + 1]
+        request_text = get_message_text(messages)
+        self.response_text = json.dumps(FakeResponseBuilder(json.loads(schema_text), request_text).build(), ensure_ascii=False)
+        self.usage = build_fake_usage(request_text, self.response_text)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        chunk_count = 20
+        chunk_size = math.ceil(len(self.response_text) / chunk_count)
+        chunk_delay = sample_latency(FAKE_LLM_LATENCY_SECONDS) / chunk_count
+        maybe_fail("anthropic", FAKE_LLM_FAILURE_RATE)
+        for start in range(0, len(self.response_text), chunk_size):
+            await asyncio.sleep(chunk_delay)
+            yield self.response_text[start:start + chunk_size]
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=self.usage)
+
+
+class FakeAnthropicClient:
+    """Stand-in for the async Anthropic client, for streamed completions"""
+
+    def __init__(self):
+        self.messages = SimpleNamespace(stream=lambda system, messages, **kwargs: FakeMessageStream(system, messages))
+
+
+@lru_cache(maxsize=256)
+def render_fake_jpeg(image_key: str) -> bytes:
+    """A JPEG of coloured shapes that depends only on the key"""
+    image_random = random.Random(image_key)
+    width, height = FAKE_IMAGE_SIZE
+    image = Image.new("RGB", FAKE_IMAGE_SIZE, tuple(image_random.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(8):
+        x, y = image_random.randint(0, width), image_random.randint(0, height)
+        radius = image_random.randint(40, 200)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=tuple(image_random.randint(0, 255) for _ in range(3)))
+    output = BytesIO()
+    image.save(output, "JPEG", quality=85)
+    return output.getvalue()
+
+
+class FakeImageRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        match = re.fullmatch(r"/images/(\w+)\.jpg", self.path)
+        if not match:
+            self.send_error(404)
+            return
+        image = render_fake_jpeg(match.group(1))
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(image)))
+        self.end_headers()
+        self.wfile.write(image)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeImageServer:
+    """Local HTTP server the fake images are served from, started on first use"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        with self.lock:
+            if self.server is None:
+                self.server = ThreadingHTTPServer((self.host, self.port), FakeImageRequestHandler)
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, daemon=True).start()
+                print(f"Fake image server started on http://{self.host}:{self.server.server_port}")
+
+    def get_image_url(self, image_key: str) -> str:
+        self.start()
+        return f"http://{self.host}:{self.server.server_port}/images/{image_key}.jpg"
+
+
+fake_image_server = FakeImageServer(FAKE_IMAGE_SERVER_HOST, FAKE_IMAGE_SERVER_PORT)
+
+
+def build_fake_image_result(model: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    image_key = hashlib.sha256(json.dumps([model, arguments], sort_keys=True).encode("utf-8")).hexdigest()[:32]
+    width, height = FAKE_IMAGE_SIZE
+    return {"images": [{"url": fake_image_server.get_image_url(image_key), "width": width, "height": height}]}
+
+
+class FakeFalHandler:
+    """Queue request of the fake fal client, completed once its sampled latency has passed"""
+
+    def __init__(self, model: str, arguments: Dict[str, Any], is_async: bool):
+        self.model = model
+        self.arguments = arguments
+        self.is_async = is_async
+        self.completes_at = time.monotonic() + sample_latency(FAKE_IMAGE_LATENCY_SECONDS)
+
+    def get_remaining_seconds(self) -> float:
+        return max(0.0, self.completes_at - time.monotonic())
+
+    def get_status(self):
+        if self.get_remaining_seconds() > 0:
+            return fal_client.InProgress(logs=None)
+        return fal_client.Completed(logs=None, metrics={})
+
+    def status(self, **kwargs):
+        if self.is_async:
+            return self.status_async()
+        return self.get_status()
+
+    async def status_async(self):
+        return self.get_status()
+
+    def get(self):
+        if self.is_async:
+            return self.get_async()
+        time.sleep(self.get_remaining_seconds())
+        maybe_fail("fal", FAKE_IMAGE_FAILURE_RATE)
+        return build_fake_image_result(self.model, self.arguments)
+
+    async def get_async(self):
+        await asyncio.sleep(self.get_remaining_seconds())
+        maybe_fail("fal", FAKE_IMAGE_FAILURE_RATE)
+        return build_fake_image_result(self.model, self.arguments)
+
+    def cancel(self):
+        self.completes_at = time.monotonic()
+        if self.is_async:
+            return self.cancel_async()
+
+    async def cancel_async(self):
+        return None
+
+
+class FakeFalClient:
+    """Stand-in for the (async) fal client, its images are served by the fake image server"""
+
+    def __init__(self, is_async: bool):
+        self.is_async = is_async
+
+    def submit(self, application: str, arguments: Dict[str, Any]):
+        handler = FakeFalHandler(application, arguments, self.is_async)
+        if self.is_async:
+            return self.submit_async(handler)
+        return handler
+
+    async def submit_async(self, handler: FakeFalHandler) -> FakeFalHandler:
+        return handler
+
+
+# A silent MPEG-2 layer III frame in the mp3_22050_32 format the app requests:
+# 22050 Hz mono at 32 kbps, 576 samples (about 26 ms) in 104 bytes
+SILENT_MP3_FRAME = bytes([0xFF, 0xF3, 0x40, 0xC0]) + bytes(100)
+SILENT_MP3_FRAME_SECONDS = 576 / 22050
+FAKE_SPEECH_WORDS_PER_SECOND = 2.5
+
+
+def build_fake_speech(text: str) -> bytes:
+    """Silent MP3 as long as speaking the text would take"""
+    seconds = max(1.0, len(text.split()) / FAKE_SPEECH_WORDS_PER_SECOND)
+    return SILENT_MP3_FRAME * math.ceil(seconds / SILENT_MP3_FRAME_SECONDS)
+
+
+class FakeTextToSpeech:
+
+    def __init__(self, is_async: bool):
+        self.is_async = is_async
+
+    def convert(self, text: str, **kwargs):
+        if self.is_async:
+            return self.convert_async(text)
+        return self.convert_sync(text)
+
+    def convert_sync(self, text: str):
+        time.sleep(sample_latency(FAKE_TTS_LATENCY_SECONDS))
+        maybe_fail("elevenlabs", FAKE_TTS_FAILURE_RATE)
+        yield build_fake_speech(text)
+
+    async def convert_async(self, text: str):
+        await asyncio.sleep(sample_latency(FAKE_TTS_LATENCY_SECONDS))
+        maybe_fail("elevenlabs", FAKE_TTS_FAILURE_RATE)
+        yield build_fake_speech(text)
+
+
+class FakeElevenLabs:
+    """Stand-in for the (async) ElevenLabs client, returning silent speech of a plausible length"""
+
+    def __init__(self, is_async: bool):
+        self.text_to_speech = FakeTextToSpeech(is_async)
@@ -0,0 +1,37 @@
+# agents/image_downloader.py
+import asyncio
+import os
+from dotenv import load_dotenv
+from agents.clients import provider_clients
+
+
+load_dotenv()
+
+# Downloads running at once across all presentations, and the size of the chunks written to disk
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "16"))
+IMAGE_DOWNLOAD_CHUNK_BYTES = int(os.getenv("IMAGE_DOWNLOAD_CHUNK_BYTES", str(64 * 1024)))
+
+download_semaphore = asyncio.Semaphore(IMAGE_DOWNLOAD_CONCURRENCY)
+
+
+async def download_file(url: str, path: str) -> int:
+    """
+    Stream the body of url into the file at path with the shared pooled client, so the
+    connection is reused and the body is never held in memory as a whole. Returns the size
+    of the file; a failed download leaves no file behind.
+    """
+    size = 0
+    try:
+        async with download_semaphore:
+            async with provider_clients.image_download_client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Failed to download image: HTTP {response.status_code}")
+                with open(path, "wb") as file:
+                    async for chunk in response.aiter_bytes(IMAGE_DOWNLOAD_CHUNK_BYTES):
+                        file.write(chunk)
+                        size += len(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return size
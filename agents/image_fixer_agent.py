@@ -1,58 +1,74 @@
 #%%
 from data.datamodels import RegeneratedPrompt, ImageValidationWithSlideContent, SlideContent
 from utils.prompts import image_fixer_system_message, image_fixer_user_message
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.model_routing import get_model_settings
 
-from anthropic import Anthropic
-import os
-import instructor
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
-anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-client = instructor.from_anthropic(client=anthropic_client, mode=instructor.Mode.ANTHROPIC_JSON)
-
 #%%
 
+def build_image_fixer_messages(image_validation_result : ImageValidationWithSlideContent) -> list:
+    """Build the messages sent to the image fixer agent"""
+    return [
+        {
+            "role": "system",
+            "content": image_fixer_system_message
+        },
+        {
+            "role": "user",
+            "content": image_fixer_user_message.format(
+                                                        slide_image_prompt = image_validation_result.tested_slide_content.slide_image_prompt,
+                                                        slide_onscreen_text = image_validation_result.tested_slide_content.slide_onscreen_text,
+                                                        slide_voiceover_text = image_validation_result.tested_slide_content.slide_voiceover_text,
+
+                                                        feedback = image_validation_result.validation_feedback.feedback,
+                                                        suggestions = image_validation_result.validation_feedback.suggestions,
+                                                        score = image_validation_result.validation_feedback.score
+                                                        )
+        }
+    ]
+
+
+def build_fixed_slide_content(image_validation_result : ImageValidationWithSlideContent, regenerated_prompt : RegeneratedPrompt) -> SlideContent:
+    """Return the tested slide content with the regenerated image prompt"""
+    return SlideContent(
+        slide_onscreen_text = image_validation_result.tested_slide_content.slide_onscreen_text,
+        slide_voiceover_text = image_validation_result.tested_slide_content.slide_voiceover_text,
+        slide_image_prompt = regenerated_prompt.prompt
+    )
+
+
 def call_image_fixer_agent(image_validation_result : ImageValidationWithSlideContent) -> SlideContent:
     
-    AI_Response, completion = client.chat.completions.create_with_completion(
-        model="claude-3-7-sonnet-20250219",
-        messages=[
-            {
-                "role": "system",
-                "content": image_fixer_system_message
-            },
-            {
-                "role": "user",
-                "content": image_fixer_user_message.format(
-                                                            slide_image_prompt = image_validation_result.tested_slide_content.slide_image_prompt,
-                                                            slide_onscreen_text = image_validation_result.tested_slide_content.slide_onscreen_text,
-                                                            slide_voiceover_text = image_validation_result.tested_slide_content.slide_voiceover_text,
-
-                                                            feedback = image_validation_result.validation_feedback.feedback,
-                                                            suggestions = image_validation_result.validation_feedback.suggestions,
-                                                            score = image_validation_result.validation_feedback.score
-                                                            )
-            }
-        ],
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("image_fixer"),
+        agent="image_fixer",
+        messages=build_image_fixer_messages(image_validation_result),
         response_model=RegeneratedPrompt,
-        temperature=0.7,
-        max_tokens=8192,
         top_p=1,
     )
 
 
-    new_slide_content = SlideContent(
-        slide_onscreen_text = image_validation_result.tested_slide_content.slide_onscreen_text,
-        slide_voiceover_text = image_validation_result.tested_slide_content.slide_voiceover_text,
-        slide_image_prompt = AI_Response.prompt
-    )
-
-    input_tokens = completion.usage.input_tokens
-    output_tokens = completion.usage.output_tokens    
+    new_slide_content = build_fixed_slide_content(image_validation_result, AI_Response)
     
     return new_slide_content, input_tokens, output_tokens
 
+
+async def call_image_fixer_agent_async(image_validation_result : ImageValidationWithSlideContent) -> SlideContent:
+    """Async version of call_image_fixer_agent"""
+    
+    AI_Response, input_tokens, output_tokens = await create_structured_completion(
+        **get_model_settings("image_fixer"),
+        agent="image_fixer",
+        messages=build_image_fixer_messages(image_validation_result),
+        response_model=RegeneratedPrompt,
+        top_p=1,
+    )
+
+    return build_fixed_slide_content(image_validation_result, AI_Response), input_tokens, output_tokens
+
 #%%
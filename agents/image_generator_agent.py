@@ -1,63 +1,141 @@
-import fal_client
+from agents.clients import provider_clients
+from agents.image_service import fal_image_service
+from agents.response_cache import image_response_cache, response_cache_enabled, make_cache_key
+from agents.call_ledger import record_call
+from agents.resilience import call_with_resilience
+from agents.image_downloader import download_file
+from agents.image_transcoder import image_transcoder
 from dotenv import load_dotenv
-import requests
 import os
-from PIL import Image
-from io import BytesIO
+import time
 
 load_dotenv()
 
+# Approximate price of one landscape_16_9 image per fal model in USD, for the call ledger
+IMAGE_MODEL_COSTS_USD = {
+    "fal-ai/flux/dev": 0.015,
+    "fal-ai/recraft-20b": 0.022,
+    "fal-ai/imagen3": 0.05,
+}
+
+
+def get_cached_image_url(cache_key):
+    """Return the image generated earlier for the same model and arguments, or None"""
+    if not response_cache_enabled.get():
+        return None
+    cached = image_response_cache.get(cache_key)
+    return cached["image_url"] if cached else None
+
+
+def cache_image_url(cache_key, image_url):
+    if response_cache_enabled.get():
+        image_response_cache.set(cache_key, {"image_url": image_url})
+
+
+async def get_cached_image_url_async(cache_key):
+    """Async version of get_cached_image_url, which keeps the disk tier of the cache off the event loop"""
+    if not response_cache_enabled.get():
+        return None
+    cached = await image_response_cache.aget(cache_key)
+    return cached["image_url"] if cached else None
+
+
+async def cache_image_url_async(cache_key, image_url):
+    if response_cache_enabled.get():
+        await image_response_cache.aset(cache_key, {"image_url": image_url})
+
 
 def call_image_generator_agent(prompt, selected_model):
 
-    handler = fal_client.submit(
+    arguments = {
+        "prompt": prompt,
+        "image_size": "landscape_16_9",
+    }
+    cache_key = make_cache_key(selected_model, arguments)
+    image_url = get_cached_image_url(cache_key)
+    if image_url:
+        return image_url
+
+    handler = provider_clients.fal.submit(
         selected_model,
-        arguments={
-            "prompt": prompt,
-            "image_size": "landscape_16_9",
-        },
+        arguments=arguments,
     )
 
     result = handler.get()
     image_url = result['images'][0]['url']
+    cache_image_url(cache_key, image_url)
+    return image_url
+
+
+async def call_image_generator_agent_async(prompt, selected_model):
+    """
+    Async version of call_image_generator_agent. The request is submitted within the shared
+    fal limits and its result is awaited alongside all other images in flight, see
+    FalImageService. Failed requests are retried and time out like every agent call (see
+    agents.resilience), but straggling ones are not hedged. Every call is added to the call
+    ledger of the current presentation, with its approximate cost.
+    """
+
+    started_at = time.monotonic()
+    arguments = {
+        "prompt": prompt,
+        "image_size": "landscape_16_9",
+    }
+    cache_key = make_cache_key(selected_model, arguments)
+    image_url = await get_cached_image_url_async(cache_key)
+    if image_url:
+        record_call(agent="image_generator", provider="fal", model=selected_model,
+                    latency_seconds=time.monotonic() - started_at, cached=True, cost_usd=0.0)
+        return image_url
+
+    async def request(reservation):
+        return await fal_image_service.generate(selected_model, arguments)
+
+    call_info = {}
+    try:
+        # The image service waits for the fal limits itself, only while submitting. Not hedged:
+        # a duplicate would be a second paid image, and cancelling the losing one is not refunded
+        result = await call_with_resilience(request, None, 0, f"{selected_model}:image_generator", hedge=False,
+                                            call_info=call_info)
+    except Exception as e:
+        record_call(agent="image_generator", provider="fal", model=selected_model,
+                    latency_seconds=time.monotonic() - started_at, retries=call_info.get("retries", 0),
+                    error=f"{type(e).__name__}: {e}")
+        raise
+    record_call(agent="image_generator", provider="fal", model=selected_model,
+                latency_seconds=time.monotonic() - started_at, retries=call_info.get("retries", 0),
+                cost_usd=IMAGE_MODEL_COSTS_USD.get(selected_model))
+
+    image_url = result['images'][0]['url']
+    await cache_image_url_async(cache_key, image_url)
     return image_url
 
 
-def download_image_to_local(image_url, presentation_id, slide_number):
-    """Download image from URL to local folder and convert to JPEG format"""
+async def download_image_to_local(image_url, presentation_id, slide_number):
+    """
+    Download image from URL to local folder and convert to JPEG format. The image is streamed
+    to disk with the shared download client (see agents.image_downloader) and converted from
+    there in the transcoding pool (see agents.image_transcoder).
+    """
     # Create directory if it doesn't exist
     images_dir = f"images/{presentation_id}"
     os.makedirs(images_dir, exist_ok=True)
-    
+    download_path = f"{images_dir}/slide_{slide_number}.download"
+    local_path = f"{images_dir}/slide_{slide_number}.jpg"
+
     try:
         # Download the image
-        response = requests.get(image_url, timeout=30)
-        if response.status_code == 200:
-            # Load image data into PIL
-            image_data = BytesIO(response.content)
-            
-            # Open with PIL to detect and convert format
-            with Image.open(image_data) as img:
-                # Convert to RGB if necessary (handles RGBA, P mode, etc.)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Create white background for transparent images
-                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = rgb_img
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Save as JPEG
-                local_path = f"{images_dir}/slide_{slide_number}.jpg"
-                img.save(local_path, 'JPEG', quality=95, optimize=True)
-                
-                print(f"✓ Image converted and saved: {local_path}")
-                return local_path
-        else:
-            raise Exception(f"Failed to download image: HTTP {response.status_code}")
-            
+        await download_file(image_url, download_path)
+
+        # Convert to JPEG in the transcoding pool
+        await image_transcoder.convert_to_jpeg(download_path, local_path)
+
+        print(f"✓ Image converted and saved: {local_path}")
+        return local_path
+
     except Exception as e:
         print(f"Error downloading/converting image: {e}")
-        raise Exception(f"Failed to download and convert image: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to download and convert image: {str(e)}")
+    finally:
+        if os.path.exists(download_path):
+            os.remove(download_path)
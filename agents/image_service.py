@@ -0,0 +1,89 @@
+# agents/image_service.py
+import asyncio
+import os
+from typing import Any, Dict, Optional
+from fal_client import Completed
+from dotenv import load_dotenv
+from agents.clients import provider_clients
+from agents.rate_limiter import fal_limiter
+from agents.resilience import LLM_CALL_TIMEOUT_SECONDS
+
+
+load_dotenv()
+
+# How often the status of the image requests in flight is checked, and how many checks run at once
+FAL_POLL_INTERVAL_SECONDS = float(os.getenv("FAL_POLL_INTERVAL_SECONDS", "0.5"))
+FAL_POLL_CONCURRENCY = int(os.getenv("FAL_POLL_CONCURRENCY", "20"))
+
+
+class FalImageService:
+    """
+    Generates images on the fal queue. A request is submitted as soon as its prompt is known,
+    only the submission waits for the fal limits, so the images of every slide (and of every
+    presentation) are generated side by side instead of each holding a limiter slot until its
+    image is done. One poller checks the status of all requests in flight concurrently and
+    fetches each result as soon as it is completed, so every caller gets its image as soon as
+    it is ready and a deck's images take about as long as the slowest of them.
+
+    A caller waits at most timeout_seconds for its image once the request is submitted. A
+    request that timed out, or whose caller stopped waiting (e.g. the presentation ran out of
+    time), is no longer polled and is cancelled on the fal queue.
+    """
+
+    def __init__(self, poll_interval_seconds: float = FAL_POLL_INTERVAL_SECONDS,
+                 poll_concurrency: int = FAL_POLL_CONCURRENCY, timeout_seconds: float = LLM_CALL_TIMEOUT_SECONDS):
+        self.poll_interval_seconds = poll_interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.poll_semaphore = asyncio.Semaphore(poll_concurrency)
+        self.in_flight: Dict[asyncio.Future, Any] = {}
+        self.poller: Optional[asyncio.Task] = None
+        self.cancellations = set()
+
+    async def generate(self, model: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit an image request and wait for its result"""
+        async with fal_limiter.acquire():
+            handler = await provider_clients.async_fal.submit(model, arguments=arguments)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[future] = handler
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.get_running_loop().create_task(self.poll())
+        try:
+            return await asyncio.wait_for(future, self.timeout_seconds)
+        except BaseException:
+            # Timed out or cancelled: stop polling the request and cancel it on the fal queue
+            if self.in_flight.pop(future, None) is not None:
+                cancellation = asyncio.get_running_loop().create_task(self.cancel(handler))
+                self.cancellations.add(cancellation)
+                cancellation.add_done_callback(self.cancellations.discard)
+            raise
+
+    async def poll(self) -> None:
+        while self.in_flight:
+            await asyncio.sleep(self.poll_interval_seconds)
+            await asyncio.gather(*(self.check(future, handler) for future, handler in list(self.in_flight.items())))
+
+    async def check(self, future: asyncio.Future, handler) -> None:
+        async with self.poll_semaphore:
+            try:
+                if not isinstance(await handler.status(), Completed):
+                    return
+                result = await handler.get()
+            except Exception as e:
+                self.in_flight.pop(future, None)
+                if not future.done():
+                    future.set_exception(e)
+                return
+
+        self.in_flight.pop(future, None)
+        if not future.done():
+            future.set_result(result)
+
+    async def cancel(self, handler) -> None:
+        try:
+            await handler.cancel()
+        except Exception as e:
+            print(f"⚠ Warning: Could not cancel fal request {getattr(handler, 'request_id', '')}: {e}")
+
+
+fal_image_service = FalImageService()
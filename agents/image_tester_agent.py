@@ -1,52 +1,136 @@
 #%%
-from data.datamodels import ImageValidationResult, SlideContent, ImageValidationWithSlideContent
+import json
+from typing import Any, Dict, List
+from data.datamodels import ImageValidationResult, SlideContent, ImageValidationWithSlideContent, ImageValidationBatch
 from utils.prompts import image_tester_system_message, image_tester_user_message
+from utils.prompts import image_tester_item_message, image_tester_batch_system_message, image_tester_batch_intro_message
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.llm_helper import create_shared_structured_completion, create_batched_structured_completion, get_usage_shares
+from agents.micro_batcher import MicroBatcher, TESTER_BATCHING
+from agents.model_routing import get_model_settings
 
-from anthropic import Anthropic
-import os
-import instructor
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
-anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-client = instructor.from_anthropic(client=anthropic_client, mode=instructor.Mode.ANTHROPIC_JSON)
-
 #%%
 
+def build_image_tester_messages(image_url: str, slide_content : SlideContent) -> list:
+    """Build the messages sent to the image tester agent"""
+    return [
+        {
+            "role": "system",
+            "content": image_tester_system_message,
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": image_tester_user_message.format(slide_onscreen_text = slide_content.slide_onscreen_text,
+                                                             slide_voiceover_text = slide_content.slide_voiceover_text,
+                                                             slide_image_prompt = slide_content.slide_image_prompt),
+                },
+                {
+                    "type": "image",
+                    "source": image_url,
+                },
+            ],
+        }
+    ]
+
+
+def build_image_tester_batch_messages(items: List[Dict[str, Any]]) -> list:
+    """Build the messages of a single tester call evaluating several images, items are numbered from 1"""
+    content = [{"type": "text", "text": image_tester_batch_intro_message.format(item_count = len(items))}]
+    for item_number, item in enumerate(items, 1):
+        content.append({
+            "type": "text",
+            "text": f"Item {item_number}:" + image_tester_item_message.format(slide_onscreen_text = item["slide_content"].slide_onscreen_text,
+                                                                            slide_voiceover_text = item["slide_content"].slide_voiceover_text,
+                                                                            slide_image_prompt = item["slide_content"].slide_image_prompt),
+        })
+        content.append({
+            "type": "image",
+            "source": item["image_url"],
+        })
+
+    return [
+        {
+            "role": "system",
+            "content": image_tester_batch_system_message,
+        },
+        {
+            "role": "user",
+            "content": content,
+        }
+    ]
+
+
+async def send_image_tester_batch(key: str, items: List[Dict[str, Any]]) -> list:
+    """Evaluate a batch of images in one call, returning the result of each item with its share of the usage"""
+
+    image_batch, input_tokens, output_tokens = await create_shared_structured_completion(
+        **json.loads(key),
+        agent="image_tester_batch",
+        messages=build_image_tester_batch_messages(items),
+        response_model=ImageValidationBatch,
+    )
+
+    results = {result.item_number: result for result in image_batch.results}
+    # Items missing from the response are made on their own, the others share the usage
+    answered = [item_number for item_number in range(1, len(items) + 1) if item_number in results]
+    usages = dict(zip(answered, get_usage_shares(input_tokens, output_tokens, len(answered))))
+    return [
+        (ImageValidationResult.model_validate(results[item_number].model_dump(exclude={"item_number"})), usages[item_number])
+        if item_number in results else None
+        for item_number in range(1, len(items) + 1)
+    ]
+
+
+# Combines the image tester calls of concurrent presentations
+image_tester_batcher = MicroBatcher("image_tester", send_image_tester_batch)
+
+
 def call_image_tester_agent(image_url: str, slide_content : SlideContent) -> ImageValidationWithSlideContent:
 
-    AI_Response, completion = client.chat.completions.create_with_completion(
-        model="claude-3-7-sonnet-20250219",        
-        messages=[
-            {
-                "role": "system",
-                "content": image_tester_system_message,
-            },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": image_tester_user_message.format(slide_onscreen_text = slide_content.slide_onscreen_text,
-                                                                 slide_voiceover_text = slide_content.slide_voiceover_text,
-                                                                 slide_image_prompt = slide_content.slide_image_prompt),
-                    },
-                    {
-                        "type": "image",
-                        "source": image_url,
-                    },
-                ],
-            }
-        ],
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("image_tester"),
+        agent="image_tester",
+        messages=build_image_tester_messages(image_url, slide_content),
         autodetect_images=True,
         response_model=ImageValidationResult,  
-        max_tokens=8192,
     )
 
-    input_tokens = completion.usage.input_tokens
-    output_tokens = completion.usage.output_tokens
+    return ImageValidationWithSlideContent( validation_feedback = AI_Response, tested_slide_content = slide_content) , input_tokens, output_tokens
+
+
+async def call_image_tester_agent_async(image_url: str, slide_content : SlideContent) -> ImageValidationWithSlideContent:
+    """
+    Async version of call_image_tester_agent. With TESTER_BATCHING the call may be sent together
+    with the concurrent image tester calls of other presentations, as one multi-image call.
+    """
+
+    messages = build_image_tester_messages(image_url, slide_content)
+    if not TESTER_BATCHING:
+        AI_Response, input_tokens, output_tokens = await create_structured_completion(
+            **get_model_settings("image_tester"),
+            agent="image_tester",
+            messages=messages,
+            autodetect_images=True,
+            response_model=ImageValidationResult,  
+        )
+    else:
+        AI_Response, input_tokens, output_tokens = await create_batched_structured_completion(
+            image_tester_batcher,
+            {"image_url": image_url, "slide_content": slide_content},
+            **get_model_settings("image_tester"),
+            agent="image_tester",
+            messages=messages,
+            autodetect_images=True,
+            response_model=ImageValidationResult,
+        )
 
     return ImageValidationWithSlideContent( validation_feedback = AI_Response, tested_slide_content = slide_content) , input_tokens, output_tokens
 #%%
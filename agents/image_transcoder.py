@@ -0,0 +1,124 @@
+# agents/image_transcoder.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from PIL import Image
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Worker processes the downloaded images are converted in (0 converts them in a thread of the
+# API process), and how many conversions may be handed to the pool at once, running or waiting
+IMAGE_TRANSCODE_WORKERS = int(os.getenv("IMAGE_TRANSCODE_WORKERS", str(os.cpu_count() or 1)))
+IMAGE_TRANSCODE_QUEUE_DEPTH = int(os.getenv("IMAGE_TRANSCODE_QUEUE_DEPTH", str(2 * max(IMAGE_TRANSCODE_WORKERS, 1))))
+
+
+def convert_image_to_jpeg(source_path, local_path):
+    """Convert the downloaded image to an RGB JPEG"""
+    with Image.open(source_path) as img:
+        # Convert to RGB if necessary (handles RGBA, P mode, etc.)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Create white background for transparent images
+            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = rgb_img
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        # Save as JPEG
+        img.save(local_path, 'JPEG', quality=95, optimize=True)
+
+
+def get_worker_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # The fork server imports the entry script once, and this module, so every worker is
+    # forked with both loaded instead of importing them again
+    context.set_forkserver_preload(["__main__", __name__])
+    return context
+
+
+class ImageTranscodeError(Exception):
+    """Raised when the transcoding pool could not convert an image"""
+
+
+class ImageTranscoder:
+    """
+    Converts downloaded images to JPEG in a pool of worker processes, so decoding and
+    re-encoding use every core and never hold the GIL of the API process. Only paths cross
+    the process boundary, the workers read and write the image files themselves.
+
+    At most queue_depth conversions are handed to the pool at once; further callers wait
+    (without blocking the event loop) until one of them is done. The app starts the pool at
+    startup; until it is started (e.g. in scripts) images are converted in a thread.
+
+    The workers never fork the API process, which runs threads whose locks a fork could copy
+    while held: they are forked from a fork server (a single-threaded process started for
+    the purpose), or spawned where there is none.
+    """
+
+    def __init__(self, workers: int = IMAGE_TRANSCODE_WORKERS, queue_depth: int = IMAGE_TRANSCODE_QUEUE_DEPTH):
+        self.workers = workers
+        self.queue_slots = asyncio.Semaphore(queue_depth)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.workers and self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_worker_context())
+
+    def shutdown(self) -> None:
+        pool, self.pool = self.pool, None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def restart(self, broken_pool: ProcessPoolExecutor) -> None:
+        """Replace a pool that broke, unless another caller already replaced it"""
+        with self.lock:
+            if self.pool is not broken_pool:
+                return
+            print("⚠ Warning: Image transcoding pool broke, restarting it")
+            self.pool = None
+            # The futures of a broken pool have failed already, none is left to cancel
+            broken_pool.shutdown(wait=False)
+            self.start()
+
+    async def convert_in_pool(self, pool: ProcessPoolExecutor, source_path: str, local_path: str) -> None:
+        future = asyncio.wrap_future(pool.submit(convert_image_to_jpeg, source_path, local_path))
+        try:
+            # Shielded, so a cancelled conversion can be told apart from a cancelled caller
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            raise ImageTranscodeError("The conversion was cancelled by a shutdown of the transcoding pool")
+
+    async def convert_to_jpeg(self, source_path: str, local_path: str) -> None:
+        if self.pool is None:
+            await asyncio.to_thread(convert_image_to_jpeg, source_path, local_path)
+            return
+
+        async with self.queue_slots:
+            pool = self.pool
+            try:
+                await self.convert_in_pool(pool, source_path, local_path)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for its memory use), start a new pool and try once more
+                self.restart(pool)
+                if self.pool is None:
+                    raise ImageTranscodeError("The transcoding pool was shut down")
+                try:
+                    await self.convert_in_pool(self.pool, source_path, local_path)
+                except BrokenProcessPool as e:
+                    raise ImageTranscodeError(f"The transcoding pool broke again: {e}") from e
+
+
+image_transcoder = ImageTranscoder()
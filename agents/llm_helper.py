@@ -0,0 +1,367 @@
+import json
+import time
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from pydantic_core import from_json
+from agents.clients import provider_clients, PROMPT_CACHING
+from agents.rate_limiter import anthropic_limiter, estimate_message_tokens
+from agents.resilience import call_with_resilience, is_retryable_error
+from agents.call_ledger import record_call, current_call_ledger
+from agents.response_cache import llm_response_cache, response_cache_enabled, make_cache_key
+from agents.wire_schemas import get_wire_schema
+from agents.micro_batcher import MicroBatcher
+
+
+load_dotenv()
+
+
+class TokenUsage:
+    """Token counts of the Anthropic calls made for one presentation, including prompt cache usage"""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+
+    def add(self, usage) -> None:
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cache_read_tokens += getattr(usage, "cache_read_input_tokens", None) or 0
+        self.cache_creation_tokens += getattr(usage, "cache_creation_input_tokens", None) or 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens
+        }
+
+
+# Usage tally of the presentation being generated, inherited by every task it starts
+current_token_usage: ContextVar[Optional[TokenUsage]] = ContextVar("current_token_usage", default=None)
+
+
+def get_completion_cache_key(response_model, messages, kwargs, omitted_fields: Tuple[str, ...] = ()) -> str:
+    """Cache key of a call: responses without some fields only answer calls omitting the same fields"""
+    parts = [response_model.__name__, response_model.model_json_schema(), messages, kwargs]
+    if omitted_fields:
+        parts.append(list(omitted_fields))
+    return make_cache_key(*parts)
+
+
+def get_cached_completion(response_model, cache_key: str):
+    """Return the cached response of an identical earlier call, or None"""
+    if not response_cache_enabled.get():
+        return None
+    cached = llm_response_cache.get(cache_key)
+    return response_model.model_validate(cached["response"]) if cached else None
+
+
+def cache_completion(cache_key: str, AI_Response) -> None:
+    if response_cache_enabled.get():
+        llm_response_cache.set(cache_key, {"response": AI_Response.model_dump(mode="json")})
+
+
+async def get_cached_completion_async(response_model, cache_key: str):
+    """Async version of get_cached_completion, which keeps the disk tier of the cache off the event loop"""
+    if not response_cache_enabled.get():
+        return None
+    cached = await llm_response_cache.aget(cache_key)
+    return response_model.model_validate(cached["response"]) if cached else None
+
+
+async def cache_completion_async(cache_key: str, AI_Response) -> None:
+    if response_cache_enabled.get():
+        await llm_response_cache.aset(cache_key, {"response": AI_Response.model_dump(mode="json")})
+
+
+def get_latency_key(response_model, kwargs, agent: str = None) -> str:
+    """Kind of a call for latency tracking: calls of the same model and agent take similar time"""
+    return f"{kwargs.get('model')}:{agent or response_model.__name__}"
+
+
+def record_completion(response_model, kwargs, agent: str, started_at: float, usage=None,
+                      call_info: Dict[str, Any] = None, cached: bool = False, error: Exception = None) -> None:
+    """Add an Anthropic call to the call ledger of the current presentation"""
+    call_info = call_info or {}
+    record_call(
+        agent=agent or response_model.__name__,
+        provider="anthropic",
+        model=kwargs.get("model"),
+        latency_seconds=time.monotonic() - started_at,
+        input_tokens=usage.input_tokens if usage else 0,
+        output_tokens=usage.output_tokens if usage else 0,
+        retries=call_info.get("retries", 0),
+        hedged=call_info.get("hedged", False),
+        cached=cached,
+        error=f"{type(error).__name__}: {error}" if error else None
+    )
+
+
+def record_reservation_tokens(reservation, usage) -> None:
+    cache_creation_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+    reservation.record_tokens(usage.input_tokens + usage.output_tokens + cache_creation_tokens)
+
+
+def create_structured_completion_sync(response_model, messages, agent: str = None,
+                                      omitted_fields: Tuple[str, ...] = (), **kwargs):
+    """
+    Blocking version of create_structured_completion for scripts and notebooks.
+    It uses the response cache but not the shared rate limits, which belong to the app's event loop.
+    """
+
+    cache_key = get_completion_cache_key(response_model, messages, kwargs, omitted_fields)
+    cached_response = get_cached_completion(response_model, cache_key)
+    if cached_response is not None:
+        return cached_response, 0, 0
+
+    wire_schema = get_wire_schema(response_model, omitted_fields)
+    wire_response, completion = provider_clients.instructor.chat.completions.create_with_completion(
+        messages=wire_schema.add_key_guide(messages),
+        response_model=wire_schema.wire_model,
+        **kwargs
+    )
+    AI_Response = wire_schema.to_model(wire_response)
+    cache_completion(cache_key, AI_Response)
+
+    return AI_Response, completion.usage.input_tokens, completion.usage.output_tokens
+
+
+async def create_structured_completion(response_model, messages, agent: str = None,
+                                      omitted_fields: Tuple[str, ...] = (), **kwargs):
+    """
+    Run a structured Anthropic completion without blocking the event loop.
+    The call waits for room in the shared Anthropic rate limits before it is sent, and its usage
+    (including prompt cache reads and writes) is added to the current token usage tally, if any.
+
+    Responses are cached by model, messages and sampling parameters; an identical call returns
+    the cached response without any tokens, unless the response cache is disabled for the request.
+    The response is requested in the compact wire form of the response model and converted back
+    (see agents.wire_schemas); omitted text fields are not requested at all and left empty.
+    Calls have a timeout, are retried on retryable errors and hedged when they straggle
+    (see agents.resilience). Every call, cached or failed ones included, is added to the call
+    ledger of the current presentation, if any.
+
+    Args:
+        response_model: Pydantic model the response is parsed into
+        messages: Chat messages, including the system message
+        agent: Agent role making the call, for the call ledger and latency tracking
+        omitted_fields: Text fields of the response model the caller does not need
+        **kwargs: Sampling parameters passed on to the API (model, max_tokens, temperature, ...)
+
+    Returns:
+        tuple: Parsed response, input tokens and output tokens
+    """
+
+    started_at = time.monotonic()
+    cache_key = get_completion_cache_key(response_model, messages, kwargs, omitted_fields)
+    cached_response = await get_cached_completion_async(response_model, cache_key)
+    if cached_response is not None:
+        record_completion(response_model, kwargs, agent, started_at, cached=True)
+        return cached_response, 0, 0
+
+    wire_schema = get_wire_schema(response_model, omitted_fields)
+
+    async def request(reservation):
+        wire_response, completion = await provider_clients.async_instructor.chat.completions.create_with_completion(
+            messages=wire_schema.add_key_guide(messages),
+            response_model=wire_schema.wire_model,
+            **kwargs
+        )
+        record_reservation_tokens(reservation, completion.usage)
+        return wire_schema.to_model(wire_response), completion
+
+    call_info = {}
+    try:
+        AI_Response, completion = await call_with_resilience(
+            request, anthropic_limiter, estimate_message_tokens(messages), get_latency_key(response_model, kwargs, agent),
+            call_info=call_info
+        )
+    except Exception as e:
+        record_completion(response_model, kwargs, agent, started_at, call_info=call_info, error=e)
+        raise
+    record_completion(response_model, kwargs, agent, started_at, completion.usage, call_info)
+    input_tokens = completion.usage.input_tokens
+    output_tokens = completion.usage.output_tokens
+
+    token_usage = current_token_usage.get()
+    if token_usage:
+        token_usage.add(completion.usage)
+    await cache_completion_async(cache_key, AI_Response)
+
+    return AI_Response, input_tokens, output_tokens
+
+
+async def create_shared_structured_completion(response_model, messages, agent: str = None, **kwargs):
+    """
+    create_structured_completion for a call made on behalf of several presentations (a batch of
+    agents.micro_batcher). It is left out of the call ledger and token usage of the task making it,
+    every presentation adds its own share instead (see create_batched_structured_completion).
+    """
+    ledger_token = current_call_ledger.set(None)
+    usage_token = current_token_usage.set(None)
+    try:
+        return await create_structured_completion(response_model, messages, agent=agent, **kwargs)
+    finally:
+        current_call_ledger.reset(ledger_token)
+        current_token_usage.reset(usage_token)
+
+
+def get_usage_shares(input_tokens: int, output_tokens: int, item_count: int) -> List[SimpleNamespace]:
+    """
+    Token usage of each item of a batched call: the usage of the call split evenly, with the
+    remainder added to the first item so the shares add up to the usage of the call
+    """
+    return [
+        SimpleNamespace(
+            input_tokens=input_tokens // item_count + (input_tokens % item_count if index == 0 else 0),
+            output_tokens=output_tokens // item_count + (output_tokens % item_count if index == 0 else 0)
+        )
+        for index in range(item_count)
+    ]
+
+
+async def create_batched_structured_completion(batcher: MicroBatcher, batch_item: Any, response_model, messages,
+                                               agent: str = None, **kwargs):
+    """
+    create_structured_completion for calls the batcher may combine with concurrent calls of other
+    presentations into one call. batch_item is what the batcher needs to add the call to a batch,
+    messages are those of the call on its own, which is made when the call is not batched.
+
+    Batched calls are cached as if they were made on their own, and their share of the batch
+    usage is added to the call ledger and token usage of the presentation.
+
+    Returns:
+        tuple: Parsed response, input tokens and output tokens
+    """
+
+    started_at = time.monotonic()
+    cache_key = get_completion_cache_key(response_model, messages, kwargs)
+    cached_response = await get_cached_completion_async(response_model, cache_key)
+    if cached_response is not None:
+        record_completion(response_model, kwargs, agent, started_at, cached=True)
+        return cached_response, 0, 0
+
+    # Only calls with the same model settings share a batch
+    batched = await batcher.submit(json.dumps(kwargs, sort_keys=True, default=str), batch_item)
+    if batched is None:
+        return await create_structured_completion(response_model, messages, agent=agent, **kwargs)
+
+    AI_Response, usage = batched
+    record_completion(response_model, kwargs, agent, started_at, usage)
+    token_usage = current_token_usage.get()
+    if token_usage:
+        token_usage.add(usage)
+    await cache_completion_async(cache_key, AI_Response)
+
+    return AI_Response, usage.input_tokens, usage.output_tokens
+
+
+def build_json_schema_instruction(response_model) -> str:
+    """System prompt suffix asking for a JSON instance of the response model (as instructor's JSON mode does)"""
+    return (
+        "As a genius expert, your task is to understand the content and provide the parsed objects in json "
+        f"that match the following json_schema:\n\n{json.dumps(response_model.model_json_schema(), indent=2, ensure_ascii=False)}"
+        "\n\nMake sure to return an instance of the JSON, not the schema itself"
+    )
+
+
+def parse_partial_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the JSON object streamed so far. Unfinished strings are left out, so every value
+    returned is complete. Returns None while no object can be parsed yet.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    try:
+        return from_json(text[start:], allow_partial=True)
+    except ValueError:
+        # Text after the closing brace (e.g. the end of a code fence)
+        end = text.rfind("}")
+        try:
+            return from_json(text[start:end + 1]) if end > start else None
+        except ValueError:
+            return None
+
+
+async def stream_structured_completion(response_model, messages, on_partial: Callable[[Dict[str, Any]], None], 
+                                       agent: str = None, **kwargs):
+    """
+    Streaming version of create_structured_completion. on_partial is called with the fields parsed
+    so far every time the streamed JSON grows, so callers can use the first items of a response
+    while the rest is still being generated. A cached response is passed to on_partial at once.
+    Streamed calls are never hedged, and only retried as long as nothing was passed to on_partial.
+
+    Args:
+        response_model: Pydantic model the response is parsed into
+        messages: Chat messages, including the system message
+        on_partial: Called with a dict of the (complete) values parsed so far
+        agent: Agent role making the call, for the call ledger and latency tracking
+        **kwargs: Sampling parameters passed on to the API (model, max_tokens, temperature, ...)
+
+    Returns:
+        tuple: Parsed response, input tokens and output tokens
+    """
+
+    started_at = time.monotonic()
+    cache_key = get_completion_cache_key(response_model, messages, kwargs)
+    cached_response = await get_cached_completion_async(response_model, cache_key)
+    if cached_response is not None:
+        record_completion(response_model, kwargs, agent, started_at, cached=True)
+        on_partial(cached_response.model_dump())
+        return cached_response, 0, 0
+
+    wire_schema = get_wire_schema(response_model)
+    wire_messages = wire_schema.add_key_guide(messages)
+    system_message = "\n\n".join(message["content"] for message in wire_messages if message["role"] == "system")
+    system = [{"type": "text", "text": f"{system_message}\n\n{build_json_schema_instruction(wire_schema.wire_model)}".strip()}]
+    if PROMPT_CACHING:
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+    chat_messages = [message for message in messages if message["role"] != "system"]
+
+    streamed = {"partial": False}
+
+    async def request(reservation):
+        text = ""
+        async with provider_clients.async_anthropic_client.messages.stream(
+            system=system,
+            messages=chat_messages,
+            **kwargs
+        ) as stream:
+            async for text_delta in stream.text_stream:
+                text += text_delta
+                partial = parse_partial_json(text)
+                if partial:
+                    streamed["partial"] = True
+                    on_partial(wire_schema.to_model_data(partial))
+            completion = await stream.get_final_message()
+        record_reservation_tokens(reservation, completion.usage)
+        return text, completion
+
+    call_info = {}
+    try:
+        text, completion = await call_with_resilience(
+            request, anthropic_limiter, estimate_message_tokens(messages), get_latency_key(response_model, kwargs, agent),
+            hedge=False, retryable=lambda error: not streamed["partial"] and is_retryable_error(error), call_info=call_info
+        )
+    except Exception as e:
+        record_completion(response_model, kwargs, agent, started_at, call_info=call_info, error=e)
+        raise
+    record_completion(response_model, kwargs, agent, started_at, completion.usage, call_info)
+    input_tokens = completion.usage.input_tokens
+    output_tokens = completion.usage.output_tokens
+
+    token_usage = current_token_usage.get()
+    if token_usage:
+        token_usage.add(completion.usage)
+
+    # The complete response is parsed strictly, a cut off response fails instead of being shortened
+    AI_Response = wire_schema.to_model(wire_schema.wire_model.model_validate_json(text[text.find("{"):text.rfind("}") + 1]))
+    await cache_completion_async(cache_key, AI_Response)
+
+    return AI_Response, input_tokens, output_tokens
@@ -0,0 +1,111 @@
+# agents/micro_batcher.py
+import asyncio
+import contextvars
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from agents.rate_limiter import Tenant, current_tenant
+from agents.response_cache import response_cache_enabled
+
+
+load_dotenv()
+
+# Combine the tester calls of concurrent presentations: calls arriving within the window are
+# sent as one multi-item evaluation call, of at most TESTER_BATCH_MAX_SIZE items
+TESTER_BATCHING = os.getenv("TESTER_BATCHING", "true").lower() == "true"
+TESTER_BATCH_WINDOW_SECONDS = float(os.getenv("TESTER_BATCH_WINDOW_SECONDS", "0.1"))
+TESTER_BATCH_MAX_SIZE = int(os.getenv("TESTER_BATCH_MAX_SIZE", "8"))
+
+
+
+def get_batch_tenant(tenants: List[Tenant]) -> Tenant:
+    """
+    Tenant a batch is made for in the provider limits: a lane of its own for the tenants in it,
+    with their combined weight, so batching never shrinks the share of the tenants it serves
+    """
+    tenants = {tenant.name: tenant for tenant in tenants}
+    if len(tenants) == 1:
+        return next(iter(tenants.values()))
+    return Tenant("batch:" + "+".join(sorted(tenants)), sum(tenant.weight for tenant in tenants.values()))
+
+
+class MicroBatcher:
+    """
+    Collects calls of one kind made by concurrent presentations for a short window and sends
+    them together with send_batch. A batch is sent when the window of its first call ends or
+    when it is full. Only calls with the same key (e.g. the same model settings) share a batch.
+
+    send_batch gets the key and the items of a batch and returns one result per item, in item
+    order. A result of None (e.g. an item missing from the response, or a batch of a single
+    item) tells the caller to make its call on its own; so does a failed batch.
+
+    send_batch runs in a fresh context rather than in that of the caller that opened the batch:
+    it is made for the tenants of all its callers (see get_batch_tenant), and may use the
+    response cache only if every caller in the batch may.
+    """
+
+    def __init__(self, name: str, send_batch: Callable[[str, List[Any]], Awaitable[List[Any]]],
+                 window_seconds: float = TESTER_BATCH_WINDOW_SECONDS, max_size: int = TESTER_BATCH_MAX_SIZE):
+        self.name = name
+        self.send_batch = send_batch
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self.pending: Dict[str, List[Tuple[Any, asyncio.Future, contextvars.Context]]] = {}
+        self.timers: Dict[str, asyncio.TimerHandle] = {}
+        self.tasks = set()
+        self.calls = 0
+        self.batches = 0
+        self.batched_calls = 0
+
+    async def submit(self, key: str, item: Any) -> Optional[Any]:
+        """Add a call to the open batch of its key and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.pending.setdefault(key, [])
+        batch.append((item, future, contextvars.copy_context()))
+        self.calls += 1
+        if len(batch) >= self.max_size:
+            self.flush(key)
+        elif len(batch) == 1:
+            self.timers[key] = loop.call_later(self.window_seconds, self.flush, key, context=contextvars.Context())
+        return await future
+
+    def flush(self, key: str) -> None:
+        batch = self.pending.pop(key, None)
+        timer = self.timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self.send(key, batch), context=contextvars.Context())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def send(self, key: str, batch: List[Tuple[Any, asyncio.Future, contextvars.Context]]) -> None:
+        waiting = [(item, future) for item, future, _ in batch if not future.done()]
+        contexts = [context for _, future, context in batch if not future.done()]
+        current_tenant.set(get_batch_tenant([context.run(current_tenant.get) for context in contexts]))
+        response_cache_enabled.set(all(context.run(response_cache_enabled.get) for context in contexts))
+        if len(waiting) < 2:
+            results = [None] * len(waiting)
+        else:
+            try:
+                results = await self.send_batch(key, [item for item, _ in waiting])
+                self.batches += 1
+                self.batched_calls += sum(result is not None for result in results)
+            except Exception as e:
+                print(f"⚠ Warning: {self.name} batch of {len(waiting)} calls failed, sending them separately: {e}")
+                results = [None] * len(waiting)
+
+        results = list(results) + [None] * (len(waiting) - len(results))
+        for (_, future), result in zip(waiting, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "batches": self.batches,
+            "batched_calls": self.batched_calls,
+            "average_batch_size": round(self.batched_calls / self.batches, 2) if self.batches else None
+        }
@@ -0,0 +1,50 @@
+# agents/model_routing.py
+import os
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+STRONG_MODEL = os.getenv("AGENT_STRONG_MODEL", "claude-3-7-sonnet-20250219")
+FAST_MODEL = os.getenv("AGENT_FAST_MODEL", "claude-3-5-haiku-20241022")
+
+# Model, max_tokens and temperature of each agent role. Agents writing the outline and the
+# slides (including the critics, which revise them) keep the strong model; testers, which only return a score and feedback, and the
+# image prompt fixer use the fast tier. A temperature of None uses the API default.
+AGENT_MODEL_ROUTES: Dict[str, Dict[str, Any]] = {
+    "outline_initial_generator": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "outline_tester": {"model": FAST_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "outline_fixer": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "content_initial_generator": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "content_batch_generator": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "content_tester": {"model": FAST_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "content_fixer": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "image_tester": {"model": FAST_MODEL, "max_tokens": 8192, "temperature": None},
+    "image_fixer": {"model": FAST_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "outline_critic": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+    "content_critic": {"model": STRONG_MODEL, "max_tokens": 8192, "temperature": 0.7},
+}
+
+# Model settings the current request overrides per agent role, inherited by every task it starts
+current_model_overrides: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar("current_model_overrides", default=None)
+
+
+def normalize_model_overrides(agent_models) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Turn the agent_models of a request (settings models or plain dicts) into plain dicts without unset values"""
+    if not agent_models:
+        return None
+    return {
+        role: {key: value for key, value in (settings if isinstance(settings, dict) else settings.model_dump()).items() if value is not None}
+        for role, settings in agent_models.items()
+    }
+
+
+def get_model_settings(role: str) -> Dict[str, Any]:
+    """Return the API parameters (model, max_tokens and temperature) of an agent role for the current request"""
+    settings = dict(AGENT_MODEL_ROUTES[role])
+    settings.update((current_model_overrides.get() or {}).get(role, {}))
+    if settings["temperature"] is None:
+        del settings["temperature"]
+    return settings
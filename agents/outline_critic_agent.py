@@ -0,0 +1,57 @@
+#%%
+from data.datamodels import PresentationOutline, TopicCount, OutlineCritiqueRevision
+from utils.prompts import outline_critic_system_message, outline_critic_user_message
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync
+from agents.model_routing import get_model_settings
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def build_outline_critic_messages(topic_count: TopicCount, previous_outline: PresentationOutline) -> list:
+    """Build the messages sent to the outline critic agent"""
+
+    previous_outline_text = '\n'.join(
+        f"{i+1}. {slide.slide_title}\n   Focus: {slide.slide_focus}"
+        for i, slide in enumerate(previous_outline.slide_outlines)
+    )
+
+    return [
+        {
+            "role": "system",
+            "content": outline_critic_system_message
+        },
+        {
+            "role": "user",
+            "content": outline_critic_user_message.format(presentation_topic=topic_count.presentation_topic,
+                                                          presentation_title=previous_outline.presentation_title,
+                                                          previous_outline_text=previous_outline_text,
+                                                          slide_count=len(previous_outline.slide_outlines))
+        }
+    ]
+
+
+def call_outline_critic_agent(topic_count: TopicCount, previous_outline: PresentationOutline) -> OutlineCritiqueRevision:
+    """Function to evaluate an outline and revise it in a single call (tester and fixer combined)"""
+
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("outline_critic"),
+        agent="outline_critic",
+        messages=build_outline_critic_messages(topic_count, previous_outline),
+        response_model=OutlineCritiqueRevision,
+        top_p=1,
+    )
+
+    return AI_Response, input_tokens, output_tokens
+
+
+async def call_outline_critic_agent_async(topic_count: TopicCount, previous_outline: PresentationOutline) -> OutlineCritiqueRevision:
+    """Async version of call_outline_critic_agent"""
+
+    return await create_structured_completion(
+        **get_model_settings("outline_critic"),
+        agent="outline_critic",
+        messages=build_outline_critic_messages(topic_count, previous_outline),
+        response_model=OutlineCritiqueRevision,
+        top_p=1,
+    )
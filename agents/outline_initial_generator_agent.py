@@ -1,40 +1,88 @@
 #%%
-from data.datamodels import PresentationOutline, TopicCount
+from typing import Callable
+from data.datamodels import PresentationOutline, SlideOutline, TopicCount
 from utils.prompts import outline_initial_generator_system_message, outline_initial_generator_user_message
+from agents.llm_helper import create_structured_completion, create_structured_completion_sync, stream_structured_completion
+from agents.model_routing import get_model_settings
 
-import os, instructor
-from anthropic import Anthropic
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def build_outline_initial_generator_messages(topic_count: TopicCount) -> list:
+    """Build the messages sent to the initial outline generator agent"""
+    return [
+        {
+            "role": "system",
+            "content": outline_initial_generator_system_message
+        },
+        {
+            "role": "user",
+            "content": outline_initial_generator_user_message.format(presentation_topic=topic_count.presentation_topic, 
+                                                                     slide_count=topic_count.slide_count)
+        }
+    ]
+
+
 def call_outline_initial_generator_agent(topic_count: TopicCount) -> PresentationOutline:
     """Function to call the initial outline generator agent"""
 
-    anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-    client = instructor.from_anthropic(client=anthropic_client, mode=instructor.Mode.ANTHROPIC_JSON)
+    AI_Response, input_tokens, output_tokens = create_structured_completion_sync(
+        **get_model_settings("outline_initial_generator"),
+        agent="outline_initial_generator",
+        messages=build_outline_initial_generator_messages(topic_count),
+        response_model=PresentationOutline,
+        top_p=1,
+    )
     
-    AI_Response, completion = client.chat.completions.create_with_completion(
-        model="claude-3-7-sonnet-20250219",
-        messages=[
-            {
-                "role": "system",
-                "content": outline_initial_generator_system_message
-            },
-            {
-                "role": "user",
-                "content": outline_initial_generator_user_message.format(presentation_topic=topic_count.presentation_topic, 
-                                                                         slide_count=topic_count.slide_count)
-            }
-        ],
+    return AI_Response, input_tokens, output_tokens
+
+
+async def call_outline_initial_generator_agent_async(topic_count: TopicCount) -> PresentationOutline:
+    """Async version of call_outline_initial_generator_agent"""
+
+    return await create_structured_completion(
+        **get_model_settings("outline_initial_generator"),
+        agent="outline_initial_generator",
+        messages=build_outline_initial_generator_messages(topic_count),
         response_model=PresentationOutline,
-        temperature=0.7,
-        max_tokens=8192,
         top_p=1,
     )
 
-    input_tokens = completion.usage.input_tokens
-    output_tokens = completion.usage.output_tokens
-    
+
+async def stream_outline_initial_generator_agent_async(topic_count: TopicCount, 
+                                                       on_presentation_title: Callable[[str], None], 
+                                                       on_slide_outline: Callable[[int, SlideOutline], None]) -> PresentationOutline:
+    """
+    Streaming version of call_outline_initial_generator_agent_async. on_presentation_title is
+    called with the title as soon as it is parsed, and on_slide_outline with the number and
+    outline of each slide as soon as it is complete, while later slides are still generated.
+    """
+    reported = {"title": False, "slides": 0}
+
+    def report(presentation_title, slide_outlines, complete_slides):
+        if presentation_title and not reported["title"]:
+            reported["title"] = True
+            on_presentation_title(presentation_title)
+        while reported["title"] and reported["slides"] < complete_slides:
+            on_slide_outline(reported["slides"] + 1, SlideOutline.model_validate(slide_outlines[reported["slides"]]))
+            reported["slides"] += 1
+
+    def on_partial_outline(partial_outline):
+        slide_outlines = partial_outline.get("slide_outlines") or []
+        # A slide is complete once the next one has started
+        report(partial_outline.get("presentation_title"), slide_outlines, len(slide_outlines) - 1)
+
+    AI_Response, input_tokens, output_tokens = await stream_structured_completion(
+        **get_model_settings("outline_initial_generator"),
+        agent="outline_initial_generator",
+        messages=build_outline_initial_generator_messages(topic_count),
+        response_model=PresentationOutline,
+        on_partial=on_partial_outline,
+        top_p=1,
+    )
+    outline = AI_Response.model_dump()
+    report(outline["presentation_title"], outline["slide_outlines"], len(outline["slide_outlines"]))
+
     return AI_Response, input_tokens, output_tokens
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import NamedTuple
+from dotenv import load_dotenv
+from utils.fair_queue import WeightedFairQueue
+
+
+load_dotenv()
+
+
+class Tenant(NamedTuple):
+    """Organization or client that provider calls are made for, with its fair share weight"""
+    name: str
+    weight: float = 1.0
+
+
+# Tenant of the presentation being generated, inherited by every task it starts
+current_tenant: ContextVar[Tenant] = ContextVar("current_tenant", default=Tenant("default"))
+
+
+class TokenBucket:
+    """Budget that refills continuously up to its per-minute capacity"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.available = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken from the bucket"""
+        self.refill()
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_rate
+
+    def take(self, amount: float):
+        self.refill()
+        self.available -= amount
+
+
+class Reservation:
+    """Budget taken for one provider call, corrected with the real usage once it is known"""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens = None
+
+    def record_tokens(self, actual_tokens: int):
+        self.actual_tokens = actual_tokens
+
+
+class ProviderLimiter:
+    """
+    Shared limiter for one provider: a concurrency cap plus request-per-minute and
+    token-per-minute budgets. Limits of 0 disable the corresponding check.
+
+    Callers are admitted one at a time, so a call waits for its turn instead of failing with
+    a 429. Turns are handed out weighted-fair across tenants (by estimated tokens) and in
+    arrival order within a tenant, so a tenant with many large calls cannot starve the others
+    and no caller can be overtaken by later, smaller calls of the same tenant.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 0, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.waiting = WeightedFairQueue()
+        self.admitting = False
+
+    async def wait_for_turn(self, estimated_tokens: int):
+        tenant = current_tenant.get()
+        turn = asyncio.get_running_loop().create_future()
+        self.waiting.push(tenant.name, turn, tenant.weight, cost=max(estimated_tokens, 1))
+        if not self.admitting:
+            self.pass_turn()
+
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.cancelled():
+                self.waiting.remove(tenant.name, turn)
+            else:
+                # The turn was handed over right as the caller was cancelled
+                self.pass_turn()
+            raise
+
+    def pass_turn(self):
+        """Admit the next waiting caller, if any"""
+        next_turn = self.waiting.pop()
+        self.admitting = next_turn is not None
+        if next_turn:
+            next_turn[1].set_result(None)
+
+    async def wait_for_budget(self, estimated_tokens: int):
+        while True:
+            wait_time = 0.0
+            if self.request_bucket:
+                wait_time = max(wait_time, self.request_bucket.wait_time(1))
+            if self.token_bucket:
+                wait_time = max(wait_time, self.token_bucket.wait_time(estimated_tokens))
+            if wait_time <= 0:
+                break
+            await asyncio.sleep(wait_time)
+
+        if self.request_bucket:
+            self.request_bucket.take(1)
+        if self.token_bucket:
+            self.token_bucket.take(estimated_tokens)
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait until the provider has room for one more call of about `estimated_tokens` tokens"""
+        if self.token_bucket:
+            # A single call can never need more than a full minute of budget
+            estimated_tokens = min(estimated_tokens, self.token_bucket.capacity)
+        reservation = Reservation(estimated_tokens)
+
+        # Only the caller whose turn it is waits for budget, the others wait for their turn
+        await self.wait_for_turn(estimated_tokens)
+        try:
+            if self.semaphore:
+                await self.semaphore.acquire()
+            try:
+                await self.wait_for_budget(estimated_tokens)
+            except BaseException:
+                if self.semaphore:
+                    self.semaphore.release()
+                raise
+        finally:
+            self.pass_turn()
+
+        try:
+            yield reservation
+        finally:
+            if self.semaphore:
+                self.semaphore.release()
+            if self.token_bucket and reservation.actual_tokens is not None:
+                # Give back an overestimate, or charge what the estimate missed
+                self.token_bucket.take(reservation.actual_tokens - reservation.estimated_tokens)
+
+
+# Approximate input tokens of a landscape slide image
+IMAGE_TOKEN_ESTIMATE = 1600
+
+
+def estimate_message_tokens(messages: list) -> int:
+    """Rough input token estimate of chat messages (4 characters per token)"""
+    tokens = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            tokens += len(content) // 4
+            continue
+        for block in content:
+            if block.get("type") == "image":
+                tokens += IMAGE_TOKEN_ESTIMATE
+            else:
+                tokens += len(block.get("text", "")) // 4
+    return tokens
+
+
+anthropic_limiter = ProviderLimiter(
+    "anthropic",
+    max_concurrency=int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "20")),
+    requests_per_minute=int(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "50")),
+    tokens_per_minute=int(os.getenv("ANTHROPIC_TOKENS_PER_MINUTE", "80000")),
+)
+
+# Limits the submissions to the fal queue, the images themselves are awaited by FalImageService
+fal_limiter = ProviderLimiter(
+    "fal",
+    max_concurrency=int(os.getenv("FAL_MAX_CONCURRENCY", "10")),
+    requests_per_minute=int(os.getenv("FAL_REQUESTS_PER_MINUTE", "0")),
+)
+
+elevenlabs_limiter = ProviderLimiter(
+    "elevenlabs",
+    max_concurrency=int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "5")),
+    requests_per_minute=int(os.getenv("ELEVENLABS_REQUESTS_PER_MINUTE", "0")),
+)
@@ -0,0 +1,182 @@
+# agents/resilience.py
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import anthropic
+import httpx
+from dotenv import load_dotenv
+from agents.rate_limiter import ProviderLimiter, Reservation
+
+
+load_dotenv()
+
+# Time a single provider call may take once it is admitted by the limiter
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "180"))
+
+# Retries of a failed call, waiting a random (full jitter) part of an exponentially growing delay
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY_SECONDS = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "1"))
+LLM_RETRY_MAX_DELAY_SECONDS = float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "30"))
+
+# Send a duplicate (hedge) of a call that runs longer than the p95 latency of its kind,
+# once that many latencies of the kind have been observed
+LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LATENCY_WINDOW = 200
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors (incl. overloaded)
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Recent latencies of each kind of provider call (e.g. model and response model)"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.latencies: Dict[str, deque] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        self.latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """Return a percentile of the recent latencies of a kind, or None without enough samples"""
+        latencies = self.latencies.get(key)
+        if not latencies or len(latencies) < min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+latency_tracker = LatencyTracker()
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Whether a failed call may succeed when sent again: timeouts, connection errors and
+    retryable HTTP statuses. Wrapped errors (e.g. instructor's retry exception) are unwrapped.
+    """
+    while error is not None:
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError, anthropic.APIConnectionError, httpx.TransportError)):
+            return True
+        status_code = getattr(error, "status_code", None)
+        if status_code is not None:
+            return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+        error = error.__cause__
+    return False
+
+
+def get_retry_after(error: BaseException) -> float:
+    """Seconds the provider asked to wait before retrying (the retry-after header), or 0"""
+    while error is not None:
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return 0.0
+        error = error.__cause__
+    return 0.0
+
+
+def get_retry_delay(retry_number: int, error: BaseException) -> float:
+    delay = random.uniform(0, min(LLM_RETRY_MAX_DELAY_SECONDS, LLM_RETRY_BASE_DELAY_SECONDS * 2 ** retry_number))
+    return max(delay, get_retry_after(error))
+
+
+async def call_once(request: Callable[[Reservation], Awaitable[T]], limiter: Optional[ProviderLimiter],
+                    estimated_tokens: int, latency_key: str, admitted: asyncio.Event = None) -> T:
+    """
+    Send one call within the provider limits and the call timeout, and record its latency.
+    Without a limiter the request applies the provider limits itself.
+    """
+    admission = limiter.acquire(estimated_tokens) if limiter else nullcontext(Reservation(estimated_tokens))
+    async with admission as reservation:
+        if admitted:
+            admitted.set()
+        started_at = time.monotonic()
+        result = await asyncio.wait_for(request(reservation), LLM_CALL_TIMEOUT_SECONDS)
+        latency_tracker.record(latency_key, time.monotonic() - started_at)
+        return result
+
+
+async def call_hedged(request: Callable[[Reservation], Awaitable[T]], limiter: Optional[ProviderLimiter],
+                      estimated_tokens: int, latency_key: str, call_info: Dict[str, Any] = None) -> T:
+    """
+    Send a call, and a duplicate of it if it is still running past the p95 latency of its kind
+    (counted from its admission, not from the time waiting for the limiter). The first call to
+    succeed wins and the other is cancelled. The hedge waits for the same provider limits.
+    """
+    hedge_delay = latency_tracker.percentile(latency_key, 0.95, LLM_HEDGE_MIN_SAMPLES)
+    if hedge_delay is None:
+        return await call_once(request, limiter, estimated_tokens, latency_key)
+
+    admitted = asyncio.Event()
+    calls = {asyncio.create_task(call_once(request, limiter, estimated_tokens, latency_key, admitted))}
+    admitted_wait = asyncio.create_task(admitted.wait())
+    try:
+        await asyncio.wait(calls | {admitted_wait}, return_when=asyncio.FIRST_COMPLETED)
+        done, _ = await asyncio.wait(calls, timeout=hedge_delay)
+        if not done:
+            print(f"Hedging {latency_key} call, still running after the p95 latency of {hedge_delay:.1f}s")
+            if call_info is not None:
+                call_info["hedged"] = True
+            calls.add(asyncio.create_task(call_once(request, limiter, estimated_tokens, latency_key)))
+
+        error = None
+        pending = calls
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    return call.result()
+                error = call.exception()
+        raise error
+    finally:
+        admitted_wait.cancel()
+        for call in calls:
+            if not call.done():
+                call.cancel()
+            elif not call.cancelled():
+                # A losing call that failed, its error is not needed
+                call.exception()
+
+
+async def call_with_resilience(request: Callable[[Reservation], Awaitable[T]], limiter: Optional[ProviderLimiter],
+                               estimated_tokens: int, latency_key: str, hedge: bool = LLM_HEDGING,
+                               retryable: Callable[[BaseException], bool] = is_retryable_error,
+                               call_info: Dict[str, Any] = None) -> T:
+    """
+    Send a provider call with the shared policy of every agent: each attempt waits for room in
+    the provider limits and then has LLM_CALL_TIMEOUT_SECONDS to finish; retryable failures
+    are retried up to LLM_MAX_RETRIES times after a jittered exponential delay; and with
+    hedging, a straggling attempt gets a duplicate (see call_hedged).
+
+    Args:
+        request: Makes the call, recording its real token usage on the limiter reservation
+        limiter: Limiter of the provider, or None when the request waits for the limits itself
+        estimated_tokens: Token estimate of the call for the limiter
+        latency_key: Kind of the call, latencies of the same kind set the hedging delay
+        hedge: Whether straggling attempts get a duplicate
+        retryable: Whether a failed attempt may be retried
+        call_info: Updated with the number of retries and whether the call was hedged
+    """
+    for retry_number in range(LLM_MAX_RETRIES + 1):
+        try:
+            if hedge:
+                return await call_hedged(request, limiter, estimated_tokens, latency_key, call_info)
+            return await call_once(request, limiter, estimated_tokens, latency_key)
+        except Exception as e:
+            if retry_number == LLM_MAX_RETRIES or not retryable(e):
+                raise
+            delay = get_retry_delay(retry_number, e)
+            if call_info is not None:
+                call_info["retries"] = retry_number + 1
+            print(f"⚠ Warning: {latency_key} call failed ({type(e).__name__}: {e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from agents.clients import AGENT_BACKEND
+
+
+load_dotenv()
+
+RESPONSE_CACHE_DIRECTORY = os.getenv("RESPONSE_CACHE_DIRECTORY", "_outputs/cache")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Generated image URLs are only hosted for a limited time
+IMAGE_CACHE_TTL_SECONDS = float(os.getenv("IMAGE_CACHE_TTL_SECONDS", str(24 * 3600)))
+# Size of the disk tier of each cache; expired entries are deleted, and the oldest ones while the
+# tier is larger, every RESPONSE_CACHE_SWEEP_INTERVAL_SECONDS
+RESPONSE_CACHE_MAX_DISK_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_DISK_BYTES", str(512 * 1024 * 1024)))
+RESPONSE_CACHE_SWEEP_INTERVAL_SECONDS = float(os.getenv("RESPONSE_CACHE_SWEEP_INTERVAL_SECONDS", "3600"))
+
+# Whether agent calls of the current request may use cached responses
+response_cache_enabled: ContextVar[bool] = ContextVar("response_cache_enabled", default=True)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Content address of a call: the hash of everything that determines its response"""
+    if AGENT_BACKEND != "live":
+        # Responses of a fake backend must never answer live calls
+        parts = (AGENT_BACKEND, *parts)
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache of provider responses by content address, with a bounded in-memory LRU tier in
+    front of a persistent on-disk tier (one JSON file per entry). Entries expire after
+    ttl_seconds in both tiers. Without a directory only the memory tier is used.
+
+    The disk tier is kept to max_disk_bytes by sweep_disk, which the app runs periodically.
+    Async callers use aget and aset, which read and write the disk tier in a thread so the
+    event loop is never blocked on file I/O.
+    """
+
+    def __init__(self, name: str, directory: Optional[str], max_entries: int, ttl_seconds: float,
+                 max_disk_bytes: int = RESPONSE_CACHE_MAX_DISK_BYTES):
+        self.name = name
+        self.directory = os.path.join(directory, name) if directory else None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def is_expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def get_from_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry and not self.is_expired(entry):
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry["value"]
+        self.entries.pop(key, None)
+        return None
+
+    def remember_from_disk(self, key: str, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if entry:
+            self.remember(key, entry)
+            self.disk_hits += 1
+            return entry["value"]
+        self.misses += 1
+        return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value of a key, or None"""
+        value = self.get_from_memory(key)
+        if value is not None:
+            return value
+        return self.remember_from_disk(key, self.read_from_disk(key))
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Async version of get, reading the disk tier in a thread"""
+        value = self.get_from_memory(key)
+        if value is not None:
+            return value
+        entry = await asyncio.to_thread(self.read_from_disk, key) if self.directory else None
+        return self.remember_from_disk(key, entry)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        entry = {"created_at": time.time(), "value": value}
+        self.remember(key, entry)
+        self.write_to_disk(key, entry)
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        """Async version of set, writing the disk tier in a thread"""
+        entry = {"created_at": time.time(), "value": value}
+        self.remember(key, entry)
+        if self.directory:
+            await asyncio.to_thread(self.write_to_disk, key, entry)
+
+    def remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def read_from_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.directory:
+            return None
+
+        path = self.get_path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.is_expired(entry):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def write_to_disk(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self.directory:
+            return
+
+        path = self.get_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a half written entry
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            print(f"⚠ Warning: Could not write {self.name} cache entry: {e}")
+
+    def sweep_disk(self) -> int:
+        """
+        Delete the expired entries of the disk tier (and temporary files left behind by a crash),
+        then the oldest entries until the tier fits in max_disk_bytes. Returns how many were deleted.
+        """
+        if not self.directory or not os.path.isdir(self.directory):
+            return 0
+
+        entries = []
+        deleted = 0
+        now = time.time()
+        for directory, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                    # Entries are never rewritten, so the modification time is their creation time
+                    if now - stat.st_mtime > self.ttl_seconds:
+                        os.remove(path)
+                        deleted += 1
+                    elif file_name.endswith(".json"):
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                except OSError:
+                    # Deleted meanwhile, e.g. by a read of the expired entry
+                    continue
+
+        disk_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                deleted += 1
+            except OSError:
+                pass
+            disk_bytes -= size
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self.entries),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None
+        }
+
+
+llm_response_cache = ResponseCache("llm", RESPONSE_CACHE_DIRECTORY, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+image_response_cache = ResponseCache("images", RESPONSE_CACHE_DIRECTORY, RESPONSE_CACHE_MAX_ENTRIES, IMAGE_CACHE_TTL_SECONDS)
+
+
+async def sweep_response_caches():
+    """Sweep the disk tier of every cache every RESPONSE_CACHE_SWEEP_INTERVAL_SECONDS until the app shuts down"""
+    while True:
+        for cache in (llm_response_cache, image_response_cache):
+            try:
+                deleted = await asyncio.to_thread(cache.sweep_disk)
+                if deleted:
+                    print(f"Deleted {deleted} {cache.name} cache entries")
+            except Exception as e:
+                print(f"⚠ Warning: Could not sweep {cache.name} cache: {e}")
+        await asyncio.sleep(RESPONSE_CACHE_SWEEP_INTERVAL_SECONDS)
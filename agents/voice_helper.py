@@ -1,10 +1,14 @@
 from elevenlabs import VoiceSettings
 # from data.datamodels import Persona
-from elevenlabs.client import ElevenLabs
 from elevenlabs import VoiceSettings
 from pydub import AudioSegment
 import os
 from dotenv import load_dotenv
+from agents.clients import provider_clients
+from agents.rate_limiter import elevenlabs_limiter
+from agents.call_ledger import record_call
+from agents.resilience import call_with_resilience
+import time
 
 load_dotenv()
 
@@ -46,7 +50,7 @@ def create_clean_audio_directory(directory_name: str):
 def ensure_directory_exists(directory_path):
     """Create the directory if it doesn't exist."""
     if not os.path.exists(directory_path):
-        os.makedirs(directory_path)
+        os.makedirs(directory_path, exist_ok=True)
         print(f"Created directory: {directory_path}")
     else:
         print(f"Directory already exists: {directory_path}")
@@ -111,9 +115,7 @@ def generate_speech_with_elevenlabs(
 
 
     try:
-        client = ElevenLabs(api_key=ELEVENLABS_API_KEY)
-
-        response = client.text_to_speech.convert(
+        response = provider_clients.elevenlabs.text_to_speech.convert(
             voice_id=elevenlabs_voice_id,
             optimize_streaming_latency="0", 
             output_format="mp3_22050_32",
@@ -139,4 +141,62 @@ def generate_speech_with_elevenlabs(
 
     except Exception as e:
         print(f"Error occured while generating speech: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+
+async def generate_speech_with_elevenlabs_async(
+                                    elevenlabs_voice_id: str, 
+                                    slide_voiceover_text: str,
+                                    host_voice_settings: VoiceSettings, 
+                                    output_file_name: str, output_directory: str = None) -> bool:
+    """
+    Async version of generate_speech_with_elevenlabs, the audio is streamed without blocking the event loop.
+    The call waits for room in the shared ElevenLabs rate limits before it is sent, is retried and
+    hedged like every agent call (see agents.resilience), and is added to the call ledger of the
+    current presentation.
+    
+    Returns:
+        bool: True if speech generation and saving was successful, False otherwise.
+    """
+
+    started_at = time.monotonic()
+
+    async def request(reservation):
+        response = provider_clients.async_elevenlabs.text_to_speech.convert(
+            voice_id=elevenlabs_voice_id,
+            optimize_streaming_latency="0", 
+            output_format="mp3_22050_32",
+            text=slide_voiceover_text,
+            model_id=DEFAULT_ELEVENLABS_MODEL,
+            voice_settings=host_voice_settings,
+        )
+        # Kept in memory until the attempt succeeded, a hedged duplicate must not write the same file
+        return b"".join([chunk async for chunk in response if chunk])
+
+    call_info = {}
+    try:
+        audio = await call_with_resilience(request, elevenlabs_limiter, 0, f"{DEFAULT_ELEVENLABS_MODEL}:voiceover",
+                                           call_info=call_info)
+
+        # Use the provided output_directory or default to AUDIO_OUTPUT_DIRECTORY
+        if output_directory is None:
+            output_directory = AUDIO_OUTPUT_DIRECTORY
+        else:
+            ensure_directory_exists(output_directory)
+
+        output_file_path = os.path.join(output_directory, f"{output_file_name}.mp3")
+
+        with open(output_file_path, "wb") as f:
+            f.write(audio)
+        
+        record_call(agent="voiceover", provider="elevenlabs", model=DEFAULT_ELEVENLABS_MODEL,
+                    latency_seconds=time.monotonic() - started_at, retries=call_info.get("retries", 0),
+                    hedged=call_info.get("hedged", False))
+        return True
+
+    except Exception as e:
+        print(f"Error occured while generating speech: {str(e)}")
+        record_call(agent="voiceover", provider="elevenlabs", model=DEFAULT_ELEVENLABS_MODEL,
+                    latency_seconds=time.monotonic() - started_at, retries=call_info.get("retries", 0),
+                    hedged=call_info.get("hedged", False), error=f"{type(e).__name__}: {e}")
+        return False
@@ -0,0 +1,169 @@
+# agents/wire_schemas.py
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, get_args, get_origin
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Send agents compact wire schemas (short keys, no descriptions in the schema, no single-field
+# wrapper objects) instead of the full response models, see WireSchema
+LEAN_SCHEMAS = os.getenv("LEAN_SCHEMAS", "true").lower() == "true"
+
+# Short wire key of each response model field, fields not listed keep their name
+WIRE_KEYS = {
+    "presentation_title": "title",
+    "slide_outlines": "slides",
+    "slide_title": "title",
+    "slide_focus": "focus",
+    "slide_number": "number",
+    "slide_contents": "slides",
+    "slide_onscreen_text": "lines",
+    "slide_voiceover_text": "voiceover",
+    "slide_image_prompt": "image_prompt",
+    "revised_outline": "outline",
+    "revised_content": "content",
+}
+
+# Fields left out of the content of presentations without a voiceover
+VOICEOVER_FIELDS = ("slide_voiceover_text",)
+
+
+def drop_property_titles(schema: Dict[str, Any]) -> None:
+    """Leave the generated property titles out of the wire schema, the keys say the same"""
+    for property_schema in schema.get("properties", {}).values():
+        property_schema.pop("title", None)
+
+
+def is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def get_wrapped_field(model) -> Optional[str]:
+    """Name of the only field of a wrapper model (e.g. OnscreenText.text_list), which is sent unwrapped"""
+    return next(iter(model.model_fields)) if len(model.model_fields) == 1 else None
+
+
+class WireSchema:
+    """
+    Compact wire form of a response model. Fields get the short keys of WIRE_KEYS, wrapper
+    models with a single field are replaced by that field's value (a slide's onscreen text is
+    a plain list of lines), and the field descriptions move out of the schema into a key guide
+    added to the system prompt, where they are part of the cached prompt prefix. Responses
+    are parsed into the wire model and converted back into the response model.
+
+    Text fields a job does not need (omitted_fields, at any depth) are not requested at all
+    and are empty in the converted response. With LEAN_SCHEMAS off and no omitted fields the
+    wire model is the response model itself.
+    """
+
+    def __init__(self, model, omitted_fields: Tuple[str, ...] = ()):
+        self.model = model
+        self.lean = LEAN_SCHEMAS
+        self.omitted_fields = omitted_fields
+        self.converted = self.lean or bool(omitted_fields)
+        self.wire_model = self.build_wire_model(model) if self.converted else model
+        self.key_guide = "\n".join(self.build_key_guide(model)) if self.lean else ""
+
+    def get_key(self, name: str) -> str:
+        return WIRE_KEYS.get(name, name) if self.lean else name
+
+    def get_unwrapped_field(self, model) -> Optional[str]:
+        return get_wrapped_field(model) if self.lean else None
+
+    def build_wire_annotation(self, annotation):
+        if get_origin(annotation) in (list, List):
+            return List[self.build_wire_annotation(get_args(annotation)[0])]
+        if is_model(annotation):
+            wrapped_field = self.get_unwrapped_field(annotation)
+            if wrapped_field:
+                return self.build_wire_annotation(annotation.model_fields[wrapped_field].annotation)
+            return self.build_wire_model(annotation)
+        return annotation
+
+    def build_wire_model(self, model):
+        if self.lean:
+            return create_model(
+                f"{model.__name__}Wire",
+                __config__=ConfigDict(json_schema_extra=drop_property_titles),
+                **{
+                    self.get_key(name): (self.build_wire_annotation(field.annotation), ...)
+                    for name, field in model.model_fields.items() if name not in self.omitted_fields
+                }
+            )
+        return create_model(
+            f"{model.__name__}Wire",
+            **{
+                name: (self.build_wire_annotation(field.annotation), Field(..., description=field.description))
+                for name, field in model.model_fields.items() if name not in self.omitted_fields
+            }
+        )
+
+    def build_key_guide(self, model, indent: str = "") -> List[str]:
+        lines = []
+        for name, field in model.model_fields.items():
+            if name in self.omitted_fields:
+                continue
+            annotation = field.annotation
+            if get_origin(annotation) in (list, List):
+                annotation = get_args(annotation)[0]
+            description = field.description
+            if not description and is_model(annotation) and get_wrapped_field(annotation):
+                description = annotation.model_fields[get_wrapped_field(annotation)].description
+            # The full field name as well, the agent instructions refer to fields by it
+            key = f"{WIRE_KEYS[name]} ({name})" if name in WIRE_KEYS else name
+            lines.append(f"{indent}- {key}: {description or name}")
+            if is_model(annotation) and not get_wrapped_field(annotation):
+                lines.extend(self.build_key_guide(annotation, indent + "  "))
+        return lines
+
+    def add_key_guide(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Messages with the key guide added to the system message"""
+        if not self.lean:
+            return messages
+        guide = f"Keys of the JSON response and what each holds:\n{self.key_guide}"
+        for index, message in enumerate(messages):
+            if message["role"] == "system":
+                return messages[:index] + [{**message, "content": f"{message['content']}\n\n{guide}"}] + messages[index + 1:]
+        return [{"role": "system", "content": guide}] + messages
+
+    def to_model_data(self, wire_data: Dict[str, Any], model=None) -> Dict[str, Any]:
+        """
+        Convert (possibly partial) wire data into response model data, keys missing from
+        the wire data are left out
+        """
+        model = model or self.model
+        if not self.converted:
+            return wire_data
+        data = {}
+        for name, field in model.model_fields.items():
+            key = self.get_key(name)
+            if name in self.omitted_fields:
+                data[name] = ""
+            elif key in wire_data:
+                data[name] = self.to_field_data(field.annotation, wire_data[key])
+        return data
+
+    def to_field_data(self, annotation, value):
+        if get_origin(annotation) in (list, List):
+            if not isinstance(value, list):
+                return value
+            return [self.to_field_data(get_args(annotation)[0], item) for item in value]
+        if is_model(annotation):
+            wrapped_field = self.get_unwrapped_field(annotation)
+            if wrapped_field:
+                return {wrapped_field: self.to_field_data(annotation.model_fields[wrapped_field].annotation, value)}
+            return self.to_model_data(value, annotation) if isinstance(value, dict) else value
+        return value
+
+    def to_model(self, wire_response: BaseModel) -> BaseModel:
+        if not self.converted:
+            return wire_response
+        return self.model.model_validate(self.to_model_data(wire_response.model_dump()))
+
+
+@lru_cache(maxsize=None)
+def get_wire_schema(model, omitted_fields: Tuple[str, ...] = ()) -> WireSchema:
+    return WireSchema(model, omitted_fields)
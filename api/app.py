@@ -1,5 +1,10 @@
 # api/app.py
 from fastapi import FastAPI
+from agents.clients import provider_clients
+from agents.image_transcoder import image_transcoder
+from agents.response_cache import sweep_response_caches
+from typing import Optional
+import asyncio
 from dotenv import load_dotenv
 import os
 import json
@@ -14,10 +19,32 @@ IMAGE_THRESHOLD_SCORE = 0
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
 SOURCE_DOCUMENT_DIRECTORY = "source_documents"
+CHECKPOINT_DIRECTORY = "_outputs/checkpoints"
 MAXIMUM_FILE_SIZE = 10 * 1024 * 1024 # 10MB
 MAXIMUM_TEXT_LENGTH = 80000 # 80000 characters
 MINIMUM_TEXT_LENGTH = 3500 # 3500 characters
 
+# Checkpoints of failed presentations that were not resumed for this long are deleted, with their
+# images and audio; expired checkpoints are looked for every CHECKPOINT_SWEEP_INTERVAL_SECONDS
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+CHECKPOINT_SWEEP_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "3600"))
+
+# Maximum number of slide stages (content, image, voiceover) running at the same time for a single presentation
+MAX_CONCURRENT_STAGES = int(os.getenv("MAX_CONCURRENT_STAGES", "8"))
+
+# Number of workers generating queued presentations and the maximum number of waiting jobs
+PRESENTATION_WORKER_COUNT = int(os.getenv("PRESENTATION_WORKER_COUNT", "4"))
+MAX_QUEUED_PRESENTATIONS = int(os.getenv("MAX_QUEUED_PRESENTATIONS", "100"))
+
+# Fair share of workers and provider quota per tenant (the authenticated client), by its stored
+# CLIENT_INFORMATION.scope: scope -> (weight, maximum presentations generated at the same time)
+TENANT_SCOPE_LIMITS = {
+    1: (1, 2),
+    2: (2, 4),
+    3: (4, 8)
+}
+DEFAULT_TENANT_LIMITS = (1, int(os.getenv("TENANT_MAX_CONCURRENT_PRESENTATIONS", "2")))
+
 
 
 # Mapping for image quality to model
@@ -37,6 +64,36 @@ app = FastAPI(
     version="1.0.0"
 )
 
+
+# Provider clients and the image transcoding pool are shared by every request and live as long as the app
+@app.on_event("startup")
+async def start_provider_clients():
+    provider_clients.start()
+    image_transcoder.start()
+
+
+@app.on_event("shutdown")
+async def close_provider_clients():
+    await provider_clients.close()
+    image_transcoder.shutdown()
+
+
+# Keeps the disk tier of the response caches within its size and age limits
+response_cache_sweeper: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_response_cache_sweeper():
+    global response_cache_sweeper
+    response_cache_sweeper = asyncio.create_task(sweep_response_caches())
+
+
+@app.on_event("shutdown")
+async def stop_response_cache_sweeper():
+    if response_cache_sweeper:
+        response_cache_sweeper.cancel()
+        await asyncio.gather(response_cache_sweeper, return_exceptions=True)
+
 # Helper function to save presentation
 def save_presentation(presentation_data, presentation_id):
     os.makedirs("_outputs", exist_ok=True)
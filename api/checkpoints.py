@@ -0,0 +1,165 @@
+# api/checkpoints.py
+import asyncio
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, Optional
+
+from api.app import app, presentations
+from api.app import CHECKPOINT_DIRECTORY, CHECKPOINT_TTL_SECONDS, CHECKPOINT_SWEEP_INTERVAL_SECONDS
+
+
+class PresentationCheckpoint:
+    """
+    Results of a presentation generation, saved to disk as each stage completes.
+
+    When a generation fails, the outline and every finished slide stage (content, image,
+    voiceover) are kept, so resuming it only generates the stages that are still missing.
+    A checkpoint that has not been saved for CHECKPOINT_TTL_SECONDS has expired: it can no
+    longer be resumed and is deleted, see delete_expired_checkpoints.
+    """
+
+    def __init__(self, presentation_id: str, request: Dict[str, Any] = None, data: Dict[str, Any] = None):
+        self.presentation_id = presentation_id
+        self.data = data or {
+            "presentation_id": presentation_id,
+            "request": request or {},
+            "outline": None,
+            "outline_tokens": 0,
+            "generation_time": 0,
+            "slides": {}
+        }
+
+    @staticmethod
+    def get_path(presentation_id: str) -> str:
+        return os.path.join(CHECKPOINT_DIRECTORY, f"{presentation_id}.json")
+
+    @classmethod
+    def load(cls, presentation_id: str) -> Optional["PresentationCheckpoint"]:
+        """Load the checkpoint of a presentation, or None if there is none"""
+        path = cls.get_path(presentation_id)
+        if not os.path.exists(path):
+            return None
+        if is_expired(path):
+            delete_presentation_files(presentation_id)
+            return None
+
+        with open(path, "r") as f:
+            return cls(presentation_id, data=json.load(f))
+
+    def save(self) -> None:
+        os.makedirs(CHECKPOINT_DIRECTORY, exist_ok=True)
+        path = self.get_path(self.presentation_id)
+
+        # Write to a temporary file first so a crash never leaves a half written checkpoint
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temporary_path, path)
+
+    def delete(self) -> None:
+        path = self.get_path(self.presentation_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @property
+    def request(self) -> Dict[str, Any]:
+        return self.data["request"]
+
+    @property
+    def outline(self) -> Optional[Dict[str, Any]]:
+        return self.data["outline"]
+
+    @property
+    def outline_tokens(self) -> int:
+        return self.data["outline_tokens"]
+
+    @property
+    def generation_time(self) -> float:
+        return self.data["generation_time"]
+
+    def set_outline(self, outline: Dict[str, Any], tokens: int) -> None:
+        self.data["outline"] = outline
+        self.data["outline_tokens"] = tokens
+        self.save()
+
+    def set_generation_time(self, generation_time: float) -> None:
+        self.data["generation_time"] = generation_time
+        self.save()
+
+    def clear_slides(self) -> None:
+        """Forget the saved slide stages, they belong to an outline that is being replaced"""
+        if self.data["slides"]:
+            self.data["slides"] = {}
+            self.save()
+
+    def get_slide_stage(self, slide_number: int, stage: str) -> Optional[Dict[str, Any]]:
+        """Return the saved result of a slide stage, or None if the stage has not completed"""
+        return self.data["slides"].get(str(slide_number), {}).get(stage)
+
+    def set_slide_stage(self, slide_number: int, stage: str, result: Dict[str, Any]) -> None:
+        self.data["slides"].setdefault(str(slide_number), {})[stage] = result
+        self.save()
+
+
+def is_expired(path: str) -> bool:
+    return time.time() - os.path.getmtime(path) > CHECKPOINT_TTL_SECONDS
+
+
+def delete_presentation_files(presentation_id: str) -> None:
+    """Delete the checkpoint of a presentation and the images and audio kept for resuming it"""
+    PresentationCheckpoint(presentation_id).delete()
+    shutil.rmtree(f"images/{presentation_id}", ignore_errors=True)
+    shutil.rmtree(f"audio_files/{presentation_id}", ignore_errors=True)
+
+
+def delete_expired_checkpoints() -> int:
+    """Delete the expired checkpoints of presentations that are not being generated, return how many"""
+    if not os.path.isdir(CHECKPOINT_DIRECTORY):
+        return 0
+
+    deleted = 0
+    for file_name in os.listdir(CHECKPOINT_DIRECTORY):
+        path = os.path.join(CHECKPOINT_DIRECTORY, file_name)
+        if file_name.endswith(".tmp"):
+            # Left behind by a crash while saving
+            if is_expired(path):
+                os.remove(path)
+            continue
+        presentation_id, extension = os.path.splitext(file_name)
+        if extension != ".json" or not is_expired(path):
+            continue
+        if presentations.get(presentation_id, {}).get("status", "error") != "error":
+            continue
+        delete_presentation_files(presentation_id)
+        deleted += 1
+    return deleted
+
+
+async def sweep_expired_checkpoints():
+    """Delete expired checkpoints every CHECKPOINT_SWEEP_INTERVAL_SECONDS until the app shuts down"""
+    while True:
+        try:
+            deleted = await asyncio.to_thread(delete_expired_checkpoints)
+            if deleted:
+                print(f"Deleted {deleted} expired presentation checkpoints")
+        except Exception as e:
+            print(f"⚠ Warning: Could not delete expired checkpoints: {e}")
+        await asyncio.sleep(CHECKPOINT_SWEEP_INTERVAL_SECONDS)
+
+
+checkpoint_sweeper: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_checkpoint_sweeper():
+    global checkpoint_sweeper
+    checkpoint_sweeper = asyncio.create_task(sweep_expired_checkpoints())
+
+
+@app.on_event("shutdown")
+async def stop_checkpoint_sweeper():
+    if checkpoint_sweeper:
+        checkpoint_sweeper.cancel()
+        await asyncio.gather(checkpoint_sweeper, return_exceptions=True)
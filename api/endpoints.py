@@ -1,7 +1,9 @@
 # api/endpoints.py
 from fastapi import HTTPException, Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
+import asyncio
 import json
 from datetime import datetime
 
@@ -19,16 +21,23 @@ from app.auth_middleware import auth_middleware, get_db
 from sqlalchemy.orm import Session
 
 # Import agents
-from agents.outline_initial_generator_agent import call_outline_initial_generator_agent
-from agents.outline_tester_agent import call_outline_tester_agent
-from agents.outline_fixer_agent import call_outline_fixer_agent
-from agents.content_initial_generator_agent import call_content_initial_generator_agent
-from agents.content_tester_agent import call_content_tester_agent
-from agents.content_fixer_agent import call_content_fixer_agent
-from agents.image_generator_agent import call_image_generator_agent
-from agents.image_tester_agent import call_image_tester_agent
-from agents.image_fixer_agent import call_image_fixer_agent
+from agents.outline_initial_generator_agent import call_outline_initial_generator_agent_async
+from agents.outline_tester_agent import call_outline_tester_agent_async
+from agents.outline_fixer_agent import call_outline_fixer_agent_async
+from agents.content_initial_generator_agent import call_content_initial_generator_agent_async
+from agents.content_tester_agent import call_content_tester_agent_async, content_tester_batcher
+from agents.content_fixer_agent import call_content_fixer_agent_async
+from agents.image_generator_agent import call_image_generator_agent_async
+from agents.image_tester_agent import call_image_tester_agent_async, image_tester_batcher
+from agents.image_fixer_agent import call_image_fixer_agent_async
 from api.app import IMAGE_QUALITY_MODELS
+from api.job_queue import get_queue_position
+from api.presentation import load_call_ledger
+from api.progress import subscribe, unsubscribe, get_status_event, format_server_sent_event, FINAL_STATUSES
+from agents.response_cache import llm_response_cache, image_response_cache
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_STREAM_KEEPALIVE_INTERVAL = 15
 
 @app.get("/")
 def read_root():
@@ -52,7 +61,7 @@ async def generate_outline(
             slide_count=outline_req.slide_count
         )
         
-        outline, input_tokens, output_tokens = call_outline_initial_generator_agent(topic_count)
+        outline, input_tokens, output_tokens = await call_outline_initial_generator_agent_async(topic_count)
         
         return {
             "outline": json.loads(outline.model_dump_json()),
@@ -83,7 +92,7 @@ async def test_outline(
         
         outline = PresentationOutline.model_validate(test_req.get("outline"))
         
-        test_result, input_tokens, output_tokens = call_outline_tester_agent(topic_count, outline)
+        test_result, input_tokens, output_tokens = await call_outline_tester_agent_async(topic_count, outline)
         
         return {
             "test_result": json.loads(test_result.model_dump_json()),
@@ -120,7 +129,7 @@ async def fix_outline(
             tested_outline=outline
         )
         
-        fixed_outline, input_tokens, output_tokens = call_outline_fixer_agent(validation_with_outline)
+        fixed_outline, input_tokens, output_tokens = await call_outline_fixer_agent_async(validation_with_outline)
         
         return {
             "fixed_outline": json.loads(fixed_outline.model_dump_json()),
@@ -144,7 +153,7 @@ async def generate_content(
     client_info = request.state.client_info
     
     try:
-        content, input_tokens, output_tokens = call_content_initial_generator_agent(
+        content, input_tokens, output_tokens = await call_content_initial_generator_agent_async(
             content_req.presentation_title,
             content_req.slide
         )
@@ -175,7 +184,7 @@ async def test_content(
         slide = SlideOutline.model_validate(test_content_req.get("slide", {}))
         content = SlideContent.model_validate(test_content_req.get("content", {}))
         
-        test_result, input_tokens, output_tokens = call_content_tester_agent(
+        test_result, input_tokens, output_tokens = await call_content_tester_agent_async(
             presentation_title, 
             slide, 
             content
@@ -212,7 +221,7 @@ async def fix_content(
             score=fix_content_req.get("score", 0)
         )
         
-        fixed_content, input_tokens, output_tokens = call_content_fixer_agent(
+        fixed_content, input_tokens, output_tokens = await call_content_fixer_agent_async(
             presentation_title,
             slide,
             content,
@@ -243,7 +252,7 @@ async def generate_image(
     try:
         model = IMAGE_QUALITY_MODELS.get(image_req.quality.lower(), IMAGE_QUALITY_MODELS["medium"])
         
-        image_url = call_image_generator_agent(image_req.image_prompt, model)
+        image_url = await call_image_generator_agent_async(image_req.image_prompt, model)
         
         return {
             "image_url": image_url,
@@ -266,7 +275,7 @@ async def test_image(
         image_url = test_image_req.get("image_url", "")
         content = SlideContent.model_validate(test_image_req.get("content", {}))
         
-        test_result, input_tokens, output_tokens = call_image_tester_agent(
+        test_result, input_tokens, output_tokens = await call_image_tester_agent_async(
             image_url,
             content
         )
@@ -301,7 +310,7 @@ async def fix_image_prompt(
             tested_slide_content=content
         )
         
-        fixed_content, input_tokens, output_tokens = call_image_fixer_agent(validation_with_content)
+        fixed_content, input_tokens, output_tokens = await call_image_fixer_agent_async(validation_with_content)
         
         return {
             "fixed_content": json.loads(fixed_content.model_dump_json()),
@@ -318,6 +327,28 @@ async def fix_image_prompt(
 
 
 
+def get_saved_presentation_status(presentation_id: str, client_info, db: Session) -> Dict[str, Any]:
+    """Status of a presentation generated before the app restarted, with the calls saved for it"""
+    client_id = client_info.client_id if client_info else "anonymous"
+    
+    db_presentation = crud.get_presentation_history(db, presentation_id)
+    if not db_presentation:
+        raise HTTPException(status_code=404, detail="Presentation not found")
+    
+    # Check if the presentation belongs to the authenticated client
+    if db_presentation.client_id != client_id and client_id != "admin":
+        raise HTTPException(status_code=403, detail="You don't have permission to access this presentation")
+    
+    response = {
+        "presentation_id": presentation_id,
+        "status": "unknown",
+        "progress": None
+    }
+    call_ledger = load_call_ledger(db, presentation_id)
+    if call_ledger:
+        response["calls"] = call_ledger.to_dict()
+    return response
+
 @app.get("/presentation/{presentation_id}", response_model=Dict[str, Any])
 async def get_presentation_status(
     request: Request,
@@ -329,7 +360,7 @@ async def get_presentation_status(
     client_info = request.state.client_info
     
     if presentation_id not in presentations:
-        raise HTTPException(status_code=404, detail="Presentation not found")
+        return get_saved_presentation_status(presentation_id, client_info, db)
     
     presentation = presentations[presentation_id]
     
@@ -339,6 +370,18 @@ async def get_presentation_status(
         "progress": presentation.get("progress")
     }
     
+    # Include queue position if waiting for a worker
+    if presentation["status"] == "queued":
+        response["queue_position"] = get_queue_position(presentation_id)
+    
+    # Include the steps skipped to meet the deadline
+    if presentation.get("shortcuts"):
+        response["shortcuts"] = presentation["shortcuts"]
+    
+    # Include every provider call made so far, with its stage, latency and tokens
+    if presentation.get("call_ledger"):
+        response["calls"] = presentation["call_ledger"].to_dict()
+    
     # Include full data if completed
     if presentation["status"] == "completed":
         response["data"] = presentation["data"]
@@ -349,6 +392,58 @@ async def get_presentation_status(
     
     return response
 
+@app.get("/presentation/{presentation_id}/events")
+async def stream_presentation_events(
+    request: Request,
+    presentation_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_middleware.check_auth),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the generation of a presentation as server-sent events.
+
+    Events: "status" (status changes, the stream ends after "completed" or "error"),
+    "progress" (the same progress as GET /presentation/{presentation_id}) and
+    "slide" (a slide with its content and image, sent as soon as it is complete).
+    """
+    if presentation_id not in presentations:
+        raise HTTPException(status_code=404, detail="Presentation not found")
+    
+    # Release the connection held by the auth check, the stream can stay open for minutes
+    db.close()
+    
+    queue = subscribe(presentation_id)
+    
+    async def event_stream():
+        try:
+            # Send the current state first so clients joining late start in sync
+            status_event = get_status_event(presentation_id)
+            yield format_server_sent_event("status", status_event)
+            if presentations[presentation_id].get("progress"):
+                yield format_server_sent_event("progress", presentations[presentation_id]["progress"])
+            if status_event["status"] in FINAL_STATUSES:
+                return
+            
+            while not await request.is_disconnected():
+                try:
+                    event_type, data = await asyncio.wait_for(queue.get(), timeout=EVENT_STREAM_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield format_server_sent_event(event_type, data)
+                if event_type == "status" and data["status"] in FINAL_STATUSES:
+                    return
+        finally:
+            unsubscribe(presentation_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/presentations", response_model=List[Dict[str, Any]])
 async def list_presentations(
     request: Request,
@@ -478,3 +573,23 @@ async def get_voice_setting(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/cache/stats", response_model=Dict[str, Any])
+async def get_cache_stats(
+    credentials: HTTPAuthorizationCredentials = Depends(auth_middleware.check_auth)
+):
+    """Get the entry counts and hit rates of the agent response caches"""
+    return {
+        "llm": llm_response_cache.get_stats(),
+        "images": image_response_cache.get_stats()
+    }
+
+
+@app.get("/batching/stats", response_model=Dict[str, Any])
+async def get_batching_stats(
+    credentials: HTTPAuthorizationCredentials = Depends(auth_middleware.check_auth)
+):
+    """Get how many tester calls of concurrent presentations were combined into batches"""
+    return {
+        "content_tester": content_tester_batcher.get_stats(),
+        "image_tester": image_tester_batcher.get_stats()
+    }
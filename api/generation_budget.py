@@ -0,0 +1,82 @@
+# api/generation_budget.py
+import time
+from typing import Any, Dict, List, Optional
+
+from api.app import IMAGE_QUALITY_MODELS
+
+# Rough duration of each kind of call in seconds, used to decide whether optional work still fits
+STAGE_DURATION_ESTIMATES = {
+    "outline": 20,
+    "content": 20,
+    "image": 15,
+    "tester": 10,
+    "fixer": 20,
+    "critic": 25,
+    "voiceover": 10,
+}
+
+IMAGE_DURATION_ESTIMATES = {
+    IMAGE_QUALITY_MODELS["low"]: 8,
+    IMAGE_QUALITY_MODELS["medium"]: 15,
+    IMAGE_QUALITY_MODELS["high"]: 25,
+}
+
+# Image models from the fastest to the slowest tier
+IMAGE_MODEL_TIERS = [IMAGE_QUALITY_MODELS["low"], IMAGE_QUALITY_MODELS["medium"], IMAGE_QUALITY_MODELS["high"]]
+
+# Work that still has to be done for a slide once its outline exists
+SLIDE_DURATION_ESTIMATE = STAGE_DURATION_ESTIMATES["content"] + STAGE_DURATION_ESTIMATES["image"]
+
+
+class GenerationBudget:
+    """
+    Time budget of a presentation with an optional deadline.
+
+    Optional work (testers, fix attempts, slower image tiers) is only done while it fits in
+    the remaining time next to the work that is still required; every skipped step is
+    recorded as a shortcut. Without a deadline everything fits.
+    """
+
+    def __init__(self, deadline_seconds: Optional[float] = None, started_at: Optional[float] = None):
+        self.deadline_seconds = deadline_seconds
+        self.started_at = started_at or time.time()
+        self.shortcuts: List[Dict[str, Any]] = []
+
+    def remaining(self) -> float:
+        if self.deadline_seconds is None:
+            return float("inf")
+        return self.deadline_seconds - (time.time() - self.started_at)
+
+    def fits(self, shortcut: str, optional_seconds: float, required_seconds: float = 0,
+             slide_number: int = None) -> bool:
+        """Return whether optional work fits in the budget, recording the shortcut if it does not"""
+        remaining = self.remaining()
+        if remaining >= optional_seconds + required_seconds:
+            return True
+
+        self.record_shortcut(shortcut, slide_number, remaining)
+        return False
+
+    def choose_image_model(self, image_model: str, required_seconds: float = 0,
+                           slide_number: int = None) -> str:
+        """Return the requested image model, or the best faster tier that still fits in the budget"""
+        if image_model not in IMAGE_MODEL_TIERS:
+            return image_model
+
+        remaining = self.remaining()
+        candidates = IMAGE_MODEL_TIERS[:IMAGE_MODEL_TIERS.index(image_model) + 1]
+        for candidate in reversed(candidates):
+            if remaining >= IMAGE_DURATION_ESTIMATES[candidate] + required_seconds:
+                break
+
+        if candidate != image_model:
+            self.record_shortcut(f"lower_image_tier:{candidate}", slide_number, remaining)
+        return candidate
+
+    def record_shortcut(self, shortcut: str, slide_number: int = None, remaining: float = None) -> None:
+        print(f"Deadline shortcut: {shortcut}" + (f" (slide {slide_number})" if slide_number else ""))
+        self.shortcuts.append({
+            "shortcut": shortcut,
+            "slide_number": slide_number,
+            "remaining_seconds": round(remaining, 1) if remaining is not None else None
+        })
@@ -0,0 +1,141 @@
+# api/job_queue.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+from api.app import app, presentations
+from api.app import PRESENTATION_WORKER_COUNT, MAX_QUEUED_PRESENTATIONS, TENANT_SCOPE_LIMITS, DEFAULT_TENANT_LIMITS
+from api.progress import update_status
+from agents.rate_limiter import Tenant, current_tenant
+from utils.fair_queue import WeightedFairQueue
+
+# Jobs waiting for a worker per tenant, as (presentation_id, job, tenant) entries
+presentation_queue = WeightedFairQueue()
+
+# Presentations each tenant is generating right now (queued and synchronous ones), and how many
+# it may generate at the same time
+running_presentations: Dict[str, int] = {}
+tenant_max_concurrency: Dict[str, int] = {}
+
+# Set whenever a job is queued or finished, so idle workers look for a job again
+queue_changed: asyncio.Event = None
+
+workers: List[asyncio.Task] = []
+
+
+class QueueFullError(Exception):
+    """Raised when no more presentation jobs can be queued"""
+
+
+def get_tenant(client_id: str, scope: int = None) -> Tuple[Tenant, int]:
+    """
+    Return the tenant a presentation is scheduled for and the number of presentations it may
+    generate at the same time: the authenticated client, with the limits of its stored scope.
+    The tenant is never taken from the request, so a client cannot use another one's share.
+    """
+    weight, max_concurrency = TENANT_SCOPE_LIMITS.get(scope, DEFAULT_TENANT_LIMITS)
+    return Tenant(f"client:{client_id}", weight), max_concurrency
+
+
+def get_queue_position(presentation_id: str) -> int:
+    """Return the 1-based position of a queued presentation, or None if it is not waiting"""
+    for position, (_, entry) in enumerate(presentation_queue.order(), start=1):
+        if entry[0] == presentation_id:
+            return position
+    return None
+
+
+def submit_presentation_job(presentation_id: str, job: Callable[[], Awaitable[None]],
+                            tenant: Tenant, max_concurrency: int, cost: float = 1) -> int:
+    """
+    Queue a presentation job for the worker pool and return its queue position.
+    The cost (e.g. the number of slides) is what the tenant is charged for its fair share.
+    """
+    if len(presentation_queue) >= MAX_QUEUED_PRESENTATIONS:
+        raise QueueFullError(f"The presentation queue is full ({MAX_QUEUED_PRESENTATIONS} jobs waiting)")
+
+    presentation_queue.push(tenant.name, (presentation_id, job, tenant), tenant.weight, cost)
+    tenant_max_concurrency[tenant.name] = max_concurrency
+    update_status(presentation_id, "queued")
+    queue_changed.set()
+    return get_queue_position(presentation_id)
+
+
+def can_start_presentation(tenant_name: str) -> bool:
+    return running_presentations.get(tenant_name, 0) < tenant_max_concurrency[tenant_name]
+
+
+async def get_next_presentation_job() -> Tuple[str, Callable[[], Awaitable[None]], Tenant]:
+    """Wait for the next job of a tenant that is below its concurrency cap"""
+    while True:
+        next_job = presentation_queue.pop(eligible=can_start_presentation)
+        if next_job:
+            return next_job[1]
+        queue_changed.clear()
+        await queue_changed.wait()
+
+
+def start_running(tenant_name: str) -> None:
+    running_presentations[tenant_name] = running_presentations.get(tenant_name, 0) + 1
+
+
+def stop_running(tenant_name: str) -> None:
+    running_presentations[tenant_name] -= 1
+    if not running_presentations[tenant_name]:
+        del running_presentations[tenant_name]
+    queue_changed.set()
+
+
+@asynccontextmanager
+async def presentation_slot(tenant: Tenant, max_concurrency: int) -> AsyncIterator[None]:
+    """
+    Hold one of the tenant's presentation slots while a presentation is generated outside the
+    worker pool (synchronous requests), waiting until the tenant is below its concurrency cap
+    """
+    tenant_max_concurrency[tenant.name] = max_concurrency
+    while not can_start_presentation(tenant.name):
+        queue_changed.clear()
+        await queue_changed.wait()
+    start_running(tenant.name)
+    try:
+        yield
+    finally:
+        stop_running(tenant.name)
+
+
+async def presentation_worker(worker_number: int):
+    """Take presentation jobs from the queue one by one until the app shuts down"""
+    while True:
+        presentation_id, job, tenant = await get_next_presentation_job()
+        start_running(tenant.name)
+        print(f"Worker {worker_number} started presentation: {presentation_id} ({tenant.name})")
+
+        # Provider calls of the job are shared fairly between tenants as well
+        tenant_token = current_tenant.set(tenant)
+        try:
+            update_status(presentation_id, "processing")
+            await job()
+        except Exception as e:
+            # Jobs record their own errors, this only keeps the worker alive
+            print(f"Worker {worker_number} failed presentation {presentation_id}: {e}")
+            update_status(presentation_id, "error", error=str(e))
+        finally:
+            current_tenant.reset(tenant_token)
+            stop_running(tenant.name)
+
+
+@app.on_event("startup")
+async def start_presentation_workers():
+    global queue_changed
+    queue_changed = asyncio.Event()
+    for worker_number in range(1, PRESENTATION_WORKER_COUNT + 1):
+        workers.append(asyncio.create_task(presentation_worker(worker_number)))
+    print(f"Started {PRESENTATION_WORKER_COUNT} presentation workers")
+
+
+@app.on_event("shutdown")
+async def stop_presentation_workers():
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    workers.clear()
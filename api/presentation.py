@@ -1,13 +1,16 @@
 # api/presentation.py
-from fastapi import Depends, Request, UploadFile, File, Form
+from fastapi import Depends, HTTPException, Request, UploadFile, File, Form
 from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.responses import Response
 
 from utils.file_operations import process_uploaded_file
+import os
 import uuid
+import asyncio
+from functools import partial
 from datetime import datetime
 import time
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import timedelta, timezone
 from elevenlabs import VoiceSettings
 import json
@@ -15,24 +18,39 @@ import json
 
 from api.app import app, presentations
 from api.app import OUTLINE_THRESHOLD_SCORE, CONTENT_THRESHOLD_SCORE, IMAGE_THRESHOLD_SCORE
-from api.app import IMAGE_QUALITY_MODELS
+from api.app import IMAGE_QUALITY_MODELS, MAX_CONCURRENT_STAGES
 from data.datamodels import TopicCount, FullPresentationRequest, PresentationOutline, SlideContent, SlideOutline
 from app.auth_middleware import auth_middleware, get_db
+from api.job_queue import submit_presentation_job, get_tenant, presentation_slot, QueueFullError
+from agents.rate_limiter import current_tenant
+from agents.llm_helper import TokenUsage, current_token_usage
+from agents.response_cache import response_cache_enabled
+from agents.model_routing import current_model_overrides, normalize_model_overrides
+from agents.call_ledger import CallLedger, current_call_ledger, current_call_stage
+from api.checkpoints import PresentationCheckpoint
+from api.progress import update_status, update_progress, publish_event
+from api.generation_budget import GenerationBudget, STAGE_DURATION_ESTIMATES, IMAGE_DURATION_ESTIMATES, SLIDE_DURATION_ESTIMATE
 from sqlalchemy.orm import Session
+from data.db.database import SessionLocal
 from data.db import crud, schemas
+from data.db.models import create_presentation_calls_table
 
 # Import agents
-from agents.outline_initial_generator_agent import call_outline_initial_generator_agent
-from agents.outline_tester_agent import call_outline_tester_agent
-from agents.outline_fixer_agent import call_outline_fixer_agent
-from agents.content_initial_generator_agent import call_content_initial_generator_agent
-from agents.content_tester_agent import call_content_tester_agent
-from agents.content_fixer_agent import call_content_fixer_agent
-from agents.image_generator_agent import call_image_generator_agent, download_image_to_local
-from agents.image_tester_agent import call_image_tester_agent
-from agents.image_fixer_agent import call_image_fixer_agent
-from agents.voice_helper import generate_speech_with_elevenlabs, delete_directory
-from powepoint_deneme.pptx_generator import create_presentation_from_data
+from agents.outline_initial_generator_agent import call_outline_initial_generator_agent_async, stream_outline_initial_generator_agent_async
+from agents.outline_tester_agent import call_outline_tester_agent_async
+from agents.outline_fixer_agent import call_outline_fixer_agent_async
+from agents.outline_critic_agent import call_outline_critic_agent_async
+from agents.content_initial_generator_agent import call_content_initial_generator_agent_async
+from agents.content_batch_generator_agent import call_content_batch_generator_agent_async, get_batch_slide_contents
+from agents.content_tester_agent import call_content_tester_agent_async
+from agents.content_fixer_agent import call_content_fixer_agent_async
+from agents.content_critic_agent import call_content_critic_agent_async
+from agents.image_generator_agent import call_image_generator_agent_async, download_image_to_local
+from agents.image_tester_agent import call_image_tester_agent_async
+from agents.image_fixer_agent import call_image_fixer_agent_async
+from agents.voice_helper import generate_speech_with_elevenlabs_async, delete_directory
+from powepoint_deneme.pptx_generator import start_presentation, save_generated_presentation
+from utils.task_graph import TaskGraph
 
 
 def initialize_presentation_generation(presentation_id: str, topic: str, slide_count: int, 
@@ -40,8 +58,8 @@ def initialize_presentation_generation(presentation_id: str, topic: str, slide_c
     """Initialize presentation generation and record in database"""
     total_tokens = 0
     
-    # Record the presentation in the database
-    if db:
+    # Record the presentation in the database (a resumed presentation is already recorded)
+    if db and not crud.get_presentation_history(db, presentation_id):
         presentation_history = schemas.PRESENTATION_HISTORYCreate(
             presentation_id=presentation_id,
             topic=topic,
@@ -56,70 +74,178 @@ def initialize_presentation_generation(presentation_id: str, topic: str, slide_c
     return total_tokens
 
 
-def generate_and_validate_outline(topic: str, slide_count: int, is_agentic: bool, 
-                                presentation_id: str) -> Tuple[PresentationOutline, int]:
-    """Generate presentation outline with optional validation and fixing"""
+async def critique_and_revise_outline(topic_count: TopicCount, outline: PresentationOutline, 
+                                      presentation_id: str, budget: GenerationBudget) -> Tuple[PresentationOutline, int]:
+    """Review the outline with a single critique-and-revise call instead of a tester and a fixer"""
+    if not budget.fits("skip_outline_critique", STAGE_DURATION_ESTIMATES["critic"], SLIDE_DURATION_ESTIMATE):
+        return outline, 0
+    
+    update_progress(presentation_id, {"current_step": "critiquing_outline", "completion": 10})
+    critique, input_tokens, output_tokens = await call_outline_critic_agent_async(topic_count, outline)
+    
+    if critique.score < OUTLINE_THRESHOLD_SCORE:
+        if len(critique.revised_outline.slide_outlines) == len(outline.slide_outlines):
+            outline = critique.revised_outline
+        else:
+            print(f"⚠ Warning: Revised outline has {len(critique.revised_outline.slide_outlines)} slides, keeping the original outline")
+    return outline, input_tokens + output_tokens
+
+
+async def generate_and_validate_outline(topic: str, slide_count: int, is_agentic: bool, 
+                                presentation_id: str, budget: GenerationBudget, 
+                                review_mode: str = "test_and_fix") -> Tuple[PresentationOutline, int]:
+    """
+    Generate presentation outline with optional validation and fixing (skipped when the budget runs short).
+    With the critique_and_revise review mode, validation and fixing are a single call.
+    """
     total_tokens = 0
     
     # Update progress
-    presentations[presentation_id]["status"] = "generating_outline"
-    presentations[presentation_id]["progress"] = {"current_step": "outline", "completion": 0}
+    update_status(presentation_id, "generating_outline")
+    update_progress(presentation_id, {"current_step": "outline", "completion": 0})
     
     # Step 1: Generate outline
     topic_count = TopicCount(presentation_topic=topic, slide_count=slide_count)
-    outline, input_tokens, output_tokens = call_outline_initial_generator_agent(topic_count)
+    outline, input_tokens, output_tokens = await call_outline_initial_generator_agent_async(topic_count)
     total_tokens += input_tokens + output_tokens
     
-    if is_agentic:
+    if is_agentic and review_mode == "critique_and_revise":
+        outline, critique_tokens = await critique_and_revise_outline(topic_count, outline, presentation_id, budget)
+        total_tokens += critique_tokens
+    elif is_agentic and budget.fits("skip_outline_test", STAGE_DURATION_ESTIMATES["tester"], SLIDE_DURATION_ESTIMATE):
         # Step 2: Test outline
-        presentations[presentation_id]["progress"] = {"current_step": "testing_outline", "completion": 10}
-        test_result, input_tokens, output_tokens = call_outline_tester_agent(topic_count, outline)
+        update_progress(presentation_id, {"current_step": "testing_outline", "completion": 10})
+        test_result, input_tokens, output_tokens = await call_outline_tester_agent_async(topic_count, outline)
         total_tokens += input_tokens + output_tokens
         
         # Step 3: Fix outline if needed
         max_attempts = 1
-        while test_result.validation_feedback.score < OUTLINE_THRESHOLD_SCORE and max_attempts > 0:
-            presentations[presentation_id]["progress"] = {"current_step": "fixing_outline", "completion": 20}
-            fixed_outline, input_tokens, output_tokens = call_outline_fixer_agent(test_result)
+        while (test_result.validation_feedback.score < OUTLINE_THRESHOLD_SCORE and max_attempts > 0
+               and budget.fits("skip_outline_fix", STAGE_DURATION_ESTIMATES["fixer"] + STAGE_DURATION_ESTIMATES["tester"], SLIDE_DURATION_ESTIMATE)):
+            update_progress(presentation_id, {"current_step": "fixing_outline", "completion": 20})
+            fixed_outline, input_tokens, output_tokens = await call_outline_fixer_agent_async(test_result)
+            total_tokens += input_tokens + output_tokens
 
-            test_result, input_tokens, output_tokens = call_outline_tester_agent(topic_count, fixed_outline)
+            test_result, input_tokens, output_tokens = await call_outline_tester_agent_async(topic_count, fixed_outline)
             total_tokens += input_tokens + output_tokens            
 
             outline = fixed_outline
-            total_tokens += input_tokens + output_tokens
             max_attempts -= 1
     
     return outline, total_tokens
 
 
-def generate_slide_content(presentation_title: str, slide: SlideOutline, is_agentic: bool) -> Tuple[SlideContent, int]:
-    """Generate slide content with optional validation and fixing"""
+async def start_outline_stream(topic: str, slide_count: int, presentation_id: str, 
+                               checkpoint: PresentationCheckpoint) -> Tuple[asyncio.Task, str, List[asyncio.Future]]:
+    """
+    Start streaming the outline and wait for its title only. Returns the task streaming the rest
+    of the outline (its result is the outline tokens), the title, and a future per slide outline
+    that is resolved as soon as that slide is parsed, so the first slides are generated while
+    later ones are still being outlined. The outline is checkpointed once it is complete.
+    """
+    update_status(presentation_id, "generating_outline")
+    update_progress(presentation_id, {"current_step": "outline", "completion": 0})
+    
+    loop = asyncio.get_running_loop()
+    presentation_title = loop.create_future()
+    slide_outlines = [loop.create_future() for _ in range(slide_count)]
+
+    def on_presentation_title(title: str):
+        presentation_title.set_result(title)
+
+    def on_slide_outline(slide_number: int, slide_outline: SlideOutline):
+        if slide_number <= slide_count:
+            slide_outlines[slide_number - 1].set_result(slide_outline)
+
+    async def stream_outline():
+        current_call_stage.set(("outline", None))
+        try:
+            topic_count = TopicCount(presentation_topic=topic, slide_count=slide_count)
+            outline, input_tokens, output_tokens = await stream_outline_initial_generator_agent_async(
+                topic_count, on_presentation_title, on_slide_outline
+            )
+            if len(outline.slide_outlines) < slide_count:
+                raise ValueError(f"The outline has {len(outline.slide_outlines)} slides instead of {slide_count}")
+        except BaseException as e:
+            # Fail the stages still waiting for the outline
+            for future in [presentation_title, *slide_outlines]:
+                if not future.done():
+                    future.cancel() if isinstance(e, asyncio.CancelledError) else future.set_exception(e)
+            raise
+        
+        outline.slide_outlines = outline.slide_outlines[:slide_count]
+        checkpoint.set_outline(outline.model_dump(), input_tokens + output_tokens)
+        return input_tokens + output_tokens
+
+    outline_task = asyncio.create_task(stream_outline())
+    try:
+        title = await presentation_title
+    except BaseException:
+        outline_task.cancel()
+        raise
+    return outline_task, title, slide_outlines
+
+
+async def resolve_slide_outline(slide: Union[SlideOutline, asyncio.Future]) -> SlideOutline:
+    """Slide outlines of a streamed outline are futures until the slide is parsed"""
+    return await slide if isinstance(slide, asyncio.Future) else slide
+
+
+async def critique_and_revise_slide_content(presentation_title: str, slide: SlideOutline, content: SlideContent, 
+                                            budget: GenerationBudget, slide_number: int, 
+                                            include_voiceover: bool = True) -> Tuple[SlideContent, int]:
+    """Review slide content with a single critique-and-revise call instead of a tester and a fixer"""
+    if not budget.fits("skip_content_critique", STAGE_DURATION_ESTIMATES["critic"], STAGE_DURATION_ESTIMATES["image"], slide_number):
+        return content, 0
+    
+    critique, input_tokens, output_tokens = await call_content_critic_agent_async(presentation_title, slide, content, include_voiceover)
+    if critique.score < CONTENT_THRESHOLD_SCORE:
+        content = critique.revised_content
+    return content, input_tokens + output_tokens
+
+
+async def generate_slide_content(presentation_title: str, slide: SlideOutline, is_agentic: bool, 
+                                 budget: GenerationBudget, slide_number: int, 
+                                 content: SlideContent = None, 
+                                 review_mode: str = "test_and_fix", 
+                                 include_voiceover: bool = True) -> Tuple[SlideContent, int]:
+    """
+    Generate slide content with optional validation and fixing (skipped when the budget runs short).
+    Content already generated in a batch is only validated and fixed. With the critique_and_revise
+    review mode, validation and fixing are a single call. Without include_voiceover no voiceover
+    text is generated, its slide_voiceover_text is empty.
+    """
     total_tokens = 0
     
     # Generate content
-    content, input_tokens, output_tokens = call_content_initial_generator_agent(
-        presentation_title, slide
-    )
-    total_tokens += input_tokens + output_tokens
+    if content is None:
+        content, input_tokens, output_tokens = await call_content_initial_generator_agent_async(
+            presentation_title, slide, include_voiceover
+        )
+        total_tokens += input_tokens + output_tokens
     
-    if is_agentic:
+    if is_agentic and review_mode == "critique_and_revise":
+        content, critique_tokens = await critique_and_revise_slide_content(presentation_title, slide, content, budget, slide_number, include_voiceover)
+        total_tokens += critique_tokens
+    elif is_agentic and budget.fits("skip_content_test", STAGE_DURATION_ESTIMATES["tester"], STAGE_DURATION_ESTIMATES["image"], slide_number):
         # Test content
-        content_test, input_tokens, output_tokens = call_content_tester_agent(
-            presentation_title, slide, content
+        content_test, input_tokens, output_tokens = await call_content_tester_agent_async(
+            presentation_title, slide, content, include_voiceover
         )
         total_tokens += input_tokens + output_tokens
         
         # Fix content if needed
         max_attempts = 1
-        while content_test.score < CONTENT_THRESHOLD_SCORE and max_attempts > 0:
-            fixed_content, input_tokens, output_tokens = call_content_fixer_agent(
-                presentation_title, slide, content, content_test
+        while (content_test.score < CONTENT_THRESHOLD_SCORE and max_attempts > 0
+               and budget.fits("skip_content_fix", STAGE_DURATION_ESTIMATES["fixer"] + STAGE_DURATION_ESTIMATES["tester"], STAGE_DURATION_ESTIMATES["image"], slide_number)):
+            fixed_content, input_tokens, output_tokens = await call_content_fixer_agent_async(
+                presentation_title, slide, content, content_test, include_voiceover
             )
             total_tokens += input_tokens + output_tokens   
             content = fixed_content
 
-            content_test, input_tokens, output_tokens = call_content_tester_agent(
-                presentation_title, slide, fixed_content
+            content_test, input_tokens, output_tokens = await call_content_tester_agent_async(
+                presentation_title, slide, fixed_content, include_voiceover
             )
             total_tokens += input_tokens + output_tokens    
             max_attempts -= 1
@@ -127,43 +253,53 @@ def generate_slide_content(presentation_title: str, slide: SlideOutline, is_agen
     return content, total_tokens
 
 
-def generate_and_validate_slide_image(content: SlideContent, image_model: str, 
-                                    presentation_id: str, slide_number: int, 
-                                    is_agentic: bool) -> Tuple[str, str, int]:
-    """Generate slide image with optional validation and fixing"""
+async def generate_and_validate_slide_image(content: SlideContent, image_model: str, is_agentic: bool, 
+                                            budget: GenerationBudget, slide_number: int) -> Tuple[str, int]:
+    """
+    Generate slide image with optional validation and fixing. When the budget runs short a
+    faster image model is used and validation and fixing are skipped.
+    """
     total_tokens = 0
     
     # Generate image
-    image_url = call_image_generator_agent(content.slide_image_prompt, image_model)
+    image_model = budget.choose_image_model(image_model, slide_number=slide_number)
+    image_url = await call_image_generator_agent_async(content.slide_image_prompt, image_model)
     
-    if is_agentic:
+    if is_agentic and budget.fits("skip_image_test", STAGE_DURATION_ESTIMATES["tester"], slide_number=slide_number):
         # Test image
-        image_test_result, input_tokens, output_tokens = call_image_tester_agent(image_url, content)
+        image_test_result, input_tokens, output_tokens = await call_image_tester_agent_async(image_url, content)
         total_tokens += input_tokens + output_tokens
         
         # Fix image prompt if needed
         max_attempts = 1
-        while image_test_result.validation_feedback.score < IMAGE_THRESHOLD_SCORE and max_attempts > 0:
-            improved_content, input_tokens, output_tokens = call_image_fixer_agent(image_test_result)
+        fix_seconds = (STAGE_DURATION_ESTIMATES["fixer"] + STAGE_DURATION_ESTIMATES["tester"]
+                       + IMAGE_DURATION_ESTIMATES.get(image_model, STAGE_DURATION_ESTIMATES["image"]))
+        while (image_test_result.validation_feedback.score < IMAGE_THRESHOLD_SCORE and max_attempts > 0
+               and budget.fits("skip_image_fix", fix_seconds, slide_number=slide_number)):
+            improved_content, input_tokens, output_tokens = await call_image_fixer_agent_async(image_test_result)
             total_tokens += input_tokens + output_tokens
             
             # Regenerate image with improved prompt
-            image_url = call_image_generator_agent(improved_content.slide_image_prompt, image_model)
+            image_url = await call_image_generator_agent_async(improved_content.slide_image_prompt, image_model)
 
-            image_test_result, input_tokens, output_tokens = call_image_tester_agent(image_url, content)
+            image_test_result, input_tokens, output_tokens = await call_image_tester_agent_async(image_url, content)
             total_tokens += input_tokens + output_tokens
 
             content = improved_content
             max_attempts -= 1
-
-    # Download image locally
-    local_image_path = download_image_to_local(image_url, presentation_id, slide_number)
     
-    return image_url, local_image_path, total_tokens
+    return image_url, total_tokens
 
 
-def generate_slide_voiceover(content: SlideContent, presentation_id: str, 
-                           slide_number: int, voice_id: int, db: Session) -> str:
+def get_elevenlabs_voice_id(voice_id: int, db: Session) -> str:
+    """Look up the ElevenLabs voice id configured for a voice setting"""
+    voice_db = crud.get_voice_setting(db, voice_id)
+    voice = schemas.VOICE_SETTINGS.model_validate(voice_db)
+    return voice.elevenlabs_voice_id
+
+
+async def generate_slide_voiceover(content: SlideContent, presentation_id: str, 
+                           slide_number: int, elevenlabs_voice_id: str) -> bool:
     """Generate voiceover for a slide"""
     # Voice settings
     host_voice_settings = VoiceSettings(
@@ -172,13 +308,8 @@ def generate_slide_voiceover(content: SlideContent, presentation_id: str,
         speed=1.05,
     )
 
-    # Get voice configuration
-    voice_db = crud.get_voice_setting(db, voice_id)
-    voice = schemas.VOICE_SETTINGS.model_validate(voice_db)
-    elevenlabs_voice_id = voice.elevenlabs_voice_id
-
     # Generate voiceover
-    voiceover_filepath = generate_speech_with_elevenlabs(
+    voiceover_filepath = await generate_speech_with_elevenlabs_async(
         elevenlabs_voice_id=elevenlabs_voice_id,
         host_voice_settings=host_voice_settings,
         slide_voiceover_text=content.slide_voiceover_text,
@@ -190,36 +321,9 @@ def generate_slide_voiceover(content: SlideContent, presentation_id: str,
     return voiceover_filepath
 
 
-def process_single_slide(slide: SlideOutline, slide_index: int, slide_count: int, 
-                        presentation_title: str, presentation_id: str, 
-                        image_model: str, is_agentic: bool, 
-                        generate_voiceover: bool, voice_id: int, db: Session) -> Tuple[Dict, schemas.PRESENTATION_SLIDESCreate, int]:
-    """Process a single slide: content, image, voiceover"""
-    total_tokens = 0
-    slide_number = slide_index + 1
-    
-    # Update progress
-    slide_progress = 30 + (slide_index / slide_count) * 70
-    presentations[presentation_id]["progress"] = {
-        "current_step": f"slide_{slide_number}",
-        "current_slide": slide_number,
-        "total_slides": slide_count,
-        "completion": int(slide_progress)
-    }
-    
-    # Generate content
-    content, content_tokens = generate_slide_content(presentation_title, slide, is_agentic)
-    total_tokens += content_tokens
-    
-    # Generate image
-    image_url, local_image_path, image_tokens = generate_and_validate_slide_image(
-        content, image_model, presentation_id, slide_number, is_agentic
-    )
-    total_tokens += image_tokens
-    
-    # Generate voiceover if requested
-    if generate_voiceover:
-        generate_slide_voiceover(content, presentation_id, slide_number, voice_id, db)
+def build_slide_records(slide: SlideOutline, slide_number: int, presentation_id: str, 
+                        content: SlideContent, image_url: str) -> Tuple[Dict, schemas.PRESENTATION_SLIDESCreate]:
+    """Create the in-memory and database records of a generated slide"""
     
     # Prepare onscreen text for database
     merged_onscreen_text = "\n".join(content.slide_onscreen_text.text_list)
@@ -245,25 +349,248 @@ def process_single_slide(slide: SlideOutline, slide_index: int, slide_count: int
         image_url=image_url
     )
     
-    return slide_data, slide_to_save, total_tokens
+    return slide_data, slide_to_save
+
+
+def update_slide_progress(presentation_id: str, slide_count: int, 
+                          running_stages: list, finished_stages: list) -> None:
+    """Report progress of the slide task graph"""
+    completed_slides = sorted(int(name.split("_")[1]) for name in finished_stages if name.endswith("_assembly"))
+    active_slides = sorted({int(name.split("_")[1]) for name in running_stages if name.startswith("slide_")})
+    slide_progress = 30 + (len(completed_slides) / slide_count) * 70
+    update_progress(presentation_id, {
+        "current_step": "slides",
+        "running_stages": sorted(running_stages),
+        "active_slides": active_slides,
+        "completed_slides": completed_slides,
+        "total_slides": slide_count,
+        "completion": int(slide_progress)
+    })
+
+
+def add_content_batch_stage(graph: TaskGraph, numbered_slides: List[Tuple[int, Union[SlideOutline, asyncio.Future]]], 
+                            presentation_title: str, checkpoint: PresentationCheckpoint, 
+                            include_voiceover: bool = True) -> str:
+    """
+    Add a stage generating the content of several slides in a single call. The content stage of
+    each slide uses its result, or generates the slide separately if the batch has no valid
+    content for it.
+    """
+
+    async def content_batch_stage():
+        current_call_stage.set(("content_batch", numbered_slides[0][0]))
+        missing_slides = [(number, await resolve_slide_outline(slide)) for number, slide in numbered_slides 
+                          if not checkpoint.get_slide_stage(number, "content")]
+        if not missing_slides:
+            return {}, 0
+        
+        try:
+            content_batch, input_tokens, output_tokens = await call_content_batch_generator_agent_async(
+                presentation_title, missing_slides, include_voiceover
+            )
+        except Exception as e:
+            print(f"⚠ Warning: Batched content generation failed, generating the slides separately: {e}")
+            return {}, 0
+        
+        slide_contents = get_batch_slide_contents([number for number, _ in missing_slides], content_batch, include_voiceover)
+        if len(slide_contents) < len(missing_slides):
+            print(f"⚠ Warning: Batched content generation missed {len(missing_slides) - len(slide_contents)} slides, generating them separately")
+        return slide_contents, input_tokens + output_tokens
+
+    return graph.add(f"content_batch_{numbered_slides[0][0]}", content_batch_stage)
+
+
+def add_slide_stages(graph: TaskGraph, slide: Union[SlideOutline, asyncio.Future], slide_number: int, 
+                     presentation_title: str, presentation_id: str, 
+                     image_model: str, is_agentic: bool, 
+                     generate_voiceover: bool, elevenlabs_voice_id: str, 
+                     presentation_builder, checkpoint: PresentationCheckpoint, 
+                     budget: GenerationBudget, db: Session = None, previous_assembly: str = None, 
+                     content_batch: str = None, review_mode: str = "test_and_fix") -> str:
+    """
+    Add the content, image, voiceover and assembly stages of a slide to the task graph.
+    Stages saved in the checkpoint by an earlier attempt are reused instead of generated again.
+    With a content_batch stage, the content generated for the slide in that batch is used.
+    Without generate_voiceover the content is generated without voiceover text.
+    """
+
+    async def content_stage(*content_batch_result):
+        current_call_stage.set(("content", slide_number))
+        saved = checkpoint.get_slide_stage(slide_number, "content")
+        if saved:
+            return SlideContent.model_validate(saved["content"]), saved["tokens"]
+        
+        batch_content = content_batch_result[0][0].get(slide_number) if content_batch_result else None
+        content, tokens = await generate_slide_content(
+            presentation_title, await resolve_slide_outline(slide), is_agentic, budget, slide_number, batch_content, review_mode,
+            include_voiceover=generate_voiceover
+        )
+        checkpoint.set_slide_stage(slide_number, "content", {"content": content.model_dump(), "tokens": tokens})
+        return content, tokens
+
+    async def image_stage(content_result):
+        current_call_stage.set(("image", slide_number))
+        content, _ = content_result
+        saved = checkpoint.get_slide_stage(slide_number, "image")
+        if saved:
+            image_url, tokens = saved["image_url"], saved["tokens"]
+        else:
+            image_url, tokens = await generate_and_validate_slide_image(content, image_model, is_agentic, budget, slide_number)
+            checkpoint.set_slide_stage(slide_number, "image", {"image_url": image_url, "tokens": tokens})
+        
+        # Download image locally, unless an earlier attempt already did
+        local_image_path = f"images/{presentation_id}/slide_{slide_number}.jpg"
+        if not (saved and os.path.exists(local_image_path)):
+            local_image_path = await download_image_to_local(image_url, presentation_id, slide_number)
+        return image_url, local_image_path, tokens
+
+    async def voiceover_stage(content_result):
+        current_call_stage.set(("voiceover", slide_number))
+        content, _ = content_result
+        if checkpoint.get_slide_stage(slide_number, "voiceover") and os.path.exists(f"audio_files/{presentation_id}/slide_{slide_number}.mp3"):
+            return True
+        
+        generated = await generate_slide_voiceover(content, presentation_id, slide_number, elevenlabs_voice_id)
+        if generated:
+            checkpoint.set_slide_stage(slide_number, "voiceover", {"generated": True})
+        return generated
+
+    async def assembly_stage(content_result, image_result, *_):
+        content, _ = content_result
+        image_url = image_result[0]
+        slide_outline = await resolve_slide_outline(slide)
+        slide_data, slide_to_save = build_slide_records(slide_outline, slide_number, presentation_id, content, image_url)
+        
+        if presentation_builder and not await asyncio.to_thread(presentation_builder.add_content_slide, slide_data, presentation_id):
+            print(f"⚠ Warning: Failed to add slide {slide_number} to PowerPoint file")
+        
+        # Persist the slide as soon as it is complete
+        if db and not crud.get_slide_by_number(db, presentation_id, slide_number):
+            crud.create_presentation_slide(db, slide_to_save)
+        
+        publish_event(presentation_id, "slide", {
+            "number": slide_number,
+            "title": slide_outline.slide_title,
+            "focus": slide_outline.slide_focus,
+            "content": content.model_dump(),
+            "image_url": image_url
+        })
+        return slide_data, slide_to_save
+
+    content_name = graph.add(f"slide_{slide_number}_content", content_stage, [content_batch] if content_batch else [])
+    image_name = graph.add(f"slide_{slide_number}_image", image_stage, [content_name])
+    
+    assembly_dependencies = [content_name, image_name]
+    if generate_voiceover:
+        assembly_dependencies.append(graph.add(f"slide_{slide_number}_voiceover", voiceover_stage, [content_name]))
+    if previous_assembly:
+        # Slides are added to the PowerPoint file in order
+        assembly_dependencies.append(previous_assembly)
+    
+    return graph.add(f"slide_{slide_number}_assembly", assembly_stage, assembly_dependencies)
+
+
+async def generate_slides_with_task_graph(slide_outlines: list, slide_count: int, 
+                                          presentation_title: str, presentation_id: str, 
+                                          image_model: str, is_agentic: bool, 
+                                          generate_voiceover: bool, elevenlabs_voice_id: str, 
+                                          presentation_builder, checkpoint: PresentationCheckpoint, 
+                                          budget: GenerationBudget, db: Session = None, 
+                                          content_batch_size: int = 1, 
+                                          review_mode: str = "test_and_fix") -> Tuple[list, list, int]:
+    """
+    Generate all slides with a dependency graph of stages.
+
+    Per slide, the image and the voiceover start as soon as the content (which holds the
+    image prompt and the voiceover text) is ready, and the slide is added to the PowerPoint
+    file as soon as its own stages and the previous slide are done. With a content_batch_size
+    above 1, the content of that many slides is generated in a single call. Slide outlines
+    may be futures of a streamed outline, each slide then starts once its outline is parsed.
+    """
+    graph = TaskGraph(
+        max_concurrency=MAX_CONCURRENT_STAGES,
+        on_progress=lambda running, finished: update_slide_progress(presentation_id, slide_count, running, finished)
+    )
+    
+    numbered_slides = list(enumerate(slide_outlines, start=1))
+    content_batches = {}
+    if content_batch_size > 1:
+        for start in range(0, len(numbered_slides), content_batch_size):
+            batch_slides = numbered_slides[start:start + content_batch_size]
+            batch_name = add_content_batch_stage(graph, batch_slides, presentation_title, checkpoint, generate_voiceover)
+            content_batches.update({slide_number: batch_name for slide_number, _ in batch_slides})
+    
+    previous_assembly = None
+    for slide_number, slide in numbered_slides:
+        previous_assembly = add_slide_stages(
+            graph, slide, slide_number, presentation_title, presentation_id,
+            image_model, is_agentic, generate_voiceover, elevenlabs_voice_id,
+            presentation_builder, checkpoint, budget, db, previous_assembly,
+            content_batches.get(slide_number), review_mode
+        )
+    
+    results = await graph.run()
+    
+    # Collect slide records in slide order and the tokens of every stage
+    slides_data = []
+    slides_to_save = []
+    total_tokens = 0
+    for slide_number in range(1, len(slide_outlines) + 1):
+        slide_data, slide_to_save = results[f"slide_{slide_number}_assembly"]
+        slides_data.append(slide_data)
+        slides_to_save.append(slide_to_save)
+        total_tokens += results[f"slide_{slide_number}_content"][1]
+        total_tokens += results[f"slide_{slide_number}_image"][2]
+    for batch_name in set(content_batches.values()):
+        total_tokens += results[batch_name][1]
+    
+    return slides_data, slides_to_save, total_tokens
+
+
+def save_call_ledger(db: Session, presentation_id: str, call_ledger: CallLedger) -> None:
+    """Persist the provider calls of a generation attempt (failed attempts included, their calls were spent)"""
+    if not (db and call_ledger.entries):
+        return
+    try:
+        crud.create_presentation_calls_batch(db, [
+            schemas.PRESENTATION_CALLSCreate(presentation_id=presentation_id, **entry)
+            for entry in call_ledger.entries
+        ])
+    except Exception as e:
+        db.rollback()
+        print(f"⚠ Warning: Could not save the call ledger of presentation {presentation_id}: {e}")
+
+
+def load_call_ledger(db: Session, presentation_id: str) -> Optional[CallLedger]:
+    """The provider calls saved for a presentation by all of its generation attempts, or None"""
+    calls = crud.get_calls_for_presentation(db, presentation_id)
+    if not calls:
+        return None
+    return CallLedger.from_entries([
+        schemas.PRESENTATION_CALLSCreate.model_validate(call, from_attributes=True).model_dump(exclude={"presentation_id"})
+        for call in calls
+    ])
 
 
-def finalize_presentation(presentation_data: Dict, slides_to_save: list, 
-                        presentation_id: str, total_tokens: int, 
-                        db: Session, start_time: float) -> None:
-    """Finalize presentation: save to database, create PowerPoint, cleanup"""
+@app.on_event("startup")
+async def create_call_ledger_table():
+    try:
+        await asyncio.to_thread(create_presentation_calls_table)
+    except Exception as e:
+        print(f"⚠ Warning: Could not create the PRESENTATION_CALLS table, call ledgers will not be saved: {e}")
+
+
+def finalize_presentation(presentation_data: Dict, presentation_id: str, 
+                        total_tokens: int, db: Session, start_time: float) -> None:
+    """Finalize presentation: update metadata and database (slides are saved as they complete)"""
     
     # Update presentation metadata
     presentation_data["tokens_used"] = total_tokens
     
-    # Save slides to database
-    if db and slides_to_save:
-        crud.create_presentation_slides_batch(db, slides_to_save)
-    
     # Save presentation to file
     presentations[presentation_id]["data"] = presentation_data
-    presentations[presentation_id]["status"] = "completed"
-    presentations[presentation_id]["progress"] = {"completion": 100}
+    update_progress(presentation_id, {"completion": 100})
+    update_status(presentation_id, "completed")
     
     # Calculate generation time and update database
     end_time = time.time()
@@ -275,11 +602,10 @@ def finalize_presentation(presentation_data: Dict, slides_to_save: list,
 
 def create_presentation_files(presentation_data: Dict, presentation_id: str, 
                             slide_count: int, generate_voiceover: bool) -> str:
-    """Create PowerPoint file and handle cleanup"""
+    """Return the PowerPoint file assembled during generation and handle cleanup"""
     
-    # Create PowerPoint file (will use the already downloaded local images)
-    print("Creating PowerPoint presentation...")
-    pptx_file_path = create_presentation_from_data(presentation_data)
+    # The PowerPoint file is assembled slide by slide while the presentation is generated
+    pptx_file_path = presentation_data.get("pptx_file_path")
     
     if pptx_file_path:
         print(f"✓ PowerPoint file created: {pptx_file_path}")
@@ -303,26 +629,102 @@ async def generate_full_presentation_task(
         client_id: str, 
         voice_id: int = 1,
         organization_code: str = None, 
-        db: Session = None):
+        db: Session = None,
+        deadline_seconds: float = None,
+        submitted_at: float = None,
+        content_batch_size: int = 1,
+        use_cache: bool = True,
+        stream_outline: bool = False,
+        agent_models: Dict[str, Dict[str, Any]] = None,
+        review_mode: str = "test_and_fix"):
+    """
+    Generate a presentation. If an earlier attempt of the same presentation failed, its
+    checkpoint is resumed: finished stages are reused, and their tokens and time still count
+    towards the totals of the presentation.
+
+    With deadline_seconds (counted from submitted_at), optional steps are skipped once they
+    no longer fit in the remaining time; the shortcuts taken are reported with the result.
+    With use_cache disabled, no agent call is answered from (or stored in) the response cache.
+    With stream_outline (not for agentic presentations, whose outline is tested and fixed as a
+    whole), slides are generated while the outline is still being streamed. agent_models
+    overrides the model settings of agent roles for this presentation. review_mode selects how
+    agentic presentations review their outline and content (see FullPresentationRequest).
+    """
     
     start_time = time.time()
+    checkpoint = None
+    outline_task = None
+    budget = GenerationBudget(deadline_seconds, submitted_at)
+    if presentation_id in presentations:
+        presentations[presentation_id]["shortcuts"] = budget.shortcuts
+    
+    # Every agent call of this presentation adds its usage, including prompt cache hits,
+    # and is recorded in the call ledger with its stage, latency and tokens
+    token_usage = TokenUsage()
+    token_usage_token = current_token_usage.set(token_usage)
+    call_ledger = CallLedger()
+    call_ledger_token = current_call_ledger.set(call_ledger)
+    call_stage_token = current_call_stage.set(("outline", None))
+    if presentation_id in presentations:
+        presentations[presentation_id]["call_ledger"] = call_ledger
+    response_cache_token = response_cache_enabled.set(use_cache)
+    agent_models = normalize_model_overrides(agent_models)
+    model_overrides_token = current_model_overrides.set(agent_models)
     
     try:
+        checkpoint = PresentationCheckpoint.load(presentation_id) or PresentationCheckpoint(
+            presentation_id,
+            request={
+                "topic": topic,
+                "slide_count": slide_count,
+                "image_quality": image_quality,
+                "generate_voiceover": generate_voiceover,
+                "is_agentic": is_agentic,
+                "client_id": client_id,
+                "voice_id": voice_id,
+                "organization_code": organization_code,
+                "deadline_seconds": deadline_seconds,
+                "content_batch_size": content_batch_size,
+                "use_cache": use_cache,
+                "stream_outline": stream_outline,
+                "agent_models": agent_models,
+                "review_mode": review_mode
+            }
+        )
+        start_time -= checkpoint.generation_time
+        
         # Initialize presentation generation
         total_tokens = initialize_presentation_generation(
             presentation_id, topic, slide_count, client_id, db
         )
 
-        # Generate and validate outline
-        outline, outline_tokens = generate_and_validate_outline(
-            topic, slide_count, is_agentic, presentation_id
-        )
-        total_tokens += outline_tokens
+        # Slide stages saved without an outline were made for the streamed outline of an earlier
+        # attempt that failed before it was complete; they do not fit the outline generated now
+        if not checkpoint.outline:
+            checkpoint.clear_slides()
+
+        # Generate and validate outline, unless an earlier attempt already did
+        if checkpoint.outline:
+            outline = PresentationOutline.model_validate(checkpoint.outline)
+            presentation_title, slide_outlines = outline.presentation_title, outline.slide_outlines
+            total_tokens += checkpoint.outline_tokens
+        elif stream_outline and not is_agentic:
+            # Slide outlines are futures until they are streamed, the tokens are added once it is done
+            outline_task, presentation_title, slide_outlines = await start_outline_stream(
+                topic, slide_count, presentation_id, checkpoint
+            )
+        else:
+            outline, outline_tokens = await generate_and_validate_outline(
+                topic, slide_count, is_agentic, presentation_id, budget, review_mode
+            )
+            checkpoint.set_outline(outline.model_dump(), outline_tokens)
+            presentation_title, slide_outlines = outline.presentation_title, outline.slide_outlines
+            total_tokens += outline_tokens
         
         # Prepare presentation data structure
         presentation_data = {
             "id": presentation_id,
-            "title": outline.presentation_title,
+            "title": presentation_title,
             "topic": topic,
             "slide_count": slide_count,
             "creation_time": datetime.now().isoformat(),
@@ -334,30 +736,143 @@ async def generate_full_presentation_task(
         # Get image model
         model = IMAGE_QUALITY_MODELS.get(image_quality.lower(), IMAGE_QUALITY_MODELS["medium"])
         
-        # List to store slide data for database
-        slides_to_save = []
+        # Resolve the voice once, the database session is not shared with the concurrent slide stages
+        elevenlabs_voice_id = get_elevenlabs_voice_id(voice_id, db) if generate_voiceover else None
         
-        # Process each slide
-        for i, slide in enumerate(outline.slide_outlines):
-            slide_data, slide_to_save, slide_tokens = process_single_slide(
-                slide, i, slide_count, outline.presentation_title, presentation_id,
-                model, is_agentic, generate_voiceover, voice_id, db
-            )
-            
-            total_tokens += slide_tokens
-            presentation_data["slides"].append(slide_data)
-            slides_to_save.append(slide_to_save)
+        update_status(presentation_id, "generating_slides")
+        
+        # Start the PowerPoint file, slides are added to it as soon as they are ready
+        print("Creating PowerPoint presentation...")
+        presentation_builder = start_presentation(presentation_title)
+        
+        # Generate all slides
+        slides_data, slides_to_save, slides_tokens = await generate_slides_with_task_graph(
+            slide_outlines, slide_count, presentation_title, presentation_id,
+            model, is_agentic, generate_voiceover, elevenlabs_voice_id, presentation_builder,
+            checkpoint, budget, db, content_batch_size, review_mode
+        )
+        total_tokens += slides_tokens
+        if outline_task:
+            total_tokens += await outline_task
+        presentation_data["slides"] = slides_data
+        presentation_data["shortcuts"] = budget.shortcuts
+        presentation_data["token_usage"] = token_usage.to_dict()
+        presentation_data["call_summary"] = call_ledger.get_summary()
+        
+        # Save the PowerPoint file (uses the already downloaded local images)
+        presentation_data["pptx_file_path"] = (
+            save_generated_presentation(presentation_builder, presentation_id, presentation_title)
+            if presentation_builder else None
+        )
         
         # Finalize presentation
         finalize_presentation(
-            presentation_data, slides_to_save, presentation_id, 
+            presentation_data, presentation_id, 
             total_tokens, db, start_time
         )
+        save_call_ledger(db, presentation_id, call_ledger)
+        checkpoint.delete()
             
     except Exception as e:
+        # Keep the finished stages so the presentation can be resumed
+        if checkpoint:
+            checkpoint.set_generation_time(time.time() - start_time)
+        save_call_ledger(db, presentation_id, call_ledger)
         if presentation_id in presentations:
-            presentations[presentation_id]["status"] = "error"
-            presentations[presentation_id]["error"] = str(e)
+            update_status(presentation_id, "error", error=str(e))
+    finally:
+        if outline_task and not outline_task.done():
+            outline_task.cancel()
+        elif outline_task and not outline_task.cancelled():
+            # An outline error already failed the slides waiting for it
+            outline_task.exception()
+        current_token_usage.reset(token_usage_token)
+        response_cache_enabled.reset(response_cache_token)
+        current_model_overrides.reset(model_overrides_token)
+        current_call_ledger.reset(call_ledger_token)
+        current_call_stage.reset(call_stage_token)
+
+
+def register_presentation(presentation_id: str, presentation_req: FullPresentationRequest, client_id: str) -> None:
+    """Initialize presentation in storage"""
+    presentations[presentation_id] = {
+        "status": "processing",
+        "creation_time": datetime.now().isoformat(),
+        "submitted_at": time.time(),
+        "request": {
+            "topic": presentation_req.topic,
+            "slide_count": presentation_req.slide_count,
+            "image_quality": presentation_req.image_quality,
+            "is_agentic": presentation_req.is_agentic,
+            "organization_code": presentation_req.organization_code,
+            "voice_id": presentation_req.voice_id,
+            "deadline_seconds": presentation_req.deadline_seconds,
+            "content_batch_size": presentation_req.content_batch_size,
+            "use_cache": presentation_req.use_cache,
+            "stream_outline": presentation_req.stream_outline,
+            "agent_models": normalize_model_overrides(presentation_req.agent_models),
+            "review_mode": presentation_req.review_mode,
+            "client_id": client_id
+        }
+    }
+
+
+def get_presentation_cost(presentation_req: FullPresentationRequest) -> int:
+    """Relative amount of work of a presentation, agentic slides take about twice the calls"""
+    return presentation_req.slide_count * (2 if presentation_req.is_agentic else 1)
+
+
+def queue_presentation(presentation_id: str, presentation_req: FullPresentationRequest, 
+                       client_id: str, scope: int = None) -> Dict[str, Any]:
+    """Queue the presentation for the worker pool, scheduled fairly with the other tenants"""
+    tenant, max_concurrency = get_tenant(client_id, scope)
+    try:
+        queue_position = submit_presentation_job(
+            presentation_id, partial(run_presentation_job, presentation_id, presentation_req, client_id),
+            tenant, max_concurrency, get_presentation_cost(presentation_req)
+        )
+    except QueueFullError as e:
+        del presentations[presentation_id]
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {
+        "presentation_id": presentation_id,
+        "status": "queued",
+        "queue_position": queue_position
+    }
+
+
+async def run_presentation_job(presentation_id: str, presentation_req: FullPresentationRequest, client_id: str):
+    """Generate a queued presentation with its own database session"""
+    db = SessionLocal()
+    try:
+        await generate_full_presentation_task(
+            presentation_id=presentation_id,
+            topic=presentation_req.topic,
+            slide_count=presentation_req.slide_count,
+            image_quality=presentation_req.image_quality,
+            generate_voiceover=presentation_req.generate_voiceover,
+            is_agentic=presentation_req.is_agentic,
+            client_id=client_id,
+            voice_id=presentation_req.voice_id,
+            organization_code=presentation_req.organization_code,
+            db=db,
+            deadline_seconds=presentation_req.deadline_seconds,
+            submitted_at=presentations[presentation_id]["submitted_at"],
+            content_batch_size=presentation_req.content_batch_size,
+            use_cache=presentation_req.use_cache,
+            stream_outline=presentation_req.stream_outline,
+            agent_models=presentation_req.agent_models,
+            review_mode=presentation_req.review_mode
+        )
+        
+        if presentations[presentation_id]["status"] == "completed":
+            data = presentations[presentation_id]["data"]
+            create_presentation_files(
+                data, presentation_id, data["slide_count"], presentation_req.generate_voiceover
+            )
+    finally:
+        db.close()
 
 
 @app.post("/generate-presentation", response_model=Dict[str, Any])
@@ -368,7 +883,12 @@ async def generate_presentation_sync(
     credentials: HTTPAuthorizationCredentials = Depends(auth_middleware.check_auth),
     db: Session = Depends(get_db)
 ):
-    """Generate a complete presentation synchronously (will take time)"""
+    """
+    Generate a complete presentation synchronously (will take time).
+    
+    With run_in_background the presentation is queued instead and the presentation_id is
+    returned right away; progress is then tracked with GET /presentation/{presentation_id}.
+    """
 
     presentation_req = FullPresentationRequest.model_validate_json(presentation_req)
     client_info = request.state.client_info
@@ -383,32 +903,40 @@ async def generate_presentation_sync(
     print(f"Extracted text from uploaded file: {extracted_text[:100]}...")  # Print first 100 characters for debugging
 
     # Initialize presentation in storage
-    presentations[presentation_id] = {
-        "status": "processing",
-        "creation_time": datetime.now().isoformat(),
-        "request": {
-            "topic": presentation_req.topic,
-            "slide_count": presentation_req.slide_count,
-            "image_quality": presentation_req.image_quality,
-            "is_agentic": presentation_req.is_agentic,
-            "organization_code": presentation_req.organization_code,
-            "voice_id": presentation_req.voice_id
-        }
-    }
-    
-    # Generate the presentation
-    await generate_full_presentation_task(
-        presentation_id=presentation_id,
-        topic=presentation_req.topic,
-        slide_count=presentation_req.slide_count,
-        image_quality=presentation_req.image_quality,
-        generate_voiceover=presentation_req.generate_voiceover,
-        is_agentic=presentation_req.is_agentic,
-        client_id=client_id,
-        voice_id=presentation_req.voice_id,
-        organization_code=presentation_req.organization_code,
-        db=db
-    )
+    register_presentation(presentation_id, presentation_req, client_id)
+    
+    # Queue the presentation for the worker pool if requested
+    scope = client_info.scope if client_info else None
+    if presentation_req.run_in_background:
+        return queue_presentation(presentation_id, presentation_req, client_id, scope)
+    
+    # Generate the presentation within the tenant's concurrency cap, like queued ones, sharing
+    # provider quota fairly with the other tenants
+    tenant, max_concurrency = get_tenant(client_id, scope)
+    async with presentation_slot(tenant, max_concurrency):
+        tenant_token = current_tenant.set(tenant)
+        try:
+            await generate_full_presentation_task(
+                presentation_id=presentation_id,
+                topic=presentation_req.topic,
+                slide_count=presentation_req.slide_count,
+                image_quality=presentation_req.image_quality,
+                generate_voiceover=presentation_req.generate_voiceover,
+                is_agentic=presentation_req.is_agentic,
+                client_id=client_id,
+                voice_id=presentation_req.voice_id,
+                organization_code=presentation_req.organization_code,
+                db=db,
+                deadline_seconds=presentation_req.deadline_seconds,
+                submitted_at=presentations[presentation_id]["submitted_at"],
+                content_batch_size=presentation_req.content_batch_size,
+                use_cache=presentation_req.use_cache,
+                stream_outline=presentation_req.stream_outline,
+                agent_models=presentation_req.agent_models,
+                review_mode=presentation_req.review_mode
+            )
+        finally:
+            current_tenant.reset(tenant_token)
 
     # Return error if generation failed
     if presentations[presentation_id]["status"] == "error":
@@ -434,11 +962,44 @@ async def generate_presentation_sync(
         "data": {
             "title": presentation_title,
             "slide_count": slide_count,
-            "pptx_file_path": pptx_file_path
+            "pptx_file_path": pptx_file_path,
+            "shortcuts": data["shortcuts"]
         }
     }
     
     return Response(
         content=json.dumps(return_response),
         media_type="application/json"
-    )
\ No newline at end of file
+    )
+
+
+@app.post("/presentation/{presentation_id}/resume", response_model=Dict[str, Any])
+async def resume_presentation(
+    request: Request,
+    presentation_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_middleware.check_auth),
+    db: Session = Depends(get_db)
+):
+    """Resume a failed presentation in the background, only the missing stages are generated again"""
+    client_info = request.state.client_info
+    client_id = client_info.client_id if client_info else "anonymous"
+    
+    checkpoint = PresentationCheckpoint.load(presentation_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="No resumable generation found for this presentation")
+    
+    # Check if the presentation belongs to the authenticated client
+    saved_request = dict(checkpoint.request)
+    owner_client_id = saved_request.pop("client_id")
+    if owner_client_id != client_id and client_id != "admin":
+        raise HTTPException(status_code=403, detail="You don't have permission to access this presentation")
+    
+    if presentations.get(presentation_id, {}).get("status", "error") != "error":
+        raise HTTPException(status_code=409, detail="Presentation is still being generated")
+    
+    presentation_req = FullPresentationRequest(**saved_request, run_in_background=True)
+    print(f"Resuming presentation with ID: {presentation_id} for client: {client_id}")
+    
+    owner = crud.get_client_info_by_id(db, owner_client_id)
+    register_presentation(presentation_id, presentation_req, owner_client_id)
+    return queue_presentation(presentation_id, presentation_req, owner_client_id, owner.scope if owner else None)
@@ -0,0 +1,62 @@
+# api/progress.py
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from api.app import presentations
+
+# Statuses after which a presentation does not change anymore
+FINAL_STATUSES = ("completed", "error")
+
+# Event queues of the clients streaming each presentation
+subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+
+def subscribe(presentation_id: str) -> asyncio.Queue:
+    """Return a queue receiving every event published for the presentation from now on"""
+    queue = asyncio.Queue()
+    subscribers.setdefault(presentation_id, []).append(queue)
+    return queue
+
+
+def unsubscribe(presentation_id: str, queue: asyncio.Queue) -> None:
+    queues = subscribers.get(presentation_id, [])
+    if queue in queues:
+        queues.remove(queue)
+    if not queues:
+        subscribers.pop(presentation_id, None)
+
+
+def publish_event(presentation_id: str, event_type: str, data: Dict[str, Any]) -> None:
+    """Send an event to every client streaming the presentation"""
+    for queue in subscribers.get(presentation_id, []):
+        queue.put_nowait((event_type, data))
+
+
+def get_status_event(presentation_id: str) -> Dict[str, Any]:
+    presentation = presentations[presentation_id]
+    event = {"status": presentation["status"]}
+    if presentation["status"] == "completed":
+        event["title"] = presentation["data"]["title"]
+        event["pptx_file_path"] = presentation["data"].get("pptx_file_path")
+    if presentation["status"] == "error":
+        event["error"] = presentation.get("error")
+    return event
+
+
+def update_status(presentation_id: str, status: str, error: str = None) -> None:
+    """Set the status of a presentation and publish it"""
+    presentations[presentation_id]["status"] = status
+    if error is not None:
+        presentations[presentation_id]["error"] = error
+    publish_event(presentation_id, "status", get_status_event(presentation_id))
+
+
+def update_progress(presentation_id: str, progress: Dict[str, Any]) -> None:
+    """Set the progress of a presentation and publish it"""
+    presentations[presentation_id]["progress"] = progress
+    publish_event(presentation_id, "progress", progress)
+
+
+def format_server_sent_event(event_type: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
@@ -1,6 +1,6 @@
 #%%
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 
 
 class Credentials(BaseModel):
@@ -36,6 +36,11 @@ class ValidationWithOutline(BaseModel):
     validation_feedback: OutlineValidationResult = Field(description="The result of the outline validation")
     tested_outline: PresentationOutline = Field(description="The tested outline")
 
+class OutlineCritiqueRevision(BaseModel):
+    feedback: str = Field(description="Feedback on the evaluated outline. This should indicate the slide numbers that need to be improved.")
+    score: int = Field(description="The score of the evaluated outline")
+    revised_outline: PresentationOutline = Field(description="The outline revised to address the feedback, the evaluated outline unchanged if it has no issues")
+
 
 
 class OnscreenText(BaseModel):
@@ -46,15 +51,32 @@ class SlideContent(BaseModel):
     slide_voiceover_text: str = Field(description="The text for the voiceover of this particular slide")
     slide_image_prompt: str = Field(description="A detailed prompt text to generate an image for this particular slide. This is always in English regardless of the language of the presentation")
 
+class NumberedSlideContent(SlideContent):
+    slide_number: int = Field(description="The number of the slide this content is for")
+
+class SlideContentBatch(BaseModel):
+    slide_contents: List[NumberedSlideContent] = Field(description="Content of each requested slide, one item per slide in slide order")
+
 class ContentValidationResult(BaseModel):
     # is_valid: bool = Field(description="Whether the content is valid or not")    
     feedback: str = Field(description="Feedback on the content")    
     score: int = Field(description="The score of the content")
 
+class NumberedContentValidationResult(ContentValidationResult):
+    item_number: int = Field(description="The number of the evaluated item")
+
+class ContentValidationBatch(BaseModel):
+    results: List[NumberedContentValidationResult] = Field(description="The evaluation of each item, one result per item in item order")
+
 class ValidationWithContent(BaseModel):
     validation_feedback: ContentValidationResult = Field(description="The result of the content validation")
     tested_content: SlideContent = Field(description="The tested content")
 
+class ContentCritiqueRevision(BaseModel):
+    feedback: str = Field(description="Feedback on the evaluated content")
+    score: int = Field(description="The score of the evaluated content")
+    revised_content: SlideContent = Field(description="The content revised to address the feedback, the evaluated content unchanged if it has no issues")
+
 
 
 
@@ -67,6 +89,12 @@ class ImageValidationResult(BaseModel):
     score: int = Field(description="The score of the image validation")
     # is_valid: bool = Field(description="Whether the image meets quality requirements")   
 
+class NumberedImageValidationResult(ImageValidationResult):
+    item_number: int = Field(description="The number of the item whose image was evaluated")
+
+class ImageValidationBatch(BaseModel):
+    results: List[NumberedImageValidationResult] = Field(description="The evaluation of each image, one result per item in item order")
+
 class ImageValidationWithSlideContent(BaseModel):
     validation_feedback: ImageValidationResult = Field(description="The result of the image validation")
     tested_slide_content: SlideContent = Field(description="The tested slide content")
@@ -99,6 +127,17 @@ class ImageRequest(BaseModel):
     image_prompt: str = Field(..., description="Prompt for image generation")
     quality: str = Field("medium", description="Image quality (low, medium, high)")
 
+AgentRole = Literal[
+    "outline_initial_generator", "outline_tester", "outline_fixer",
+    "content_initial_generator", "content_batch_generator", "content_tester", "content_fixer",
+    "image_tester", "image_fixer", "outline_critic", "content_critic"
+]
+
+class AgentModelSettings(BaseModel):
+    model: Optional[str] = Field(None, description="Anthropic model used by the agent")
+    max_tokens: Optional[int] = Field(None, gt=0, description="Maximum number of output tokens")
+    temperature: Optional[float] = Field(None, ge=0, le=1, description="Sampling temperature")
+
 class FullPresentationRequest(BaseModel):
     topic: str = Field(..., description="Topic of the presentation")
     slide_count: int = Field(..., ge=2, le=15, description="Number of slides")
@@ -107,6 +146,13 @@ class FullPresentationRequest(BaseModel):
     is_agentic: bool = Field(False, description="Whether the presentation is agentic")
     organization_code: Optional[str] = Field(None, description="Organization code")
     voice_id: Optional[int] = Field(None, description="Voice ID for voiceover generation")
+    run_in_background: bool = Field(False, description="Return the presentation_id right away and generate the presentation in the background")
+    content_batch_size: int = Field(1, ge=1, le=15, description="Number of slides whose content is generated in a single call, 1 generates each slide separately")
+    use_cache: bool = Field(True, description="Whether identical agent calls made earlier may be answered from the response cache")
+    deadline_seconds: Optional[float] = Field(None, gt=0, description="Time budget in seconds, optional validation and fixing steps are skipped when it runs short")
+    stream_outline: bool = Field(False, description="Start generating slides while the outline is still being streamed (ignored for agentic presentations, whose outline is tested first)")
+    review_mode: Literal["test_and_fix", "critique_and_revise"] = Field("test_and_fix", description="How agentic presentations review the outline and slide content: a tester and a fixer call, or a single combined critique-and-revise call")
+    agent_models: Optional[Dict[AgentRole, AgentModelSettings]] = Field(None, description="Model settings of agent roles, overriding the default routing of those roles")
 
 class PresentationStatusResponse(BaseModel):
     presentation_id: str
@@ -1,7 +1,7 @@
 # data/db/crud.py
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from data.db.models import CLIENT_INFORMATION, PRESENTATION_HISTORY, PRESENTATION_SLIDES, PS_VOICES
+from data.db.models import CLIENT_INFORMATION, PRESENTATION_HISTORY, PRESENTATION_SLIDES, PRESENTATION_CALLS, PS_VOICES
 from data.db import schemas
 
 # CRUD operations for CLIENT_INFORMATION
@@ -99,6 +99,16 @@ def delete_all_slides_for_presentation(db: Session, presentation_id: str):
     db.commit()
     return True
 
+# CRUD operations for PRESENTATION_CALLS
+def get_calls_for_presentation(db: Session, presentation_id: str):
+    return db.query(PRESENTATION_CALLS).filter(PRESENTATION_CALLS.presentation_id == presentation_id).order_by(PRESENTATION_CALLS.id).all()
+
+def create_presentation_calls_batch(db: Session, calls: list[schemas.PRESENTATION_CALLSCreate]):
+    db_calls = [PRESENTATION_CALLS(**call_data.model_dump()) for call_data in calls]
+    db.add_all(db_calls)
+    db.commit()
+    return db_calls
+
 def get_full_presentation_with_slides(db: Session, presentation_id: str):
     presentation = db.query(PRESENTATION_HISTORY).filter(
         PRESENTATION_HISTORY.presentation_id == presentation_id
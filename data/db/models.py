@@ -1,7 +1,7 @@
 # data/db/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, Boolean
 from sqlalchemy.orm import relationship
-from data.db.database import Base
+from data.db.database import Base, engine
 from datetime import datetime, timezone
 
 class CLIENT_INFORMATION(Base):
@@ -43,6 +43,30 @@ class PRESENTATION_SLIDES(Base):
     # Define the relationship with PRESENTATION_HISTORY
     presentation = relationship("PRESENTATION_HISTORY", back_populates="slides")
 
+class PRESENTATION_CALLS(Base):
+    __tablename__ = 'PRESENTATION_CALLS'
+    id = Column(Integer, primary_key=True)
+    presentation_id = Column(String(50), ForeignKey("PRESENTATION_HISTORY.presentation_id"), index=True)
+    stage = Column(String(50))
+    slide_number = Column(Integer, nullable=True)
+    agent = Column(String(100))
+    provider = Column(String(50))
+    model = Column(String(255))
+    started_at = Column(Float)
+    latency_seconds = Column(Float)
+    input_tokens = Column(Integer)
+    output_tokens = Column(Integer)
+    retries = Column(Integer)
+    hedged = Column(Boolean)
+    cached = Column(Boolean)
+    cost_usd = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    created_on = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+def create_presentation_calls_table(bind=engine):
+    """Create PRESENTATION_CALLS where it is missing, the table is newer than the databases already deployed"""
+    PRESENTATION_CALLS.__table__.create(bind, checkfirst=True)
 
 
 class PS_VOICES(Base):
@@ -59,6 +59,33 @@ class PRESENTATION_HISTORY(PRESENTATION_HISTORYBase):
     
     model_config = model_config
 
+# Presentation Call Schemas (one row per provider call of a generation attempt)
+class PRESENTATION_CALLSBase(BaseModel):
+    presentation_id: str
+    stage: str
+    slide_number: Optional[int] = None
+    agent: str
+    provider: str
+    model: str
+    started_at: float
+    latency_seconds: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0
+    hedged: bool = False
+    cached: bool = False
+    cost_usd: Optional[float] = None
+    error: Optional[str] = None
+
+class PRESENTATION_CALLSCreate(PRESENTATION_CALLSBase):
+    pass
+
+class PRESENTATION_CALLS(PRESENTATION_CALLSBase):
+    id: int
+    created_on: datetime
+    
+    model_config = model_config
+
 # Slide Response Schema for API
 class SlideResponseSchema(BaseModel):
     slide_number: int
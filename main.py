@@ -12,6 +12,7 @@ from api.app import app
 import api.auth
 import api.endpoints
 import api.presentation
+import api.job_queue
 
 # Import necessary for direct execution
 if __name__ == "__main__":
@@ -293,6 +293,57 @@ class PowerPointGenerator:
             return False
 
 
+def start_presentation(presentation_title):
+    """
+    Create a new presentation with its title slide so content slides can be added one at a time
+    
+    Returns:
+        PowerPointGenerator: Generator to add content slides to, or None if failed
+    """
+    
+    generator = PowerPointGenerator()
+    
+    # Create presentation
+    if not generator.create_presentation_safely():
+        return None
+    
+    # Add title slide
+    if not generator.add_title_slide(presentation_title):
+        return None
+    
+    return generator
+
+
+def save_generated_presentation(generator, presentation_id, presentation_title):
+    """
+    Validate and save a presentation whose content slides have all been added
+    
+    Returns:
+        str: Path to created PowerPoint file, or None if failed
+    """
+    
+    # Validate structure
+    if not generator.validate_presentation_structure():
+        print("❌ Presentation structure validation failed")
+        return None
+    
+    # Generate filename
+    safe_title = "".join(c for c in presentation_title if c.isalnum() or c in (' ', '-', '_')).strip()
+    safe_title = safe_title.replace(' ', '_')
+    filename = f"{presentation_id}_{safe_title}.pptx"
+    
+    # Save presentation
+    file_path = generator.save_presentation_safely(filename, presentation_id)
+    
+    if file_path:
+        print(f"\n🎉 SUCCESS: PowerPoint presentation created!")
+        print(f"📁 File: {file_path}")
+        return file_path
+    else:
+        print("\n❌ ERROR: Failed to save presentation")
+        return None
+
+
 def create_presentation_from_data(presentation_data):
     """
     Main function to create PowerPoint presentation from AI-generated data
@@ -321,7 +372,7 @@ def create_presentation_from_data(presentation_data):
         str: Path to created PowerPoint file, or None if failed
     """
     
-    generator = PowerPointGenerator()
+    generator = None
     
     try:
         print("=== PowerPoint Generation Started ===")
@@ -335,12 +386,9 @@ def create_presentation_from_data(presentation_data):
         print(f"Creating presentation: {presentation_title}")
         print(f"Slides to generate: {slide_count}")
         
-        # Create presentation
-        if not generator.create_presentation_safely():
-            return None
-        
-        # Add title slide
-        if not generator.add_title_slide(presentation_title):
+        # Create presentation with its title slide
+        generator = start_presentation(presentation_title)
+        if generator is None:
             return None
         
         # Add content slides
@@ -349,26 +397,8 @@ def create_presentation_from_data(presentation_data):
                 print(f"⚠ Warning: Failed to add slide {slide_data.get('number', '?')}")
                 # Continue with other slides
         
-        # Validate structure
-        if not generator.validate_presentation_structure():
-            print("❌ Presentation structure validation failed")
-            return None
-        
-        # Generate filename
-        safe_title = "".join(c for c in presentation_title if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_title = safe_title.replace(' ', '_')
-        filename = f"{presentation_id}_{safe_title}.pptx"
-        
-        # Save presentation
-        file_path = generator.save_presentation_safely(filename, presentation_id)
-        
-        if file_path:
-            print(f"\n🎉 SUCCESS: PowerPoint presentation created!")
-            print(f"📁 File: {file_path}")
-            return file_path
-        else:
-            print("\n❌ ERROR: Failed to save presentation")
-            return None
+        # Validate and save
+        return save_generated_presentation(generator, presentation_id, presentation_title)
             
     except Exception as e:
         print(f"\n❌ CRITICAL ERROR: {e}")
@@ -376,5 +406,6 @@ def create_presentation_from_data(presentation_data):
         
     finally:
         # Cleanup temporary files
-        generator.cleanup_temp_images()
+        if generator:
+            generator.cleanup_temp_images()
 
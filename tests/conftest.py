@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+# The tests run offline against the fake provider backends, with a throwaway database and no
+# response cache; this has to be set before the app modules are imported
+os.environ.setdefault("AGENT_BACKEND", "fake")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("RESPONSE_CACHE_DIRECTORY", "")
+os.environ.setdefault("FAKE_IMAGE_SERVER_PORT", "0")
+os.environ.setdefault("FAL_POLL_INTERVAL_SECONDS", "0.01")
+for name in ("FAKE_LLM_LATENCY_SECONDS", "FAKE_IMAGE_LATENCY_SECONDS", "FAKE_TTS_LATENCY_SECONDS"):
+    os.environ.setdefault(name, "0.01")
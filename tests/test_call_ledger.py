@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from agents.call_ledger import CallLedger
+from api.endpoints import get_presentation_status
+from api.presentation import save_call_ledger
+from data.db import crud, models, schemas
+from data.db.database import Base, SessionLocal, engine
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine, tables=[models.PRESENTATION_HISTORY.__table__])
+    # As in a database deployed before the call ledger was persisted
+    models.PRESENTATION_CALLS.__table__.drop(engine, checkfirst=True)
+    models.create_presentation_calls_table()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def get_status(presentation_id, client_id, db):
+    request = SimpleNamespace(state=SimpleNamespace(client_info=SimpleNamespace(client_id=client_id)))
+    return asyncio.run(get_presentation_status(request, presentation_id, credentials=None, db=db))
+
+
+def test_status_serves_saved_calls_after_restart(db):
+    crud.create_presentation_history(db, schemas.PRESENTATION_HISTORYCreate(
+        presentation_id="saved", topic="topic", client_id="client", slide_count=1, total_tokens=0, generation_time=0.0,
+        created_on=datetime.now(timezone.utc)
+    ))
+    call_ledger = CallLedger()
+    call_ledger.record(agent="outline_initial_generator", provider="anthropic", model="model", latency_seconds=1.5,
+                       input_tokens=10, output_tokens=20)
+    call_ledger.record(agent="image_generator", provider="fal", model="fal-ai/flux/dev", latency_seconds=3.0,
+                       cost_usd=0.015)
+    save_call_ledger(db, "saved", call_ledger)
+
+    status = get_status("saved", "client", db)
+    assert status["status"] == "unknown"
+    assert status["calls"] == call_ledger.to_dict()
+
+    with pytest.raises(HTTPException) as error:
+        get_status("saved", "other_client", db)
+    assert error.value.status_code == 403
+    with pytest.raises(HTTPException) as error:
+        get_status("missing", "client", db)
+    assert error.value.status_code == 404
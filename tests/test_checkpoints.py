@@ -0,0 +1,38 @@
+import os
+import time
+from api import checkpoints
+from api.app import presentations
+from api.checkpoints import PresentationCheckpoint, delete_expired_checkpoints
+
+
+def save_checkpoint(presentation_id, age_seconds):
+    checkpoint = PresentationCheckpoint(presentation_id, request={"topic": "topic"})
+    checkpoint.save()
+    os.makedirs(f"images/{presentation_id}", exist_ok=True)
+    modified_at = time.time() - age_seconds
+    os.utime(checkpoint.get_path(presentation_id), (modified_at, modified_at))
+
+
+def test_expired_checkpoints_are_deleted_with_their_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_TTL_SECONDS", 60)
+    save_checkpoint("expired", 120)
+    save_checkpoint("recent", 10)
+    save_checkpoint("running", 120)
+    monkeypatch.setitem(presentations, "running", {"status": "processing"})
+
+    assert delete_expired_checkpoints() == 1
+    assert PresentationCheckpoint.load("expired") is None
+    assert not os.path.exists("images/expired")
+    assert PresentationCheckpoint.load("recent") is not None
+    assert os.path.exists(PresentationCheckpoint.get_path("running"))
+
+
+def test_expired_checkpoint_is_not_resumed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_TTL_SECONDS", 60)
+    save_checkpoint("abandoned", 120)
+
+    assert PresentationCheckpoint.load("abandoned") is None
+    assert not os.path.exists(PresentationCheckpoint.get_path("abandoned"))
+    assert not os.path.exists("images/abandoned")
@@ -0,0 +1,18 @@
+from agents.content_batch_generator_agent import CONTENT_BATCH_MAX_TOKENS, CONTENT_BATCH_TOKENS_PER_SLIDE, get_content_batch_model_settings
+from agents.model_routing import AGENT_MODEL_ROUTES, FAST_MODEL, current_model_overrides
+
+
+def test_max_tokens_scale_with_the_batch():
+    default_max_tokens = AGENT_MODEL_ROUTES["content_batch_generator"]["max_tokens"]
+    assert get_content_batch_model_settings(2)["max_tokens"] == default_max_tokens
+    assert get_content_batch_model_settings(12)["max_tokens"] == 12 * CONTENT_BATCH_TOKENS_PER_SLIDE
+    assert get_content_batch_model_settings(15)["max_tokens"] <= CONTENT_BATCH_MAX_TOKENS
+    assert get_content_batch_model_settings(15)["max_tokens"] >= 15 * CONTENT_BATCH_TOKENS_PER_SLIDE
+
+
+def test_overridden_route_keeps_its_max_tokens():
+    token = current_model_overrides.set({"content_batch_generator": {"model": FAST_MODEL}})
+    try:
+        assert get_content_batch_model_settings(15)["max_tokens"] == AGENT_MODEL_ROUTES["content_batch_generator"]["max_tokens"]
+    finally:
+        current_model_overrides.reset(token)
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import signal
+import pytest
+from PIL import Image
+from agents.image_transcoder import ImageTranscoder, ImageTranscodeError
+
+
+@pytest.fixture
+def source_path(tmp_path):
+    path = str(tmp_path / "source.png")
+    # Large enough that the conversions are still running when the pool is disturbed
+    Image.effect_noise((2000, 2000), 64).convert("RGBA").save(path)
+    return path
+
+
+def test_concurrent_callers_restart_broken_pool_once(tmp_path, source_path):
+    transcoder = ImageTranscoder(workers=2, queue_depth=8)
+    started_pools = []
+    start = transcoder.start
+
+    def counting_start():
+        start()
+        started_pools.append(transcoder.pool)
+
+    async def main():
+        counting_start()
+        transcoder.start = counting_start
+        conversions = asyncio.gather(*(
+            transcoder.convert_to_jpeg(source_path, str(tmp_path / f"slide_{number}.jpg")) for number in range(6)
+        ))
+        await asyncio.sleep(0.2)
+        for process in list(started_pools[0]._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        await conversions
+
+    try:
+        asyncio.run(main())
+    finally:
+        transcoder.shutdown()
+    assert len(set(map(id, started_pools))) == 2
+    for number in range(6):
+        with Image.open(tmp_path / f"slide_{number}.jpg") as image:
+            assert image.mode == "RGB"
+
+
+def test_conversion_cancelled_by_pool_shutdown_raises_ordinary_error(tmp_path, source_path):
+    transcoder = ImageTranscoder(workers=1, queue_depth=8)
+
+    async def main():
+        transcoder.start()
+        conversions = asyncio.gather(*(
+            transcoder.convert_to_jpeg(source_path, str(tmp_path / f"slide_{number}.jpg")) for number in range(6)
+        ), return_exceptions=True)
+        await asyncio.sleep(0.1)
+        transcoder.pool.shutdown(wait=False, cancel_futures=True)
+        return await conversions
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        transcoder.shutdown()
+    assert not any(isinstance(result, asyncio.CancelledError) for result in results)
+    assert any(isinstance(result, ImageTranscodeError) for result in results)
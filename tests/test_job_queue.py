@@ -0,0 +1,29 @@
+import asyncio
+from api import job_queue
+from api.job_queue import get_tenant, presentation_slot
+
+
+def test_tenant_is_the_authenticated_client_with_its_scope():
+    tenant, max_concurrency = get_tenant("client_a", scope=2)
+    assert (tenant.name, tenant.weight, max_concurrency) == ("client:client_a", 2, 4)
+
+
+def test_sync_presentations_wait_for_a_tenant_slot():
+    tenant, _ = get_tenant("client_a")
+    running = []
+    most_running = []
+
+    async def generate():
+        async with presentation_slot(tenant, 2):
+            running.append(1)
+            most_running.append(len(running))
+            await asyncio.sleep(0.02)
+            running.pop()
+
+    async def main():
+        job_queue.queue_changed = asyncio.Event()
+        await asyncio.gather(*(generate() for _ in range(5)))
+
+    asyncio.run(main())
+    assert max(most_running) == 2
+    assert tenant.name not in job_queue.running_presentations
@@ -0,0 +1,73 @@
+import asyncio
+from agents.llm_helper import get_usage_shares
+from agents.micro_batcher import MicroBatcher
+from agents.rate_limiter import Tenant, current_tenant
+from agents.response_cache import response_cache_enabled
+
+
+BATCH_TENANT = Tenant("batch:tenant_a+tenant_b", 2.0)
+
+
+def run_batch(callers):
+    """Submit one call per (tenant name, use_cache) caller within one window, return what the batch ran with"""
+    seen = {}
+
+    async def send_batch(key, items):
+        seen.update(tenant=current_tenant.get(), cache=response_cache_enabled.get(), items=list(items))
+        return [f"result {item}" for item in items]
+
+    batcher = MicroBatcher("test", send_batch, window_seconds=0.05, max_size=8)
+
+    async def caller(item, tenant_name, use_cache):
+        current_tenant.set(Tenant(tenant_name))
+        response_cache_enabled.set(use_cache)
+        result = await batcher.submit("key", item)
+        # The batch must not change the settings of its callers
+        assert current_tenant.get() == Tenant(tenant_name)
+        assert response_cache_enabled.get() is use_cache
+        return result
+
+    async def main():
+        return await asyncio.gather(*(caller(item, *settings) for item, settings in enumerate(callers)))
+
+    return asyncio.run(main()), seen
+
+
+def test_cache_off_caller_disables_cache_of_batch_opened_with_cache_on():
+    results, seen = run_batch([("tenant_a", True), ("tenant_b", False)])
+    assert results == ["result 0", "result 1"]
+    assert seen["cache"] is False
+    assert seen["tenant"] == BATCH_TENANT
+
+
+def test_cache_off_caller_disables_cache_of_batch_opened_with_cache_off():
+    results, seen = run_batch([("tenant_b", False), ("tenant_a", True)])
+    assert results == ["result 0", "result 1"]
+    assert seen["cache"] is False
+    assert seen["tenant"] == BATCH_TENANT
+
+
+def test_cache_on_callers_keep_cache_of_batch():
+    results, seen = run_batch([("tenant_a", True), ("tenant_b", True)])
+    assert results == ["result 0", "result 1"]
+    assert seen["cache"] is True
+    assert seen["tenant"] == BATCH_TENANT
+
+
+def test_single_call_is_not_batched():
+    results, seen = run_batch([("tenant_a", False)])
+    assert results == [None]
+    assert seen == {}
+
+
+def test_batch_of_one_tenant_is_made_for_that_tenant():
+    results, seen = run_batch([("tenant_a", True), ("tenant_a", True)])
+    assert results == ["result 0", "result 1"]
+    assert seen["tenant"] == Tenant("tenant_a")
+
+
+def test_usage_shares_add_up_to_batch_usage():
+    shares = get_usage_shares(1001, 502, 3)
+    assert sum(share.input_tokens for share in shares) == 1001
+    assert sum(share.output_tokens for share in shares) == 502
+    assert [share.input_tokens for share in shares] == [335, 333, 333]
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+import api.presentation as presentation
+from api.checkpoints import PresentationCheckpoint
+from data.datamodels import SlideOutline
+from data.db import models
+from data.db.database import Base, SessionLocal, engine
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # Checkpoints, images and PowerPoint files are written below the working directory
+    monkeypatch.chdir(tmp_path)
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in (
+        models.PRESENTATION_HISTORY, models.PRESENTATION_SLIDES, models.PRESENTATION_CALLS
+    )])
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def generate(presentation_id, db):
+    presentation.presentations[presentation_id] = {"status": "processing"}
+    asyncio.run(presentation.generate_full_presentation_task(
+        presentation_id, "topic", 3, "medium", False, False, "client", db=db,
+        use_cache=False, stream_outline=True
+    ))
+    return presentation.presentations[presentation_id]
+
+
+def test_resume_after_failed_outline_stream_does_not_reuse_slides_of_old_outline(db, monkeypatch):
+    presentation_id = "stream_resume"
+
+    async def failing_stream(topic_count, on_presentation_title, on_slide_outline):
+        on_presentation_title("Old title")
+        on_slide_outline(1, SlideOutline(slide_title="Old slide", slide_focus="Old focus", slide_number=1))
+        # Fail only once the content of the first slide is checkpointed
+        for _ in range(500):
+            checkpoint = PresentationCheckpoint.load(presentation_id)
+            if checkpoint and checkpoint.get_slide_stage(1, "content"):
+                break
+            await asyncio.sleep(0.01)
+        raise ConnectionError("stream interrupted")
+
+    real_stream = presentation.stream_outline_initial_generator_agent_async
+    monkeypatch.setattr(presentation, "stream_outline_initial_generator_agent_async", failing_stream)
+    failed = generate(presentation_id, db)
+    assert failed["status"] == "error"
+    checkpoint = PresentationCheckpoint.load(presentation_id)
+    assert checkpoint.outline is None
+    old_content = checkpoint.get_slide_stage(1, "content")["content"]
+
+    monkeypatch.setattr(presentation, "stream_outline_initial_generator_agent_async", real_stream)
+    resumed = generate(presentation_id, db)
+    assert resumed["status"] == "completed"
+    first_slide = resumed["data"]["slides"][0]
+    assert resumed["data"]["title"] != "Old title"
+    assert first_slide["content"].model_dump() != old_content
+    assert PresentationCheckpoint.load(presentation_id) is None
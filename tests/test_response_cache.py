@@ -0,0 +1,32 @@
+import asyncio
+import os
+import time
+from agents.response_cache import ResponseCache
+
+
+def age_entry(cache, key, age_seconds):
+    modified_at = time.time() - age_seconds
+    os.utime(cache.get_path(key), (modified_at, modified_at))
+
+
+def test_sweep_deletes_expired_then_oldest_entries(tmp_path):
+    cache = ResponseCache("test", str(tmp_path), max_entries=10, ttl_seconds=60)
+    for age_seconds, key in ((120, "aa-expired"), (30, "bb-oldest"), (20, "cc-older"), (10, "dd-newest")):
+        cache.set(key, {"value": "x" * 100})
+        age_entry(cache, key, age_seconds)
+    cache.max_disk_bytes = sum(os.path.getsize(cache.get_path(key)) for key in ("cc-older", "dd-newest"))
+
+    assert cache.sweep_disk() == 2
+    assert [os.path.exists(cache.get_path(key)) for key in ("aa-expired", "bb-oldest", "cc-older", "dd-newest")] == [False, False, True, True]
+
+
+def test_async_access_reads_and_writes_the_disk_tier(tmp_path):
+    cache = ResponseCache("test", str(tmp_path), max_entries=10, ttl_seconds=60)
+
+    async def main():
+        await cache.aset("key", {"value": 1})
+        cache.entries.clear()
+        return await cache.aget("key"), await cache.aget("missing")
+
+    assert asyncio.run(main()) == ({"value": 1}, None)
+    assert (cache.disk_hits, cache.misses) == (1, 1)
@@ -0,0 +1,79 @@
+# utils/fair_queue.py
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class WeightedFairQueue:
+    """
+    Items queued per tenant, handed out weighted-fair across tenants and in order within a tenant.
+
+    Every tenant has a virtual time that grows by cost / weight for each item it is handed, and
+    the waiting tenant with the lowest virtual time goes next. A tenant with twice the weight
+    therefore gets twice the share, and a tenant submitting many large items only delays itself.
+    A tenant that was idle starts again at the current virtual time, so it cannot save up credit.
+    """
+
+    def __init__(self):
+        self.queues: Dict[str, Deque[Tuple[Any, float]]] = {}
+        self.weights: Dict[str, float] = {}
+        self.virtual_times: Dict[str, float] = {}
+        self.virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def push(self, tenant: str, item: Any, weight: float = 1.0, cost: float = 1.0) -> None:
+        if tenant not in self.queues:
+            self.queues[tenant] = deque()
+            self.virtual_times[tenant] = max(self.virtual_times.get(tenant, 0.0), self.virtual_time)
+        self.queues[tenant].append((item, cost))
+        self.weights[tenant] = weight
+
+    def pop(self, eligible: Optional[Callable[[str], bool]] = None) -> Optional[Tuple[str, Any]]:
+        """Return the next (tenant, item) among the tenants accepted by `eligible`, or None"""
+        tenants = [tenant for tenant in self.queues if eligible is None or eligible(tenant)]
+        if not tenants:
+            return None
+
+        tenant = min(tenants, key=lambda name: self.virtual_times[name])
+        item, cost = self.queues[tenant].popleft()
+        self.virtual_time = max(self.virtual_time, self.virtual_times[tenant])
+        self.virtual_times[tenant] += cost / self.weights[tenant]
+        if not self.queues[tenant]:
+            del self.queues[tenant]
+            self.forget_idle_tenants()
+        return tenant, item
+
+    def remove(self, tenant: str, item: Any) -> None:
+        """Remove a waiting item, e.g. when its caller gave up"""
+        queue = self.queues.get(tenant)
+        if not queue:
+            return
+        for entry in queue:
+            if entry[0] is item:
+                queue.remove(entry)
+                break
+        if not queue:
+            del self.queues[tenant]
+
+    def order(self) -> List[Tuple[str, Any]]:
+        """Return the waiting (tenant, item) pairs in the order they would be handed out"""
+        virtual_times = {tenant: self.virtual_times[tenant] for tenant in self.queues}
+        positions = {tenant: 0 for tenant in self.queues}
+        order = []
+        while virtual_times:
+            tenant = min(virtual_times, key=virtual_times.get)
+            item, cost = self.queues[tenant][positions[tenant]]
+            order.append((tenant, item))
+            positions[tenant] += 1
+            virtual_times[tenant] += cost / self.weights[tenant]
+            if positions[tenant] == len(self.queues[tenant]):
+                del virtual_times[tenant]
+        return order
+
+    def forget_idle_tenants(self) -> None:
+        # Idle tenants that are not ahead of the current virtual time would restart from it anyway
+        for tenant in list(self.virtual_times):
+            if tenant not in self.queues and self.virtual_times[tenant] <= self.virtual_time:
+                del self.virtual_times[tenant]
+                del self.weights[tenant]
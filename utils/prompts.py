@@ -1,11 +1,6 @@
 outline_initial_generator_system_message = (
     '''
     You are a presentation outline generator who creates structured, engaging presentation outlines that effectively communicate complex topics.
-    '''
-)
-
-outline_initial_generator_user_message ='''
-    Create a presentation outline on {presentation_topic} with exactly {slide_count} slides.
 
     Follow these requirements carefully:
 
@@ -31,13 +26,17 @@ outline_initial_generator_user_message ='''
 
     Your output must include:
     1. A clear, engaging presentation title
-    2. {slide_count} slides, each with:
+    2. The requested number of slides, each with:
        - A descriptive title
        - A focused message that supports the main topic
        - A sequential slide number
 
     IMPORTANT: Generate all content in Turkish language. Respond in fluent, grammatically correct Turkish.
+    '''
+)
 
+outline_initial_generator_user_message ='''
+    Create a presentation outline on {presentation_topic} with exactly {slide_count} slides.
     '''
 
 
@@ -45,15 +44,6 @@ outline_initial_generator_user_message ='''
 
 outline_tester_system_message = '''
 You are a presentation outline evaluator who assesses outlines against strict quality and structural criteria to ensure effective communication.
-'''
-
-outline_tester_user_message = '''
-Evaluate the following presentation outline for quality and effectiveness:
-
-Topic: {presentation_topic}
-Title: {presentation_title}
-Outline:
-{previous_outline_text}
 
 Apply these evaluation criteria:
 
@@ -90,20 +80,19 @@ Your evaluation must provide:
 2. Numerical score (0-100) broken down by criteria
 '''
 
+outline_tester_user_message = '''
+Evaluate the following presentation outline for quality and effectiveness:
 
-
-outline_fixer_system_message = '''
-You are a presentation outline revision specialist who improves presentation outlines based on evaluation feedback while maintaining their core message and structure.
+Topic: {presentation_topic}
+Title: {presentation_title}
+Outline:
+{previous_outline_text}
 '''
 
-outline_fixer_user_message = '''
-Revise the following presentation outline based on the evaluation feedback:
 
-Previous Title: {previous_outline_title}
-Previous Outline: {previous_outline_text}
-Evaluation Score: {score}
-Evaluation Feedback: {feedback}
-Slide Count should be: {slide_count}
+
+outline_fixer_system_message = '''
+You are a presentation outline revision specialist who improves presentation outlines based on evaluation feedback while maintaining their core message and structure.
 
 Follow these revision guidelines:
 
@@ -145,24 +134,84 @@ Your output must provide:
 IMPORTANT: Generate all content in Turkish language. Respond in fluent, grammatically correct Turkish.
 '''
 
+outline_fixer_user_message = '''
+Revise the following presentation outline based on the evaluation feedback:
 
+Previous Title: {previous_outline_title}
+Previous Outline: {previous_outline_text}
+Evaluation Score: {score}
+Evaluation Feedback: {feedback}
+Slide Count should be: {slide_count}
+'''
 
 
 
-content_initial_generator_system_message = (
-    '''
-        You are an expert in presentation design. Consider the given title and the focus for a slide to provide the necessary content for the slide.
-    '''
-    )
 
+outline_critic_system_message = '''
+You are a presentation outline reviewer who evaluates outlines against strict quality and structural criteria and then revises them to resolve every issue found, in a single pass.
 
-content_initial_generator_user_message = (
-    '''
-        You are tasked to generate high quality content for a slide.
+Step 1 - Evaluate the outline with these criteria:
 
-        This slide will be part of a presentation titled: {presentation_title}
-        The title of the slide is: {slide_title}
-        Tha main focus of the slide should be derived from the following statement: {slide_focus}
+1. Critical Issues (Any of these results in automatic failure):
+- Missing introduction or conclusion slides
+- Slides covering multiple unrelated concepts
+- Unclear or missing logical flow
+- Redundant content across slides
+- Vague or unclear slide focus statements
+
+2. Quality Scoring (Total: 100 points)
+
+Structure (40 points):
+- Clear topic progression
+- One main concept per slide
+- Strong opening and closing slides
+
+Content (40 points):
+- Specific, actionable slide focuses
+- Evidence of audience engagement
+- Balanced content distribution
+- Clear examples or applications
+
+Practicality (20 points):
+- Time management feasibility
+- Audience appropriateness
+- Presentation flow
+
+Important Rules:
+- Do not evaluate the number of slides as this is predefined
+
+Step 2 - Revise the outline to address your feedback:
+- Address critical issues first, then the highest-point-value issues
+- Keep the number of slides exactly the same
+- Only modify slides mentioned in your feedback (unless changes affect flow)
+- Maintain successful elements and the core message of the original outline
+- Write all slide_focus statements as complete, actionable sentences
+- If the outline has no issues, return it unchanged
+
+Your response must provide:
+1. Detailed feedback explaining any issues found in the evaluated outline
+2. Numerical score (0-100) of the evaluated outline
+3. The revised outline: a presentation title and a complete set of slides, each with a clear, action-oriented title, a focused, complete-sentence message and proper sequential numbering
+
+IMPORTANT: Generate the revised outline in Turkish language. Respond in fluent, grammatically correct Turkish.
+'''
+
+outline_critic_user_message = '''
+Evaluate the following presentation outline, then revise it based on your own evaluation:
+
+Topic: {presentation_topic}
+Title: {presentation_title}
+Outline:
+{previous_outline_text}
+Slide Count should be: {slide_count}
+'''
+
+
+
+
+content_initial_generator_system_message = (
+    '''
+        You are an expert in presentation design. Consider the given title and the focus for a slide to provide the necessary content for the slide.
 
         Consider both presentation title and the slide title. Make sure that you understand what this slide should focus on.
         Then, follow a step by step approach to decide how you should create content for this slide.
@@ -188,19 +237,80 @@ content_initial_generator_user_message = (
         slide_voiceover_text
         slide_image_prompt
     '''
+    )
+
+
+content_initial_generator_user_message = (
+    '''
+        You are tasked to generate high quality content for a slide.
+
+        This slide will be part of a presentation titled: {presentation_title}
+        The title of the slide is: {slide_title}
+        Tha main focus of the slide should be derived from the following statement: {slide_focus}
+    '''
 
 )
 
 
 
 
-content_tester_system_message = '''
-You are a presentation content validator who evaluates slide content against strict multimedia and technical quality standards.
+content_batch_generator_system_message = (
+    '''
+        You are an expert in presentation design. Consider the given titles and the focus of several slides of a presentation to provide the necessary content for each slide.
+
+        Consider the presentation title, each slide title and the other slides. Make sure that you understand what each slide should focus on,
+        and keep the slides coherent with each other without repeating the same information.
+        Then, follow a step by step approach to decide how you should create content for each slide.
+
+        Each slide must be organized as a means to convey information and key messages regarding the main topic of presentation and particular focus of that slide.
+        Each slide will have some on screen text to let the user follow what is being discussed and also on screen text must help user to get the intended message even if there is no voiceover or images.
+        The onscreen text must be concise and prescriptive when it is meaningful.
+        Each slide will also have some voiceover text that will be read by a speaker.
+        The onscreen text and voiceover text must be determined in coherence. Apply the multimedia design principles to generate coherent texts for screen and voiceover.
+        Each slide will also have an image to enrich its content beyond a text only look.
+        I will later use another AI model to generate an image for each slide. But I need a detailed and well-written textual image prompt to do that.
+        Before writing a prompt, think about the entire context for the slide, presentation, slide title, focus, on screen text and voiceover text.
+        First, come up with a good visual idea that would make sense with the rest of the information, context and message of the slide.
+        Then express this visual idea with a detailed and descriptive manner as a textual prompt. It is important that your image prompt to be clear, descriptive and detailed.
+        Remember that you must specify some visual style as part of each image prompt as well.
+
+        IMPORTANT: Generate all content except the slide_image_prompt in Turkish language. Respond in fluent, grammatically correct Turkish.
+
+        Now take a deep breath and carry out the tasks we set so far.
+        You will give one item for every slide you are given, with its slide_number, ensuring that each item has all of the following:
+
+        slide_number
+        slide_onscreen_text
+        slide_voiceover_text
+        slide_image_prompt
+    '''
+)
+
+
+content_batch_generator_user_message = (
+    '''
+        You are tasked to generate high quality content for several slides of the same presentation.
+
+        These slides are part of a presentation titled: {presentation_title}
+        The slides, each with its number, title and the statement its main focus should be derived from:
+        {slide_list}
+    '''
+)
+
+
+
+
+# Added to the content prompts of presentations without a voiceover, whose content has no voiceover text
+content_without_voiceover_note = '''
+
+This presentation has no voiceover, so slides have no voiceover text. Leave out slide_voiceover_text and do not take voiceover text into account:
+the onscreen text and the image must convey the message of the slide on their own.
 '''
 
-content_tester_user_message = '''
-Evaluate the following slide content for quality, coherence, and technical correctness:
 
+
+
+content_tester_item_message = '''
 Slide Information:
 Presentation Title: {presentation_title}
 Slide Title: {slide_title}
@@ -210,7 +320,9 @@ Content to Evaluate:
 - Onscreen Text: {slide_onscreen_text}
 - Voiceover Text: {slide_voiceover_text}
 - Image Prompt: {slide_image_prompt}
+'''
 
+content_tester_criteria = '''
 Evaluation Criteria:
 
 1. Critical Issues (Any of these results in automatic failure, 0 points):
@@ -247,27 +359,28 @@ Remember, your evaluation should be strict, don't hesitate to give low scores if
 Now take a deep breath and start evaluating the content.
 '''
 
+content_tester_system_message = '''
+You are a presentation content validator who evaluates slide content against strict multimedia and technical quality standards.
+''' + content_tester_criteria
 
+content_tester_user_message = '''
+Evaluate the following slide content for quality, coherence, and technical correctness:
+''' + content_tester_item_message
 
-content_fixer_system_message = '''
-You are a presentation content revision specialist who improves slide content based on evaluation feedback while maintaining content coherence and multimedia balance.
+# Tester call evaluating the content of several slides (of concurrent presentations) at once
+content_tester_batch_system_message = content_tester_system_message + '''
+When you are given several numbered items, give one evaluation for every item, with its item_number.
 '''
 
-content_fixer_user_message = '''
-Revise the following slide content based on the evaluation feedback:
+content_tester_batch_user_message = '''
+Evaluate each of the following {item_count} slide contents for quality, coherence, and technical correctness.
+Every item is a different slide, evaluate each item on its own, independently of the other items:
+{items}'''
 
-Original Content:
-Presentation Title: {presentation_title}
-Slide Title: {slide_title}
-Slide Focus: {slide_focus}
-Previous Content:
-- Onscreen Text: {previous_onscreen_text}
-- Voiceover Text: {previous_voiceover_text}
-- Image Prompt: {previous_image_prompt}
 
-Evaluation Results:
-Score: {score}
-Feedback: {feedback}
+
+content_fixer_system_message = '''
+You are a presentation content revision specialist who improves slide content based on evaluation feedback while maintaining content coherence and multimedia balance.
 
 Follow these revision guidelines:
 
@@ -296,27 +409,103 @@ Your output must provide:
 3. Enhanced image prompt that aligns with the content
 
 IMPORTANT: Generate all content except the slide_image_prompt in Turkish language. Respond in fluent, grammatically correct Turkish.
+'''
+
+content_fixer_user_message = '''
+Revise the following slide content based on the evaluation feedback:
 
+Original Content:
+Presentation Title: {presentation_title}
+Slide Title: {slide_title}
+Slide Focus: {slide_focus}
+Previous Content:
+- Onscreen Text: {previous_onscreen_text}
+- Voiceover Text: {previous_voiceover_text}
+- Image Prompt: {previous_image_prompt}
+
+Evaluation Results:
+Score: {score}
+Feedback: {feedback}
 '''
 
 
 
+content_critic_system_message = '''
+You are a presentation content reviewer who evaluates slide content against strict multimedia and technical quality standards and then revises it to resolve every issue found, in a single pass.
 
-image_tester_system_message = (
-    '''
-    You are an expert image validator for presentation slides. Your role is to analyze images and provide detailed feedback about their quality and suitability for presentations, ensuring they meet all specified requirements.
-    '''
-)
+Step 1 - Evaluate the content with these criteria:
 
-image_tester_user_message = (
-    '''
-    Analyze this image for a presentation slide:
+1. Critical Issues (Any of these results in automatic failure, 0 points):
+- Misaligned content elements
+- Unclear or confusing message
+- Missing or incomplete components
+
+
+2. Quality Scoring (Total: 15 points)
+
+Content Coherence (6 points):
+- Alignment between onscreen text, voiceover, and image prompt - (2 points)
+- Clear message delivery - (2 points)
+- Appropriate level of detail - (1 point)
+- Logical flow of information - (1 point)
+
+Multimedia Design (5 points):
+- Balance between onscreen and voiceover text - (2 points)
+- Onscreen text conciseness - (1 point)
+- Voiceover text completeness - (1 point)
+- Image prompt relevance and enhancement - (1 point)
+
+Technical Quality (4 points):
+- Language consistency - (2 points)
+- Image prompt clarity and specificity - (1 points)
+- Professional tone - (1 point)
 
+Your evaluation should be strict, don't hesitate to give low scores if you see issues.
+
+Step 2 - Revise the content to address your feedback:
+- Address each feedback point systematically
+- Keep successful elements from the original content
+- Ensure all changes align with the slide focus and keep all content elements coherent
+- Write a detailed, specific image prompt
+- Keep onscreen text concise and impactful, and make the voiceover complement the visuals
+- If the content has no issues, return it unchanged
+
+Your response must provide:
+1. Comprehensive feedback listing all issues found in the evaluated content
+2. Numerical score (0-15) of the evaluated content
+3. The revised content: onscreen text, voiceover text and image prompt
+
+IMPORTANT: Generate all revised content except the slide_image_prompt in Turkish language. Respond in fluent, grammatically correct Turkish.
+'''
+
+content_critic_user_message = '''
+Evaluate the following slide content, then revise it based on your own evaluation:
+
+Slide Information:
+Presentation Title: {presentation_title}
+Slide Title: {slide_title}
+Slide Focus: {slide_focus}
+
+Content to Evaluate:
+- Onscreen Text: {slide_onscreen_text}
+- Voiceover Text: {slide_voiceover_text}
+- Image Prompt: {slide_image_prompt}
+'''
+
+
+
+
+image_tester_item_message = (
+    '''
     The slide content is as follows:
     - Onscreen Text: {slide_onscreen_text}
     - Voiceover Text: {slide_voiceover_text}
     - Image Prompt: {slide_image_prompt}
+'''
+)
 
+image_tester_criteria = (
+    '''
     Evaluate against these criteria:
 
     CRITICAL ISSUES (Any of these results in automatic rejection):
@@ -368,31 +557,37 @@ image_tester_user_message = (
     '''
 )
 
+image_tester_system_message = (
+    '''
+    You are an expert image validator for presentation slides. Your role is to analyze images and provide detailed feedback about their quality and suitability for presentations, ensuring they meet all specified requirements.
+    ''' + image_tester_criteria
+)
 
+image_tester_user_message = (
+    '''
+    Analyze this image for a presentation slide:
+''' + image_tester_item_message
+)
 
-image_fixer_system_message = (
+# Tester call evaluating the images of several slides (of concurrent presentations) at once, each item is followed by its image
+image_tester_batch_intro_message = (
     '''
-    You are an expert at refining image generation prompts based on feedback. Your role is to improve prompts to create simple, effective presentation visuals.
+    Analyze each of the following {item_count} images, each for a different presentation slide.
+    Evaluate each image on its own, against the content of its own slide only:
     '''
 )
 
-image_fixer_user_message = (
+image_tester_batch_system_message = image_tester_system_message + (
     '''
-    Previous image generation attempt:
+    When you are given several numbered items, each followed by its image, give one evaluation for every image, with the item_number of its item.
+    '''
+)
 
-    Original image prompt:
-    ## {slide_image_prompt}
-    ##
-    
-    Slide Content:
-    - Onscreen Text: {slide_onscreen_text}
-    - Voiceover Text: {slide_voiceover_text}
 
 
-    Validation Results:
-    - Score: {score}
-    - Feedback: {feedback}
-    - Improvement Suggestions: {suggestions}
+image_fixer_system_message = (
+    '''
+    You are an expert at refining image generation prompts based on feedback. Your role is to improve prompts to create simple, effective presentation visuals.
 
     Create a new, improved prompt following these guidelines:
 
@@ -420,4 +615,24 @@ image_fixer_user_message = (
     1. A revised, detailed prompt that addresses all feedback
     2. Brief explanation of key changes made
     '''
-)
\ No newline at end of file
+)
+
+image_fixer_user_message = (
+    '''
+    Previous image generation attempt:
+
+    Original image prompt:
+    ## {slide_image_prompt}
+    ##
+    
+    Slide Content:
+    - Onscreen Text: {slide_onscreen_text}
+    - Voiceover Text: {slide_voiceover_text}
+
+
+    Validation Results:
+    - Score: {score}
+    - Feedback: {feedback}
+    - Improvement Suggestions: {suggestions}
+    '''
+)
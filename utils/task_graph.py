@@ -0,0 +1,86 @@
+# utils/task_graph.py
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class TaskNode:
+    """A single unit of work in a TaskGraph"""
+
+    def __init__(self, name: str, func: Callable, dependencies: List[str]):
+        self.name = name
+        self.func = func
+        self.dependencies = dependencies
+
+
+class TaskGraph:
+    """
+    Small dependency graph scheduler.
+
+    Every node starts as soon as all of its dependencies have finished, so independent
+    stages (e.g. the image and the voiceover of a slide) run at the same time. When more
+    nodes are ready than max_concurrency allows, nodes added earlier are started first.
+
+    A node function receives the results of its dependencies as positional arguments, in
+    the order the dependencies were given. Coroutine functions are awaited, plain functions
+    are run in a worker thread so they do not block the event loop.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 on_progress: Optional[Callable[[List[str], List[str]], None]] = None):
+        self.max_concurrency = max_concurrency
+        self.on_progress = on_progress
+        self._nodes: Dict[str, TaskNode] = {}
+
+    def add(self, name: str, func: Callable, dependencies: Iterable[str] = ()) -> str:
+        """Add a node; dependencies must already be part of the graph, which keeps it acyclic"""
+        if name in self._nodes:
+            raise ValueError(f"Task '{name}' is already part of the graph")
+
+        dependencies = list(dependencies)
+        for dependency in dependencies:
+            if dependency not in self._nodes:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dependency}'")
+
+        self._nodes[name] = TaskNode(name, func, dependencies)
+        return name
+
+    async def _run_node(self, node: TaskNode, results: Dict[str, Any]) -> Any:
+        args = [results[dependency] for dependency in node.dependencies]
+        if inspect.iscoroutinefunction(node.func):
+            return await node.func(*args)
+        return await asyncio.to_thread(node.func, *args)
+
+    def _report_progress(self, running: Dict[asyncio.Task, str], results: Dict[str, Any]) -> None:
+        if self.on_progress:
+            self.on_progress(list(running.values()), list(results.keys()))
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the graph and return the results of all nodes keyed by node name"""
+        results: Dict[str, Any] = {}
+        pending = list(self._nodes.values())
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while pending or running:
+                # Start every ready node the concurrency limit allows, in insertion order
+                for node in list(pending):
+                    if self.max_concurrency and len(running) >= self.max_concurrency:
+                        break
+                    if all(dependency in results for dependency in node.dependencies):
+                        pending.remove(node)
+                        running[asyncio.create_task(self._run_node(node, results))] = node.name
+                self._report_progress(running, results)
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+        except BaseException:
+            # Stop the rest of the graph as soon as one node fails
+            for task in running:
+                task.cancel()
+            raise
+
+        self._report_progress(running, results)
+        return results